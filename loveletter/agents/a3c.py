@@ -1,35 +1,92 @@
 """Agent with uses A3C trained network"""
 
+import os
 import random
 
-import torch
-import torch.nn.functional as F
-from torch.autograd import Variable
-
-
 from loveletter.env import LoveLetterEnv
 from loveletter.agents.random import AgentRandom
 from loveletter.agents.agent import Agent
-from loveletter.trainers.a3c_model import ActorCritic
+from loveletter.trainers.numpy_model import NumpyActorCritic, export_npz
+
+
+# models already loaded by this process, keyed by file and dtype, with the
+# stat of the file they were read from
+_MODELS = {}
+
+
+def load_model(model_path, dtype):
+    """
+    ActorCritic with the weights stored at model_path.
+
+    Each file is read from disk once per process. A file saved again since
+    (another modification time, size or inode) is read again and replaces
+    the model kept for it.
+
+    An .npz file (see export_model) loads a NumpyActorCritic, which needs
+    neither torch nor dtype.
+    """
+    stat = os.stat(model_path)
+    version = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    key = (os.path.abspath(model_path), dtype)
+    cached = _MODELS.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    if model_path.endswith(".npz"):
+        model = NumpyActorCritic.load(model_path)
+    else:
+        model = _load_torch_model(model_path, dtype)
+    _MODELS[key] = (version, model)
+    return model
+
 
+def _load_torch_model(model_path, dtype):
+    import torch
+    from loveletter.trainers.a3c_model import ActorCritic
+
+    env = LoveLetterEnv(AgentRandom(), 451)
+    state = env.reset()
+    model = ActorCritic(state.shape[0], env.action_space).type(dtype)
+    model.load_state_dict(torch.load(model_path))
+    model.eval()
+    return model
+
+
+def export_model(model_path, npz_path):
+    """Convert a saved torch model to an .npz usable without torch"""
+    import torch
+    export_npz(torch.load(model_path, map_location=lambda storage, loc: storage), npz_path)
 
 
 class AgentA3C(Agent):
-    '''Agent which leverages Actor Critic Learning'''
+    '''
+    Agent which leverages Actor Critic Learning
+
+    model_path may also be a model with action_index(observation), such as
+    an InferenceServer shared by many agents.
+    '''
 
     def __init__(self,
                  model_path,
-                 dtype,
-                 seed=451):
-        self._seed = seed
-        self._idx = 0
+                 dtype=None,
+                 seed=451,
+                 random_state=None):
+        self._random_state = random_state
         self._dtype = dtype
-        self.env = LoveLetterEnv(AgentRandom(seed), seed)
-        state = self.env.reset()
+        self._opponent = AgentRandom(seed)
+        self.env = LoveLetterEnv(self._opponent, seed)
+        self.reset(seed)
+        self._model = model_path if hasattr(model_path, "action_index") \
+            else load_model(model_path, dtype)
 
-        self._model = ActorCritic(
-            state.shape[0], self.env.action_space).type(dtype)
-        self._model.load_state_dict(torch.load(model_path))
+    def reset(self, seed):
+        """Start a new game as if built with seed, keeping the loaded model"""
+        self._seed = seed
+        self._idx = 0
+        if self._random_state is not None:
+            self._random_state.seed(seed)
+        self._opponent.reset(seed)
+        self.env.seed(seed)
+        self.env.reset()
 
     def _move(self, game):
         '''Return move which ends in score hole'''
@@ -37,24 +94,36 @@ class AgentA3C(Agent):
         self._idx += 1
 
         state = self.env.force(game)
-        state = torch.from_numpy(state).type(self._dtype)
-        cx = Variable(torch.zeros(1, 256).type(self._dtype), volatile=True)
-        hx = Variable(torch.zeros(1, 256).type(self._dtype), volatile=True)
-
-        _, logit, (hx, cx) = self._model(
-            (Variable(state.unsqueeze(0), volatile=True), (hx, cx)))
-        prob = F.softmax(logit)
-        action_idx = prob.max(1)[1].data.cpu().numpy()[0, 0]
+        if hasattr(self._model, "action_index"):
+            action_idx = self._model.action_index(state)
+        else:
+            action_idx = self._torch_action_index(state)
 
         player_action = self.env.action_from_index(action_idx, game)
         if player_action is None:
             # print("ouch")
-            options = Agent.valid_actions(game, self._seed + self._idx)
+            options = Agent.valid_actions(
+                game, self._seed + self._idx, self._random_state)
             if len(options) < 1:
                 raise Exception("Unable to play without actions")
 
-            random.seed(self._seed + self._idx)
-            return random.choice(options)
+            random_state = random.Random(self._seed + self._idx) \
+                if self._random_state is None else self._random_state
+            return random_state.choice(options)
 
         # print("playing ", self._idx, player_action)
         return player_action
+
+    def _torch_action_index(self, state):
+        import torch
+        import torch.nn.functional as F
+        from torch.autograd import Variable
+
+        state = torch.from_numpy(state).type(self._dtype)
+        cx = Variable(torch.zeros(1, 256).type(self._dtype), volatile=True)
+        hx = Variable(torch.zeros(1, 256).type(self._dtype), volatile=True)
+
+        _, logit, (hx, cx) = self._model(
+            (Variable(state.unsqueeze(0), volatile=True), (hx, cx)))
+        prob = F.softmax(logit)
+        return prob.max(1)[1].data.cpu().numpy()[0, 0]
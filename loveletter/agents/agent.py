@@ -6,8 +6,7 @@ Abstract Agent for a Love Letter AI
 
 import random
 
-from loveletter.card import Card
-from loveletter.player import PlayerAction
+from loveletter.moves import LegalMoves
 
 class Agent():
     """Abstract Class for agent to play Love Letter."""
@@ -22,30 +21,36 @@ class Agent():
         raise NotImplementedError("Class {} doesn't implement _move()".format(
             self.__class__.__name__))
 
+    def reset(self, seed):
+        """
+        Prepare for a new game, behaving exactly as a new agent built with seed.
+
+        Lets the arena build an agent once and reuse it for every game.
+        """
+        raise NotImplementedError("Class {} doesn't implement reset()".format(
+            self.__class__.__name__))
+
     @staticmethod
-    def valid_actions(game, seed=451):
-        """Returns valid moves based on a current game"""
-        random.seed(seed + game.round())
+    def valid_actions(game, seed=451, random_state=None):
+        """
+        Returns valid moves based on a current game
+
+        Opponent targets are drawn from random_state (a random.Random) if
+        given, otherwise from a private stream seeded with seed and the round
+        """
+        if random_state is None:
+            random_state = random.Random(seed + game.round())
         player_self = game.player_turn()
         opponents = game.opponent_turn()
 
-        actions_possible = [
-            PlayerAction(Card.guard, random.choice(opponents), Card.priest, Card.noCard),
-            PlayerAction(Card.guard, random.choice(opponents), Card.baron, Card.noCard),
-            PlayerAction(Card.guard, random.choice(opponents), Card.handmaid, Card.noCard),
-            PlayerAction(Card.guard, random.choice(opponents), Card.prince, Card.noCard),
-            PlayerAction(Card.guard, random.choice(opponents), Card.king, Card.noCard),
-            PlayerAction(Card.guard, random.choice(opponents), Card.countess, Card.noCard),
-            PlayerAction(Card.guard, random.choice(opponents), Card.princess, Card.noCard),
-            PlayerAction(Card.priest, random.choice(opponents), Card.noCard, Card.noCard),
-            PlayerAction(Card.baron, random.choice(opponents), Card.noCard, Card.noCard),
-            PlayerAction(Card.king, random.choice(opponents), Card.noCard, Card.noCard),
-            PlayerAction(Card.prince, random.choice(opponents), Card.noCard, Card.noCard),
-            PlayerAction(Card.prince, player_self, Card.noCard, Card.noCard),
-            PlayerAction(Card.handmaid, player_self, Card.noCard, Card.noCard),
-            PlayerAction(Card.countess, player_self, Card.noCard, Card.noCard),
-            PlayerAction(Card.princess, player_self, Card.noCard, Card.noCard)
-        ]
-        actions = [action for action in actions_possible if game.is_action_valid(action)]
+        mask = LegalMoves.game_mask(game)
+
+        # targets are drawn for every opponent slot to keep the seeded choices
+        actions = []
+        for slot in range(LegalMoves.count):
+            target = player_self if LegalMoves.slot_self[slot] \
+                else random_state.choice(opponents)
+            if mask >> slot & 1:
+                actions.append(LegalMoves.action(slot, target))
 
         return actions
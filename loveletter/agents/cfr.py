@@ -0,0 +1,72 @@
+"""Agent which plays the average strategy of a CFR table"""
+
+import os
+import random
+
+from loveletter.agents.agent import Agent
+from loveletter.cfr import InfoSet, StrategyTable, sample_index
+from loveletter.moves import LegalMoves
+
+
+# tables already loaded by this process, keyed by file, with the stat of the
+# file they were read from
+_TABLES = {}
+
+
+def load_table(table_path):
+    """
+    StrategyTable stored at table_path, read once per process. A file saved
+    again since is read again and replaces the table kept for it.
+    """
+    stat = os.stat(table_path)
+    version = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    key = os.path.abspath(table_path)
+    cached = _TABLES.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    table = StrategyTable.load(table_path)
+    _TABLES[key] = (version, table)
+    return table
+
+
+class AgentCFR(Agent):
+    '''
+    Agent which plays the average strategy found by MCCFR
+    (see loveletter.trainers.cfr_train)
+
+    table_path may also be a StrategyTable. Information sets the table has
+    never met are played uniformly. With greedy the most likely slot is
+    played instead of a sampled one.
+    '''
+
+    def __init__(self, table_path, seed=451, greedy=False, random_state=None):
+        self._table = table_path if isinstance(table_path, StrategyTable) \
+            else load_table(table_path)
+        self.greedy = greedy
+        self._random_state = random_state
+        self._random = random.Random()
+        self.reset(seed)
+
+    def reset(self, seed):
+        """Start a new game as if built with seed, keeping the loaded table"""
+        self._seed = seed
+        self._idx = 0
+        if self._random_state is not None:
+            self._random_state.seed(seed)
+
+    def _move(self, game):
+        """Slot drawn from the average strategy of the information set"""
+        self._idx += 1
+        random_state = self._random_state
+        if random_state is None:
+            random_state = self._random
+            random_state.seed(self._seed + self._idx + game.round())
+
+        key, target = InfoSet.key(game)
+        slots = LegalMoves.slots(LegalMoves.game_mask(game))
+        strategy = self._table.average(key, slots)
+        if self.greedy:
+            pick = int(strategy.argmax())
+        else:
+            pick = sample_index(strategy, random_state)
+        return InfoSet.action(game, slots[pick], target, random_state)
@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+
+"""
+Information Set Monte Carlo Tree Search Agent for Love Letter
+"""
+
+import math
+import multiprocessing
+import random
+import time
+
+import numpy as np
+
+from loveletter.agents.agent import Agent
+from loveletter.batch import BatchGame
+from loveletter.card import Card
+from loveletter.compact import CompactGame
+from loveletter.endgame import EndgameSolver
+from loveletter.game import Game
+from loveletter.moves import FullMoves, LegalMoves
+from loveletter.player import Player, PlayerTools
+
+
+class _Node():
+    """Tree node, reached by `player` playing `action`"""
+    __slots__ = ("action", "player", "children", "visits", "wins", "avails")
+
+    def __init__(self, action=None, player=-1):
+        self.action = action
+        self.player = player
+        self.children = {}
+        self.visits = 0
+        self.wins = 0.0
+        self.avails = 1
+
+
+def _search_tree(task):
+    """Pool worker: search one root parallel tree, returning its root visits"""
+    game, reveals, seed, settings = task
+    agent = AgentISMCTS(seed, **settings)
+    agent._reveals = reveals
+    root, iterations = agent.search(game, random.Random(seed))
+    return [(node.action, node.visits) for node in root.children.values()], iterations
+
+
+class AgentISMCTS(Agent):
+    """
+    Single observer Information Set MCTS.
+
+    Each iteration samples a determinization: the hidden opponent hands and
+    the deck order are dealt at random from the cards the player has not
+    seen, keeping the hands revealed by the player's own priests. UCT then
+    walks one tree shared by every determinization, only considering the
+    actions legal in the current one, and finishes with a random rollout.
+
+    Search stops after `iterations`, or after `time_budget` seconds when
+    given. Like AgentRandom, each move reseeds a private stream from the
+    seed and the move count, so a fixed iteration count plays reproducibly.
+
+    With `rollouts` above 1 each new leaf is scored by that many random
+    games played at once on a BatchGame (leaf parallelism). With `workers`
+    above 1 as many independent trees are searched, each with its own
+    stream, on a process pool and their root visits summed (root
+    parallelism). The chosen move only depends on the seed and the number
+    of workers. The pool is forked, so such an agent cannot be used from
+    inside arena worker processes.
+
+    Once `endgame_cards` or fewer cards are left to draw the search is
+    replaced by the exact EndgameSolver, summing each action's win
+    probability over `endgame_worlds` determinizations.
+    """
+
+    def __init__(self,
+                 seed=451,
+                 iterations=200,
+                 time_budget=None,
+                 exploration=0.7,
+                 rollouts=1,
+                 workers=1,
+                 endgame_cards=0,
+                 endgame_worlds=8,
+                 random_state=None):
+        self.iterations = iterations
+        self.time_budget = time_budget
+        self.exploration = exploration
+        self.rollouts = rollouts
+        self.workers = workers
+        self.endgame_cards = endgame_cards
+        self.endgame_worlds = endgame_worlds
+        self.solver = EndgameSolver()
+        self._random_state = random_state
+        self._random = random.Random()
+        self._pool = None
+        self.iterations_total = 0
+        self.search_time = 0.0
+        self.reset(seed)
+
+    def reset(self, seed):
+        """Start a new game as if built with seed"""
+        self._seed = seed
+        self._idx = 0
+        self._reveals = {}
+        self._seats = {}
+        self._turn_index = -1
+        if self._random_state is not None:
+            self._random_state.seed(seed)
+
+    def close(self):
+        """Stop the worker pool of a root parallel search"""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def iterations_per_second(self):
+        """Search speed over every move so far"""
+        return self.iterations_total / self.search_time if self.search_time else 0.0
+
+    def _move(self, game):
+        """Return the most visited action of the search"""
+        self._idx += 1
+        self._observe(game)
+        actions = AgentISMCTS.legal_actions(game)
+        if len(actions) < 1:
+            raise Exception("Unable to play without actions")
+        if len(actions) == 1:
+            return actions[0]
+
+        random_state = self._random_state
+        if random_state is None:
+            random_state = self._random
+            random_state.seed(self._seed + self._idx)
+        if game.cards_left() <= self.endgame_cards:
+            return self._solve_endgame(game, random_state)
+
+        start = time.time()
+        if self.workers > 1:
+            visits, iterations = self._search_parallel(game)
+        else:
+            root, iterations = self.search(game, random_state)
+            visits = [(node.action, node.visits) for node in root.children.values()]
+        self.iterations_total += iterations
+        self.search_time += time.time() - start
+
+        return max(visits, key=lambda item: item[1])[0]
+
+    def _solve_endgame(self, game, random_state):
+        """Action with the best win probability summed over determinizations"""
+        seat = game.player_turn()
+        totals = {}
+        for _ in range(self.endgame_worlds):
+            world = self.determinize(game, random_state)
+            for action, value in self.solver.action_values(world):
+                totals[action] = totals.get(action, 0.0) + value[seat]
+        return max(totals.items(), key=lambda item: item[1])[0]
+
+    def _search_parallel(self, game):
+        """Search a tree per worker, summing the visits of each root action"""
+        if self._pool is None:
+            context = multiprocessing.get_context(
+                'fork' if 'fork' in multiprocessing.get_all_start_methods() else None)
+            self._pool = context.Pool(self.workers)
+        settings = {"iterations": self.iterations,
+                    "time_budget": self.time_budget,
+                    "exploration": self.exploration,
+                    "rollouts": self.rollouts}
+        move_seed = (self._seed + self._idx) * self.workers
+        tasks = [(game, dict(self._reveals), move_seed + worker, settings)
+                 for worker in range(self.workers)]
+
+        visits = {}
+        iterations = 0
+        for tree_visits, tree_iterations in self._pool.map(_search_tree, tasks):
+            for action, count in tree_visits:
+                visits[action] = visits.get(action, 0) + count
+            iterations += tree_iterations
+        return list(visits.items()), iterations
+
+    def search(self, game, random_state):
+        """Search from the current player's view, returning (root, iterations)"""
+        np_random = np.random.RandomState(random_state.getrandbits(32)) \
+            if self.rollouts > 1 else None
+        root = _Node()
+        end = None if self.time_budget is None else time.time() + self.time_budget
+        iterations = 0
+        while (end is None and iterations < self.iterations) or \
+                (end is not None and time.time() < end):
+            self._iterate(root, self.determinize(game, random_state),
+                          random_state, np_random)
+            iterations += 1
+        return root, iterations
+
+    def _iterate(self, root, game, random_state, np_random=None):
+        """One selection, expansion, rollout and backpropagation"""
+        node = root
+        path = [root]
+
+        # selection
+        while game.active():
+            actions = AgentISMCTS.legal_actions(game)
+            untried = [action for action in actions if action not in node.children]
+            if untried:
+                # expansion
+                action = random_state.choice(untried)
+                child = _Node(action, game.player_turn())
+                node.children[action] = child
+                node = child
+                path.append(node)
+                game = AgentISMCTS._play(game, action)
+                break
+
+            best = None
+            best_score = -1.0
+            for action in actions:
+                child = node.children[action]
+                child.avails += 1
+                score = child.wins / child.visits + \
+                    self.exploration * math.sqrt(math.log(child.avails) / child.visits)
+                if score > best_score:
+                    best, best_score = child, score
+            node = best
+            path.append(node)
+            game = AgentISMCTS._play(game, node.action)
+
+        # rollout
+        if np_random is not None and game.active():
+            winners = AgentISMCTS._rollouts(game, self.rollouts, np_random)
+            for node in path:
+                node.visits += 1
+                if node.player >= 0:
+                    node.wins += np.mean(winners == node.player)
+            return
+
+        while game.active():
+            game = AgentISMCTS._play(game, AgentISMCTS._random_action(game, random_state))
+
+        # backpropagation
+        for node in path:
+            node.visits += 1
+            if node.player >= 0 and game.is_winner(node.player):
+                node.wins += 1
+
+    @staticmethod
+    def _rollouts(game, count, np_random):
+        """Winners of count random games from game, played as one batch"""
+        record = np.frombuffer(CompactGame.from_game(game).record(), dtype=np.uint8)
+        batch = BatchGame(np.tile(record, (count, 1)))
+        while batch.active().any():
+            batch.move(batch.random_actions(np_random))
+        return batch.winner()
+
+    def determinize(self, game, random_state):
+        """
+        A game consistent with what the current player has observed.
+
+        The unseen cards (opponent hands, the deck after the drawn card and
+        the held out card) are shuffled and dealt again. Opponents whose hand
+        the player saw with a priest keep that card.
+        """
+        players = game.players()
+        deck = game.deck()
+        opponents = game.opponent_turn()
+        unseen = [int(card) for card in deck[1:]] + \
+            [int(players[idx].hand_card) for idx in opponents]
+        hidden = []
+        for idx in opponents:
+            card = self._reveals.get(idx)
+            if card is not None and card in unseen:
+                unseen.remove(card)
+                players[idx] = Player(card, players[idx].actions)
+            else:
+                hidden.append(idx)
+
+        random_state.shuffle(unseen)
+        for idx, card in zip(hidden, unseen):
+            players[idx] = Player(card, players[idx].actions)
+        deck_new = [deck[0]] + unseen[len(hidden):]
+        return Game(deck_new, players, game.turn_index(), game.discard_counts())
+
+    def _observe(self, game):
+        """
+        Track the hands the current seat has seen with a priest.
+
+        A revealed card stays known until its holder discards that very card
+        (or is forced to by a prince), trades hands with a king, or leaves.
+        The logs read and the reveals are kept per seat, so one agent may
+        play several seats of a game.
+        """
+        if game.turn_index() < self._turn_index:
+            self._seats = {}
+        self._turn_index = game.turn_index()
+        seat = game.player_turn()
+        players = game.players()
+        lengths = [AgentISMCTS._log_length(player) for player in players]
+        last, reveals = self._seats.get(seat, (None, {}))
+
+        if last is not None:
+            # priests played by this seat since its last move
+            for action in players[seat].actions[last[seat]:lengths[seat]]:
+                if action.discard == Card.priest and action.revealed_card != Card.noCard:
+                    reveals[action.player_target] = action.revealed_card
+
+            for idx, player in enumerate(players):
+                for action in player.actions[last[idx]:lengths[idx]]:
+                    if idx == seat and action.discard == Card.priest:
+                        continue
+                    if action.discard == Card.king:
+                        reveals.pop(idx, None)
+                        reveals.pop(action.player_target, None)
+                    elif reveals.get(idx) == action.discard:
+                        del reveals[idx]
+        for idx in list(reveals):
+            if not PlayerTools.is_playing(players[idx]):
+                del reveals[idx]
+        self._seats[seat] = (lengths, reveals)
+        self._reveals = reveals
+
+    @staticmethod
+    def legal_actions(game):
+        """Every legal action, with each possible target and guess"""
+        return FullMoves.game_actions(game)
+
+    @staticmethod
+    def _random_action(game, random_state):
+        """Uniformly random legal slot at a random opponent"""
+        slot = random_state.choice(LegalMoves.slots(LegalMoves.game_mask(game)))
+        if LegalMoves.slot_self[slot]:
+            return LegalMoves.action(slot, game.player_turn())
+        return LegalMoves.action(slot, random_state.choice(game.opponent_turn()))
+
+    @staticmethod
+    def _play(game, action):
+        """Play an action, then skip to the next player still in the game"""
+        game = game.move(action)[0]
+        while game.active() and not game.is_current_player_playing():
+            game = game.skip_eliminated_player()
+        return game
+
+    @staticmethod
+    def _log_length(player):
+        """Number of actions logged by a player"""
+        for idx, action in enumerate(player.actions):
+            if action.discard == Card.noCard:
+                return idx
+        return len(player.actions)
@@ -9,20 +9,37 @@ from .agent import Agent
 
 
 class AgentRandom(Agent):
-    """Random Player Class for play Love Letter."""
+    """
+    Random Player Class for play Love Letter.
 
-    def __init__(self, seed=451):
+    By default every move is drawn from a private stream reseeded from the
+    seed, the move count and the round. Passing random_state (a random.Random)
+    draws every move from that stream instead, without reseeding.
+    """
+
+    def __init__(self, seed=451, random_state=None):
+        self._seed = seed
+        self._idx = 0
+        self._random_state = random_state
+        self._random = random.Random()
+
+    def reset(self, seed):
+        """Start a new game as if built with seed"""
         self._seed = seed
         self._idx = 0
+        if self._random_state is not None:
+            self._random_state.seed(seed)
 
     def _move(self, game):
         """Return a random valid move"""
         self._idx = self._idx + 1
-        seed = self._seed + self._idx
-        random.seed(seed)
+        random_state = self._random_state
+        if random_state is None:
+            random_state = self._random
+            random_state.seed(self._seed + self._idx + game.round())
 
-        options = Agent.valid_actions(game, seed)
+        options = Agent.valid_actions(game, random_state=random_state)
         if len(options) < 1:
             raise Exception("Unable to play without actions")
 
-        return random.choice(options)
+        return random_state.choice(options)
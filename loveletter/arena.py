@@ -4,8 +4,33 @@ Love Letter Arena object
 """
 
 import itertools
+import multiprocessing
+
 from loveletter.game import Game
 
+# agent pairs of the pool worker, inherited from the parent on fork
+_WORKER_PAIRS = []
+# agents built by the pool worker, kept for every unit of their pair
+_WORKER_AGENTS = {}
+_WORKER_REUSE = [False]
+
+
+def _init_worker(pairs, reuse_agents):
+    """Pool initializer, store the agent lambda pairs for this worker"""
+    global _WORKER_PAIRS
+    _WORKER_PAIRS = pairs
+    _WORKER_AGENTS.clear()
+    _WORKER_REUSE[0] = reuse_agents
+
+
+def _play_unit(unit):
+    """Play one (pair index, seed, start, stop) work unit in a pool worker"""
+    pair_idx, seed, start, stop = unit
+    lambda_01, lambda_02 = _WORKER_PAIRS[pair_idx]
+    agents = _WORKER_AGENTS.setdefault(pair_idx, {}) if _WORKER_REUSE[0] else None
+    return pair_idx, Arena.compare_agents_range(
+        lambda_01, lambda_02, seed, start, stop, agents)
+
 
 class Arena():
     """
@@ -17,11 +42,25 @@ class Arena():
     Where `agent_str` is the display name of the agent and
     `agent_lambda` is a lambda function that takes **only** a random
     seed to create a new object of the agent
+
+    With `processes` above 1 the games are split into (pair, seed range)
+    units of at most `chunk_size` games and played on a process pool.
+    Every game is seeded on its own, so the results match the serial run.
+    Lambdas are handed to the workers when they fork, so they do not need
+    to be picklable where fork is the start method (eg Linux).
+
+    With `reuse_agents` each agent is built once (per worker) and then
+    `reset` with every game's seed instead of calling its lambda again.
+    This matches the lambdas only when they pass the seed straight to the
+    agent. Agents that do not implement `reset` are still built per game.
     """
 
     def __init__(self,
                  agents=None,
-                 games_to_play=101):
+                 games_to_play=101,
+                 processes=1,
+                 chunk_size=None,
+                 reuse_agents=False):
         self._agents = agents if agents is list else []
         self._games_to_play = games_to_play
         self._names = list(sorted(map(lambda t: t[0], agents)))
@@ -30,27 +69,49 @@ class Arena():
         combos = list(itertools.combinations(agents, 2)) + \
             list(zip(agents, agents))
         self._combos = sorted(combos, key=lambda t: t[0][0] + '_' + t[1][0])
-        self._results = list(map(lambda t: Arena._handle_combo(
-            t[1], games_to_play, t[0]), enumerate(self._combos)))
+        if processes > 1:
+            pairs = [(combo[0][1], combo[1][1]) for combo in self._combos]
+            seeds = list(range(len(self._combos)))
+            wins = Arena.compare_pairs(pairs, seeds, games_to_play,
+                                       processes, chunk_size, reuse_agents)
+            self._results = [(combo[0][0], combo[1][0], win)
+                             for combo, win in zip(self._combos, wins)]
+        else:
+            self._results = list(map(lambda t: Arena._handle_combo(
+                t[1], games_to_play, t[0], reuse_agents), enumerate(self._combos)))
 
     @staticmethod
-    def _handle_combo(combo, games_to_play, seed):
+    def _handle_combo(combo, games_to_play, seed, reuse_agents=False):
         wins = Arena.compare_agents(
-            combo[0][1], combo[1][1], games_to_play, seed)
+            combo[0][1], combo[1][1], games_to_play, seed, reuse_agents)
         return (combo[0][0], combo[1][0], wins)
 
     @staticmethod
-    def compare_agents(lambda_01, lambda_02, games_to_play=51, seed=451):
+    def compare_agents(lambda_01, lambda_02, games_to_play=51, seed=451,
+                       reuse_agents=False):
         """
         Returns number of times agent created from lambda_01
         wins over agent created from lambda_02 (which plays all the other
         positions)
         """
+        agents = {} if reuse_agents else None
+        return Arena.compare_agents_range(lambda_01, lambda_02, seed, 0,
+                                          games_to_play, agents)
+
+    @staticmethod
+    def compare_agents_range(lambda_01, lambda_02, seed, start, stop, agents=None):
+        """
+        Wins of the agent created from lambda_01 over the games
+        start (inclusive) to stop (exclusive) of compare_agents
+
+        agents is an optional dict holding agents to reset and reuse across
+        games (and calls). Without it every game builds new agents.
+        """
         wins = 0
-        for idx in range(games_to_play):
+        for idx in range(start, stop):
             game = Game.new(4, seed + idx)
-            agent_one = (lambda_01)(seed + idx)
-            agent_two = (lambda_02)(seed + idx)
+            agent_one = Arena._agent_for_game(agents, 0, lambda_01, seed + idx)
+            agent_two = Arena._agent_for_game(agents, 1, lambda_02, seed + idx)
 
             while game.active():
                 if not game.is_current_player_playing():
@@ -68,12 +129,67 @@ class Arena():
         return wins
 
     @staticmethod
-    def compare_agents_float(lambda_01, lambda_02, games_to_play=51, seed=451):
+    def _agent_for_game(agents, key, agent_lambda, seed):
+        """Reset the agent stored under key for a new game, or build it"""
+        if agents is None:
+            return (agent_lambda)(seed)
+        agent = agents.get(key)
+        if agent is not None:
+            try:
+                agent.reset(seed)
+                return agent
+            except NotImplementedError:
+                pass
+        agent = (agent_lambda)(seed)
+        agents[key] = agent
+        return agent
+
+    @staticmethod
+    def compare_pairs(pairs, seeds, games_to_play=51, processes=None, chunk_size=None,
+                      reuse_agents=False):
+        """
+        Returns compare_agents wins for each (lambda_01, lambda_02) pair
+        and its seed, sharding the games over a process pool
+        """
+        processes = multiprocessing.cpu_count() if processes is None else processes
+        if chunk_size is None:
+            units_wanted = processes * 4
+            chunk_size = max(1, -(-len(pairs) * games_to_play // units_wanted))
+
+        units = [(pair_idx, seed, start, min(start + chunk_size, games_to_play))
+                 for pair_idx, seed in enumerate(seeds)
+                 for start in range(0, games_to_play, chunk_size)]
+
+        wins = [0] * len(pairs)
+        if len(units) < 1:
+            return wins
+
+        # fork hands the (possibly unpicklable) lambdas straight to workers
+        context = multiprocessing.get_context(
+            'fork' if 'fork' in multiprocessing.get_all_start_methods() else None)
+        pool = context.Pool(processes, _init_worker, (pairs, reuse_agents))
+        try:
+            for pair_idx, unit_wins in pool.imap_unordered(_play_unit, units):
+                wins[pair_idx] += unit_wins
+        finally:
+            pool.close()
+            pool.join()
+        return wins
+
+    @staticmethod
+    def compare_agents_float(lambda_01, lambda_02, games_to_play=51, seed=451,
+                             processes=1, reuse_agents=False):
         """
         Returns fraction of times agent created from lambda_01
         wins over agent created from lambda_02
         """
-        wins = Arena.compare_agents(lambda_01, lambda_02, games_to_play, seed)
+        if processes > 1:
+            wins = Arena.compare_pairs([(lambda_01, lambda_02)], [seed],
+                                       games_to_play, processes,
+                                       reuse_agents=reuse_agents)[0]
+        else:
+            wins = Arena.compare_agents(lambda_01, lambda_02, games_to_play, seed,
+                                        reuse_agents)
         return wins / games_to_play
 
     def names(self):
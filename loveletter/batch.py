@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+"""
+Love Letter Batch Game object
+Many games stepped in lockstep. Each row of the batch is a compact game record
+(see loveletter.compact.Record) and the rules are resolved with masked numpy
+operations over all rows at once.
+"""
+import numpy as np
+
+from loveletter.card import Card
+from loveletter.compact import CompactGame, Record
+from loveletter.moves import LegalMoves
+
+
+class BatchGame():
+    """
+    N Love Letter Games stored as a 2-D uint8 array of compact records
+
+    Seats that have been eliminated are skipped automatically, so every
+    active game is always waiting on a player that still holds a card.
+    """
+
+    # The 15 action slots used by the env and Agent.valid_actions
+    slot_discards = np.array(LegalMoves.slot_discards)
+    slot_guesses = np.array(LegalMoves.slot_guesses)
+    slot_self = np.array(LegalMoves.slot_self)
+
+    _popcount = np.array([bin(mask).count('1')
+                          for mask in range(1 << Record.max_players)])
+    _card_counts = np.array(Card.counts, dtype=np.float64)
+    _only_self = np.array([card in Card.only_self for card in range(9)])
+    _only_other = np.array([card in Card.only_other for card in range(9)])
+
+    def __init__(self, records):
+        self._records = records
+        self._rows = np.arange(records.shape[0])
+        self._skip_eliminated(self._rows)
+
+    def records(self):
+        """The underlying (N, Record.size) uint8 array"""
+        return self._records
+
+    def __len__(self):
+        return self._records.shape[0]
+
+    def game(self, idx):
+        """A CompactGame copy of a single row"""
+        return CompactGame(bytearray(self._records[idx].tobytes()))
+
+    def games(self):
+        """CompactGame copies of every row"""
+        return [self.game(idx) for idx in range(len(self))]
+
+    def hands(self):
+        """(N, 4) hand card of every seat"""
+        return self._records[:, Record.hands:Record.hands + Record.max_players]
+
+    def turn_index(self):
+        """(N,) overall turn index of each game"""
+        return self._records[:, Record.turn].astype(np.int64)
+
+    def player_turn(self):
+        """(N,) seat of the current player of each game"""
+        return self.turn_index() % self._records[:, Record.player_count]
+
+    def cards_left(self):
+        """(N,) cards left to distribute, not including the held back card"""
+        return Record.deck_size - 1 - self._records[:, Record.deck_pos].astype(np.int64)
+
+    def draw_card(self):
+        """(N,) card available to the current player (No Card if over)"""
+        return np.where(self.cards_left() > 0, self._drawn(), Card.noCard)
+
+    def active(self):
+        """(N,) True if the game is still playing"""
+        return (BatchGame._popcount[self._records[:, Record.alive]] > 1) & \
+            (self.cards_left() > 0)
+
+    def over(self):
+        """(N,) True if the game is over"""
+        return ~self.active()
+
+    def winner(self):
+        """(N,) index of the winning player of each game. -1 if none"""
+        hands = self.hands()
+        winners = np.argmax(hands, axis=1)
+        done = self.over() & (hands.max(axis=1) > Card.noCard)
+        return np.where(done, winners, -1)
+
+    def state_hand(self):
+        """(N, 16) one hot encoded sorted hand and drawn card"""
+        return self.state()[:, 0:16]
+
+    def consumed_cards(self):
+        """(N, 8) fractions of each card seen by the current player"""
+        return self.state()[:, 16:24]
+
+    def state(self):
+        """(N, 24) observation of each game, as Game.state"""
+        return self.state_into(np.empty((len(self), 24)))
+
+    def state_into(self, out):
+        """
+        Write the (N, 24) observations into a preallocated buffer.
+
+        returns out
+        """
+        hand = self._current_hand().astype(np.int64)
+        drawn = self._drawn().astype(np.int64)
+        low = np.minimum(hand, drawn)
+        high = np.maximum(hand, drawn)
+
+        out[:, 0:16] = 0
+        out[self._rows, (low - 1) % 8] = 1
+        out[self._rows, 8 + (high - 1) % 8] = 1
+
+        out[:, 16:24] = self._records[:, Record.discards:Record.discards + 8]
+        for cards in (low, high):
+            held = cards != Card.noCard
+            out[self._rows[held], 15 + cards[held]] += 1
+        out[:, 16:24] /= BatchGame._card_counts
+        return out
+
+    def legal_mask(self):
+        """
+        (N, 15) True where an action slot is playable.
+
+        Slots are ordered as in Agent.valid_actions. Finished games have no
+        playable slot.
+        """
+        index = LegalMoves.index(self._current_hand().astype(np.int64),
+                                 self._drawn().astype(np.int64),
+                                 self._records[:, Record.alive].astype(np.int64),
+                                 self.player_turn())
+        masks = LegalMoves.table()[index]
+        slots = np.arange(LegalMoves.count)
+        return ((masks[:, None] >> slots) & 1 == 1) & self.active()[:, None]
+
+    def slot_actions(self, slots, random_state):
+        """
+        (N, 4) actions for the chosen slot of each game.
+
+        Opponent targets are drawn uniformly from the players still in the game
+        """
+        slots = np.asarray(slots)
+        seat = self.player_turn()
+        opponents = self._opponent_mask(seat)
+        picks = np.floor(random_state.uniform(size=len(self)) *
+                         np.maximum(opponents.sum(axis=1), 1)).astype(np.int64)
+        opponent = np.argmax(np.cumsum(opponents, axis=1) > picks[:, None], axis=1)
+
+        actions = np.zeros((len(self), 4), dtype=np.uint8)
+        actions[:, 0] = BatchGame.slot_discards[slots]
+        actions[:, 1] = np.where(BatchGame.slot_self[slots], seat, opponent)
+        actions[:, 2] = BatchGame.slot_guesses[slots]
+        return actions
+
+    def random_actions(self, random_state):
+        """(N, 4) uniformly random playable action of each game"""
+        mask = self.legal_mask()
+        counts = mask.sum(axis=1)
+        picks = np.floor(random_state.uniform(size=len(self)) *
+                         np.maximum(counts, 1)).astype(np.int64)
+        slots = np.argmax(np.cumsum(mask, axis=1) > picks[:, None], axis=1)
+        return self.slot_actions(slots, random_state)
+
+    def deal(self, rows, decks, player_count=4):
+        """
+        Replace the given rows with brand new games, in place.
+
+        decks is a (len(rows), 16) array of shuffled decks, dealt as Game.new
+        """
+        records = self._records
+        rows = np.asarray(rows)
+        decks = np.asarray(decks, dtype=np.uint8)
+        records[rows] = 0
+        records[rows, player_count:Record.deck_size] = decks[:, player_count:]
+        records[rows, Record.deck_pos] = player_count
+        records[rows, Record.hands:Record.hands + player_count] = decks[:, :player_count]
+        records[rows, Record.player_count] = player_count
+        records[rows, Record.alive] = (1 << player_count) - 1
+
+    def is_action_valid(self, actions):
+        """(N,) tests if each action is valid given its game state"""
+        actions = np.asarray(actions).astype(np.int64)
+        discard, target, guess = actions[:, 0], actions[:, 1], actions[:, 2]
+        seat = self.player_turn()
+        hand = self._current_hand()
+        drawn = self._drawn()
+
+        in_range = (target >= 0) & (target < self._records[:, Record.player_count])
+        target = np.where(in_range, target, 0)
+
+        new_hand = np.where(hand != discard, hand, drawn)
+        valid = ((discard == hand) | (discard == drawn)) & in_range
+        # countess must be discarded if the other card is king/prince
+        valid &= ~((new_hand == Card.countess) &
+                   ((discard == Card.prince) | (discard == Card.king)))
+        valid &= (self._records[:, Record.alive] >> target & 1) == 1
+        # cannot mis-target a card
+        is_self = seat == target
+        card = np.clip(discard, 0, 8)
+        valid &= ~(is_self & BatchGame._only_other[card])
+        valid &= ~(~is_self & BatchGame._only_self[card])
+        # Cannot guess guard or no card
+        valid &= ~((discard == Card.guard) &
+                   ((guess == Card.guard) | (guess == Card.noCard)))
+
+        # if player is out, only valid action is no action
+        blank = (actions == 0).all(axis=1)
+        return np.where(hand == Card.noCard, blank, valid)
+
+    def move(self, actions):
+        """
+        Every current player makes an action, in place.
+
+        Invalid actions (or actions on finished games) leave their game
+        untouched. Returns the (N,) rewards as Game.move
+        """
+        actions = np.asarray(actions).astype(np.int64)
+        turn_index = self.turn_index()
+        valid = self.is_action_valid(actions) & self.active()
+        self._apply(np.flatnonzero(valid), actions[valid])
+
+        rewards = np.where(self.winner() == turn_index, 30, -10)
+        return np.where(self.active(), np.where(valid, 0, -1), rewards)
+
+    def _apply(self, rows, actions):
+        """Apply valid actions to the given rows"""
+        records = self._records
+        discard, target, guess, revealed = actions.T
+        seat = self._records[rows, Record.turn].astype(np.int64) % \
+            records[rows, Record.player_count]
+
+        blank = discard == Card.noCard
+        records[rows[blank], Record.turn] += 1
+        rows, discard, target, guess, revealed, seat = \
+            (arr[~blank] for arr in (rows, discard, target, guess, revealed, seat))
+
+        hand = records[rows, Record.hands + seat].astype(np.int64)
+        pos = records[rows, Record.deck_pos].astype(np.int64)
+        drawn = records[rows, pos].astype(np.int64)
+        hand_new = np.where(hand != discard, hand, drawn)
+        records[rows, Record.deck_pos] = pos + 1
+        defended = (records[rows, Record.defended] >> target & 1) == 1
+        hand_target = records[rows, Record.hands + target].astype(np.int64)
+
+        sel = discard == Card.princess
+        self._force_discard(rows[sel], seat[sel], drawn[sel])
+        self._force_discard(rows[sel], seat[sel], 0)
+
+        sel = discard == Card.priest
+        revealed = np.where(sel & ~defended, hand_target, revealed)
+        revealed = np.where(sel & defended, Card.noCard, revealed)
+
+        # baron failure eliminates the player, logging both cards held
+        sel = (discard == Card.baron) & (hand_new <= hand_target)
+        self._force_discard(rows[sel], seat[sel], hand_new[sel])
+        self._force_discard(rows[sel], seat[sel], 0)
+
+        sel = (discard != Card.princess) & ~sel
+        self._log(rows[sel], seat[sel], discard[sel],
+                  target[sel], guess[sel], revealed[sel])
+        self._set_hand(rows[sel], seat[sel], hand_new[sel])
+
+        sel = (discard == Card.baron) & (hand_new > hand_target) & ~defended
+        sel |= (discard == Card.guard) & (hand_target == guess) & ~defended
+        self._force_discard(rows[sel], target[sel], 0)
+
+        # prince reads the target after the player's own move
+        sel = (discard == Card.prince) & (Record.deck_size - pos - 1 > 1)
+        rows_p, target_p = rows[sel], target[sel]
+        hand_p = records[rows_p, Record.hands + target_p]
+        pos_p = records[rows_p, Record.deck_pos].astype(np.int64)
+        princess = hand_p == Card.princess
+        self._force_discard(rows_p[princess], target_p[princess], 0)
+        redraw = ~princess
+        self._force_discard(rows_p[redraw], target_p[redraw],
+                            records[rows_p[redraw], pos_p[redraw]])
+        records[rows_p[redraw], Record.deck_pos] = pos_p[redraw] + 1
+
+        sel = discard == Card.king
+        self._set_hand(rows[sel], seat[sel], hand_target[sel])
+        self._set_hand(rows[sel], target[sel], hand_new[sel])
+
+        records[rows, Record.turn] += 1
+        self._skip_eliminated(rows)
+
+    def _log(self, rows, seats, discard, target, guess, revealed):
+        """Append an action to each seat's action slots"""
+        records = self._records
+        slot = records[rows, Record.slots + seats].astype(np.int64)
+        if (slot >= Record.action_slots).any():
+            raise Exception("Insufficient space in actions")
+        offset = Record.actions + (seats * Record.action_slots + slot) * 4
+        records[rows, offset] = discard
+        records[rows, offset + 1] = target
+        records[rows, offset + 2] = guess
+        records[rows, offset + 3] = revealed
+        records[rows, Record.slots + seats] = slot + 1
+        counted = discard != Card.noCard
+        records[rows[counted], Record.discards + discard[counted] - 1] += 1
+
+        bit = (1 << seats).astype(np.uint8)
+        mask = records[rows, Record.defended]
+        records[rows, Record.defended] = np.where(
+            discard == Card.handmaid, mask | bit, mask & ~bit)
+
+    def _set_hand(self, rows, seats, cards):
+        """Set each seat's hand card, keeping the alive mask in sync"""
+        records = self._records
+        records[rows, Record.hands + seats] = cards
+        bit = (1 << seats).astype(np.uint8)
+        mask = records[rows, Record.alive]
+        records[rows, Record.alive] = np.where(
+            cards == Card.noCard, mask & ~bit, mask | bit)
+
+    def _force_discard(self, rows, seats, new_cards):
+        """Each seat discards its hand card without effect"""
+        hands = self._records[rows, Record.hands + seats]
+        self._log(rows, seats, hands, 0, 0, 0)
+        self._set_hand(rows, seats, np.broadcast_to(new_cards, rows.shape))
+
+    def _skip_eliminated(self, rows):
+        """Advance the turn of active games past eliminated seats"""
+        records = self._records
+        for _ in range(Record.max_players):
+            alive = records[rows, Record.alive]
+            active = (BatchGame._popcount[alive] > 1) & \
+                (records[rows, Record.deck_pos] < Record.deck_size - 1)
+            rows, alive = rows[active], alive[active]
+            seat = records[rows, Record.turn].astype(np.int64) % \
+                records[rows, Record.player_count]
+            rows = rows[(alive >> seat & 1) == 0]
+            if len(rows) == 0:
+                return
+            records[rows, Record.turn] += 1
+
+    def _drawn(self):
+        """(N,) top card of each deck, even if the game is over"""
+        return self._records[self._rows, self._records[:, Record.deck_pos]]
+
+    def _current_hand(self):
+        """(N,) hand card of the current player of each game"""
+        return self._records[self._rows, Record.hands + self.player_turn()]
+
+    def _opponent_mask(self, seat):
+        """(N, 4) True for seats that can be targeted by the current player"""
+        seats = np.arange(Record.max_players)
+        alive = (self._records[:, Record.alive][:, None] >> seats & 1) == 1
+        return alive & (seats[None, :] != seat[:, None])
+
+    @staticmethod
+    def from_games(games):
+        """Stack Game or CompactGame objects into a batch"""
+        records = [game.record() if isinstance(game, CompactGame)
+                   else CompactGame.from_game(game).record() for game in games]
+        return BatchGame(np.frombuffer(b''.join(records), dtype=np.uint8)
+                         .reshape(len(records), Record.size).copy())
+
+    @staticmethod
+    def new(seeds, player_count=4):
+        """Create a batch of brand new games, one per seed"""
+        return BatchGame.from_games([CompactGame.new(player_count, seed)
+                                     for seed in seeds])
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+Love Letter Belief State
+What one player can infer about the hidden hand of each opponent.
+"""
+import numpy as np
+
+from loveletter.card import Card
+from loveletter.player import PlayerTools
+
+# bitmasks of the cards up to (and including) a card
+_UP_TO = tuple(sum(1 << card for card in range(1, top + 1)) for top in range(9))
+
+
+class BeliefState():
+    """
+    Posterior over each opponent's hand card, seen from one seat.
+
+    Call update with every game that follows the last one (one move at a
+    time, including the skip of an eliminated player). Each update only
+    looks at what that move changed, so it costs O(1).
+
+    Tracked per opponent:
+
+    * a known card, from this player's priests, its own king swaps, or a
+      card the opponent has kept since
+    * a mask of cards ruled out, by failed guard guesses and by the card a
+      baron beat; it is cleared whenever the opponent draws a new card
+
+    The posterior of an opponent is the pool of cards not yet discarded,
+    less this player's own cards and the known cards of other opponents,
+    restricted to the cards not ruled out. Opponents are treated as
+    independent, so it is a marginal rather than the exact joint.
+
+    A failed baron is logged without its target, so that duel teaches
+    nothing here.
+    """
+
+    def __init__(self, game, seat):
+        self.seat = seat
+        self._game = game
+        player_count = len(game.players())
+        self._known = [Card.noCard] * player_count
+        self._excluded = [0] * player_count
+        self._lengths = [BeliefState._log_length(player) for player in game.players()]
+        # cards not discarded, including this player's own and the held card
+        self._pool = [0] * 9
+        for card in game.deck():
+            self._pool[card] += 1
+        for player in game.players():
+            self._pool[player.hand_card] += 1
+        self._pool[Card.noCard] = 0
+
+    def game(self):
+        """Last game seen"""
+        return self._game
+
+    def known(self, seat):
+        """Hand card of a seat if it is known, otherwise Card.noCard"""
+        if seat == self.seat:
+            return self._game.players()[seat].hand_card
+        return self._known[seat]
+
+    def excluded(self, seat):
+        """Bitmask (bit per card id) of the cards ruled out for a seat"""
+        return self._excluded[seat]
+
+    def unseen(self):
+        """Count of each card (indexed by card id) this player has not seen"""
+        counts = self._pool[:]
+        game = self._game
+        counts[game.players()[self.seat].hand_card] -= 1
+        if game.player_turn() == self.seat and game.active():
+            counts[game.deck()[0]] -= 1
+        counts[Card.noCard] = 0
+        return counts
+
+    def posterior(self, seat):
+        """(9,) probability of each card id being the hand of a seat"""
+        result = np.zeros(9)
+        players = self._game.players()
+        if not PlayerTools.is_playing(players[seat]):
+            return result
+        card = self.known(seat)
+        if card != Card.noCard:
+            result[card] = 1
+            return result
+
+        counts = self.unseen()
+        for other, card in enumerate(self._known):
+            if other != seat and card != Card.noCard and \
+                    PlayerTools.is_playing(players[other]):
+                counts[card] -= 1
+        excluded = self._excluded[seat]
+        for card in range(1, 9):
+            if counts[card] > 0 and not excluded >> card & 1:
+                result[card] = counts[card]
+        total = result.sum()
+        if total == 0:
+            # everything is ruled out, so a constraint no longer holds
+            for card in range(1, 9):
+                result[card] = max(counts[card], 0)
+            total = result.sum()
+        return result / total if total else result
+
+    def update(self, game):
+        """Take in the move from the last game seen to game"""
+        previous = self._game
+        self._game = game
+        players_before = previous.players()
+        players = game.players()
+        mover = previous.player_turn()
+        if not PlayerTools.is_playing(players_before[mover]):
+            return
+
+        new_entries = self._new_entries(players)
+        entries = new_entries.pop(mover)
+        if not PlayerTools.is_playing(players[mover]):
+            # princess or failed baron: both cards end up discarded
+            self._pool[players_before[mover].hand_card] -= 1
+            self._pool[previous.deck()[0]] -= 1
+            self._forget(mover)
+        else:
+            hand = players_before[mover].hand_card
+            discard = entries[0].discard
+            self._pool[discard] -= 1
+            if self._known[mover] == discard:
+                self._known[mover] = Card.noCard
+            self._excluded[mover] = 0
+            self._resolve(previous, game, mover, entries[0],
+                          previous.deck()[0] if discard == hand else hand, new_entries)
+            # a prince at oneself discards the kept card too
+            for action in entries[1:]:
+                self._pool[action.discard] -= 1
+                self._forget(mover)
+
+        # forced discards of other players (guard, baron, prince)
+        for seat, entries in new_entries.items():
+            for action in entries:
+                self._pool[action.discard] -= 1
+            self._forget(seat)
+
+    def _resolve(self, previous, game, mover, entry, kept, new_entries):
+        """Knowledge from the effect of a mover's action"""
+        target = entry.player_target
+        target_playing = PlayerTools.is_playing(game.players()[target])
+
+        if entry.discard == Card.guard:
+            if target_playing and target != self.seat and \
+                    not PlayerTools.is_defended(previous.players()[target]):
+                self._excluded[target] |= 1 << entry.guess
+
+        elif entry.discard == Card.priest:
+            if mover == self.seat and entry.revealed_card != Card.noCard:
+                self._known[target] = entry.revealed_card
+
+        elif entry.discard == Card.baron:
+            if not target_playing and mover != self.seat:
+                # the mover kept a card above the one it knocked out
+                self._excluded[mover] |= _UP_TO[new_entries[target][-1].discard]
+
+        elif entry.discard == Card.king and target != mover:
+            if mover == self.seat:
+                self._known[target] = int(kept)
+            elif target == self.seat:
+                self._known[mover] = int(previous.players()[target].hand_card)
+                self._excluded[mover] = 0
+            else:
+                self._known[mover], self._known[target] = \
+                    self._known[target], self._known[mover]
+                self._excluded[mover], self._excluded[target] = \
+                    self._excluded[target], self._excluded[mover]
+
+    def _new_entries(self, players):
+        """{seat: new log entries}, advancing the log lengths"""
+        changed = {}
+        for seat, player in enumerate(players):
+            start = self._lengths[seat]
+            end = start
+            actions = player.actions
+            while end < len(actions) and actions[end].discard != Card.noCard:
+                end += 1
+            if end != start:
+                changed[seat] = actions[start:end]
+                self._lengths[seat] = end
+        return changed
+
+    def _forget(self, seat):
+        """The seat holds a new (or no) card"""
+        self._known[seat] = Card.noCard
+        self._excluded[seat] = 0
+
+    @staticmethod
+    def _log_length(player):
+        """Number of actions logged by a player"""
+        for idx, action in enumerate(player.actions):
+            if action.discard == Card.noCard:
+                return idx
+        return len(player.actions)
@@ -4,8 +4,13 @@ Love Letter Card tools
 Functions and constants to facilitate working with cards, which are represented as integers.
 """
 
+import threading
+
 import numpy as np
 
+# one reusable generator per thread for seeded shuffles
+_LOCAL = threading.local()
+
 
 class Card():
     """Static Card class"""
@@ -58,13 +63,57 @@ class Card():
         return str_base.format(numbered_names[card])
 
     @staticmethod
-    def shuffle_deck(seed=451):
-        """A numpy array of shuffled cards"""
-        deck = []
-        for card_number, card_count in enumerate(Card.counts):
-            card_id = card_number + 1
-            deck = deck + [card_id] * card_count
-        deck_np = np.array(deck)
-        np.random.seed(seed=seed)
-        np.random.shuffle(deck_np)
+    def shuffle_deck(seed=451, random_state=None):
+        """
+        A numpy array of shuffled cards
+
+        Shuffled with random_state (a numpy RandomState or Generator) if given,
+        otherwise with a generator seeded by seed. The global numpy generator
+        is never touched. Seeds held by the deal bank set with set_deal_bank
+        are read from it instead.
+        """
+        if random_state is None:
+            bank = _DEAL_BANK[0]
+            if bank is not None and 0 <= seed < len(bank):
+                return bank.deck(seed)
+            random_state = Card._seeded_random_state(seed)
+        deck_np = _DECK.copy()
+        random_state.shuffle(deck_np)
         return deck_np
+
+    @staticmethod
+    def shuffle_decks(count, random_state):
+        """
+        (count, 16) uint8 matrix of shuffled decks, one per row.
+
+        All rows are drawn at once from random_state (a numpy RandomState or
+        Generator), by sorting a matrix of uniforms. The rows differ from
+        what shuffle_deck would give for the same generator.
+        """
+        order = np.argsort(random_state.uniform(size=(count, len(_DECK))), axis=1)
+        return _DECK.astype(np.uint8)[order]
+
+    @staticmethod
+    def set_deal_bank(bank):
+        """
+        Have shuffle_deck(seed) read the decks of a DealBank (see
+        loveletter.deals) for the seeds it holds, None to stop
+        """
+        _DEAL_BANK[0] = bank
+
+    @staticmethod
+    def _seeded_random_state(seed):
+        """This thread's RandomState, reseeded"""
+        random_state = getattr(_LOCAL, 'random_state', None)
+        if random_state is None:
+            random_state = np.random.RandomState()
+            _LOCAL.random_state = random_state
+        random_state.seed(seed)
+        return random_state
+
+
+# the full deck in card order, shuffled by shuffle_deck
+_DECK = np.array([card_number + 1 for card_number, card_count in enumerate(Card.counts)
+                  for _ in range(card_count)])
+# DealBank read by shuffle_deck, if any
+_DEAL_BANK = [None]
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Love Letter CFR Tables
+Information set abstraction and the regret / strategy tables of CFR.
+"""
+import numpy as np
+
+from loveletter.card import Card
+from loveletter.moves import LegalMoves
+from loveletter.player import PlayerTools
+
+
+def sample_index(probs, random_state):
+    """Index drawn from a probability vector with a random.Random"""
+    draw = random_state.random()
+    total = 0.0
+    for idx, prob in enumerate(probs):
+        total += prob
+        if draw < total:
+            return idx
+    return len(probs) - 1
+
+
+class InfoSet():
+    """
+    Abstraction of what the current player knows, packed into one integer.
+
+    Kept: the two cards held (unordered), the discard histogram, the card
+    seen with this player's last priest (while it is likely still held)
+    and the number of opponents left. Dropped: who discarded what and when,
+    and handmaid protection.
+    """
+
+    @staticmethod
+    def key(game):
+        """(key, seat of the revealed opponent or None) of the current player"""
+        low, high = sorted((int(game.player().hand_card), int(game.deck()[0])))
+        key = low * 9 + high
+        discards = game.discard_counts()
+        for card in range(1, 9):
+            # the log of a failed baron can count one card too many
+            key = key * (Card.counts[card - 1] + 1) + min(discards[card],
+                                                          Card.counts[card - 1])
+        seat, revealed = InfoSet.reveal(game)
+        return (key * 9 + revealed) * 4 + len(game.opponent_turn()), seat
+
+    @staticmethod
+    def reveal(game):
+        """
+        (seat, card) seen with the current player's last action, a priest.
+
+        The card counts as still held if its holder is in the game and has
+        not discarded that card (or a king) since. (None, 0) otherwise.
+        """
+        players = game.players()
+        last = InfoSet._last_action(players[game.player_turn()])
+        if last is None or last.discard != Card.priest or \
+                last.revealed_card == Card.noCard:
+            return None, Card.noCard
+        target = players[last.player_target]
+        since = InfoSet._last_action(target)
+        if not PlayerTools.is_playing(target) or \
+                (since is not None and since.discard in (last.revealed_card, Card.king)):
+            return None, Card.noCard
+        return last.player_target, int(last.revealed_card)
+
+    @staticmethod
+    def action(game, slot, seat, random_state):
+        """
+        PlayerAction of a slot, aimed at the revealed seat if it is still in
+        the game, otherwise at an opponent drawn from random_state (a
+        random.Random)
+        """
+        if LegalMoves.slot_self[slot]:
+            return LegalMoves.action(slot, game.player_turn())
+        opponents = game.opponent_turn()
+        if seat not in opponents:
+            seat = random_state.choice(opponents)
+        return LegalMoves.action(slot, seat)
+
+    @staticmethod
+    def _last_action(player):
+        """Last logged action of a player, None if there is none"""
+        last = None
+        for action in player.actions:
+            if action.discard == Card.noCard:
+                break
+            last = action
+        return last
+
+
+class StrategyTable():
+    """
+    Cumulative regrets and strategies of every information set met.
+
+    Rows are (LegalMoves.count,) float64 vectors, one per key, allocated
+    on first use and grown by doubling. Files (save / load) hold the keys
+    and float32 copies of both tables.
+    """
+
+    def __init__(self, capacity=1024):
+        self._rows = {}
+        self.regrets = np.zeros((capacity, LegalMoves.count))
+        self.strategy = np.zeros((capacity, LegalMoves.count))
+
+    def __len__(self):
+        return len(self._rows)
+
+    def keys(self):
+        """Keys in row order"""
+        return sorted(self._rows, key=self._rows.get)
+
+    def row(self, key):
+        """Row of a key, allocated if new"""
+        row = self._rows.get(key)
+        if row is None:
+            row = len(self._rows)
+            if row == len(self.regrets):
+                self.regrets = np.concatenate([self.regrets, np.zeros_like(self.regrets)])
+                self.strategy = np.concatenate([self.strategy, np.zeros_like(self.strategy)])
+            self._rows[key] = row
+        return row
+
+    def current(self, row, slots):
+        """Regret matching strategy of a row over the given slots"""
+        positive = np.maximum(self.regrets[row, slots], 0)
+        total = positive.sum()
+        if total > 0:
+            return positive / total
+        return np.full(len(slots), 1.0 / len(slots))
+
+    def average(self, key, slots):
+        """Average strategy of a key over the given slots, uniform if unseen"""
+        row = self._rows.get(key)
+        if row is not None:
+            weights = self.strategy[row, slots]
+            total = weights.sum()
+            if total > 0:
+                return weights / total
+        return np.full(len(slots), 1.0 / len(slots))
+
+    def since(self, base):
+        """(keys, regrets, strategy) added to this table since it was a copy of base"""
+        keys = self.keys()
+        regrets = self.regrets[:len(keys)].copy()
+        strategy = self.strategy[:len(keys)].copy()
+        rows = len(base)
+        regrets[:rows] -= base.regrets[:rows]
+        strategy[:rows] -= base.strategy[:rows]
+        return keys, regrets, strategy
+
+    def add(self, keys, regrets, strategy):
+        """Add regrets and strategy sums, row by row of keys"""
+        rows = np.array([self.row(key) for key in keys], dtype=np.int64)
+        if len(rows):
+            self.regrets[rows] += regrets
+            self.strategy[rows] += strategy
+
+    def copy(self):
+        """Independent copy of the table"""
+        table = StrategyTable(len(self.regrets))
+        table._rows = dict(self._rows)
+        table.regrets = self.regrets.copy()
+        table.strategy = self.strategy.copy()
+        return table
+
+    def save(self, path):
+        """Write the table to an .npz file"""
+        count = len(self._rows)
+        np.savez(path, keys=np.array(self.keys(), dtype=np.int64),
+                 regrets=self.regrets[:count].astype(np.float32),
+                 strategy=self.strategy[:count].astype(np.float32))
+
+    @staticmethod
+    def load(path):
+        """Read a table written by save"""
+        with np.load(path) as arrays:
+            keys = arrays["keys"]
+            table = StrategyTable(max(len(keys), 1))
+            table.add(keys.tolist(), arrays["regrets"].astype(np.float64),
+                      arrays["strategy"].astype(np.float64))
+        return table
@@ -0,0 +1,490 @@
+# -*- coding: utf-8 -*-
+"""
+Love Letter Compact Game object
+The whole game is stored in one fixed-size uint8 record, so a move is a
+single small buffer copy instead of new Game, Player and PlayerAction objects.
+"""
+import numpy as np
+
+from loveletter.card import Card
+from loveletter.game import Game
+from loveletter.player import Player, PlayerActionTable, PlayerActionTools
+
+
+class Record():
+    """Static layout of a compact game record (offsets into a uint8 buffer)"""
+    max_players = 4
+    action_slots = 8
+    deck_size = 16
+
+    # deck cards are right aligned, deck_pos points at the next card to draw
+    deck = 0
+    deck_pos = 16
+    # hand card of each seat
+    hands = 17
+    # actions of each seat, 8 slots of (discard, target, guess, revealed)
+    actions = 21
+    turn = 149
+    player_count = 150
+    # bitmask of seats still holding a card
+    alive = 151
+    # bitmask of seats whose last discard was a handmaid
+    defended = 152
+    # next empty action slot of each seat
+    slots = 153
+    # number of each card (1-8) discarded so far
+    discards = 157
+
+    size = 165
+
+    @staticmethod
+    def action_offset(seat, slot):
+        """Offset of an action slot for a seat"""
+        return Record.actions + (seat * Record.action_slots + slot) * 4
+
+    @staticmethod
+    def log(record, seat, discard, target=0, guess=0, revealed=0):
+        """Append an action to a seat's action slots"""
+        slot = record[Record.slots + seat]
+        if slot >= Record.action_slots:
+            raise Exception("Insufficient space in actions")
+        offset = Record.action_offset(seat, slot)
+        record[offset] = discard
+        record[offset + 1] = target
+        record[offset + 2] = guess
+        record[offset + 3] = revealed
+        record[Record.slots + seat] = slot + 1
+        if discard != Card.noCard:
+            record[Record.discards + discard - 1] += 1
+
+        bit = 1 << seat
+        if discard == Card.handmaid:
+            record[Record.defended] |= bit
+        else:
+            record[Record.defended] &= ~bit & 0xFF
+
+    @staticmethod
+    def set_hand(record, seat, card):
+        """Set a seat's hand card, keeping the alive mask in sync"""
+        record[Record.hands + seat] = card
+        bit = 1 << seat
+        if card == Card.noCard:
+            record[Record.alive] &= ~bit & 0xFF
+        else:
+            record[Record.alive] |= bit
+
+    @staticmethod
+    def force_discard(record, seat, new_card=Card.noCard):
+        """Seat discards its hand card without effect and takes new_card"""
+        Record.log(record, seat, record[Record.hands + seat])
+        Record.set_hand(record, seat, new_card)
+
+    @staticmethod
+    def apply(record, action):
+        """
+        Apply a (valid) action to the record in place.
+
+        Mirrors the rules in Game._move, including which cards are logged
+        """
+        count = record[Record.player_count]
+        turn = record[Record.turn]
+        seat = turn % count
+        discard = action.discard
+
+        if discard == Card.noCard:
+            record[Record.turn] = turn + 1
+            return
+
+        target = action.player_target
+        hand = record[Record.hands + seat]
+        pos = record[Record.deck_pos]
+        drawn = record[pos]
+        hand_new = hand if hand != discard else drawn
+        pos += 1
+        record[Record.deck_pos] = pos
+
+        if discard == Card.princess:
+            Record.force_discard(record, seat, drawn)
+            Record.force_discard(record, seat)
+
+        elif discard == Card.priest:
+            revealed = Card.noCard if record[Record.defended] >> target & 1 \
+                else record[Record.hands + target]
+            Record.log(record, seat, discard, target, action.guess, revealed)
+            Record.set_hand(record, seat, hand_new)
+
+        elif discard == Card.baron:
+            card_target = record[Record.hands + target]
+            if hand_new > card_target:
+                Record.log(record, seat, discard, target,
+                           action.guess, action.revealed_card)
+                Record.set_hand(record, seat, hand_new)
+                if not record[Record.defended] >> target & 1:
+                    Record.force_discard(record, target)
+            else:
+                # player is eliminated, logging both cards held
+                Record.force_discard(record, seat, hand_new)
+                Record.force_discard(record, seat)
+
+        else:
+            Record.log(record, seat, discard, target,
+                       action.guess, action.revealed_card)
+            Record.set_hand(record, seat, hand_new)
+
+            if discard == Card.guard:
+                if record[Record.hands + target] == action.guess and \
+                        not record[Record.defended] >> target & 1:
+                    Record.force_discard(record, target)
+
+            elif discard == Card.prince:
+                # if there are no more cards, this has no effect
+                if Record.deck_size - pos > 1:
+                    if record[Record.hands + target] == Card.princess:
+                        Record.force_discard(record, target)
+                    else:
+                        Record.force_discard(record, target, record[pos])
+                        record[Record.deck_pos] = pos + 1
+
+            elif discard == Card.king:
+                Record.set_hand(record, seat, record[Record.hands + target])
+                Record.set_hand(record, target, hand_new)
+
+            elif discard != Card.handmaid and discard != Card.countess:
+                raise NotImplementedError("Missing game logic")
+
+        record[Record.turn] = turn + 1
+
+
+_CARD_COUNTS = np.array(Card.counts, dtype=np.float64)
+
+# number of set bits for every alive mask
+_POPCOUNT = tuple(bin(mask).count('1') for mask in range(1 << Record.max_players))
+
+
+class CompactGame():
+    """A Love Letter Game backed by a fixed-size uint8 record"""
+
+    def __init__(self, record):
+        self._record = record
+
+    def record(self):
+        """Immutable copy of the underlying record"""
+        return bytes(self._record)
+
+    def to_np(self):
+        """The record as a numpy uint8 array"""
+        return np.frombuffer(bytes(self._record), dtype=np.uint8)
+
+    def players(self):
+        """List of current players."""
+        return [self._player(idx) for idx in range(self.player_count())]
+
+    def player_count(self):
+        """Number of seats in the game"""
+        return self._record[Record.player_count]
+
+    def deck(self):
+        """
+        Numpy array of current cards.
+
+        NOTE: The LAST card [-1] is always held out
+        """
+        return np.array(list(self._record[self._record[Record.deck_pos]:Record.deck_size]))
+
+    def draw_card(self):
+        """
+        Card currently available to the next player.
+
+        Only valid if the game is not over (otherwise No Card)
+        """
+        return self._record[self._record[Record.deck_pos]] \
+            if self.cards_left() > 0 else Card.noCard
+
+    def held_card(self):
+        """
+        Card withheld from the game
+        """
+        return self._record[Record.deck_size - 1]
+
+    def turn_index(self):
+        """
+        Overall turn index of the game.
+
+        This points to the actual action number
+        """
+        return self._record[Record.turn]
+
+    def round(self):
+        """Current round number."""
+        return self.turn_index() // self.player_count()
+
+    def player_turn(self):
+        """Player number of current player."""
+        return self.turn_index() % self.player_count()
+
+    def is_winner(self, idx):
+        """True iff that player has won the game"""
+        if self.active() or not self._is_playing(idx):
+            return False
+        hand_card = self._record[Record.hands + idx]
+        return all(self._record[Record.hands + other] <= hand_card
+                   for other in range(self.player_count()))
+
+    def winner(self):
+        """Return the index of the winning player. -1 if none"""
+        if self.active():
+            return -1
+        hands = self._record[Record.hands:Record.hands + self.player_count()]
+        best = max(hands)
+        return hands.index(best) if best != Card.noCard else -1
+
+    def player(self):
+        """Returns the current player"""
+        return self._player(self.player_turn())
+
+    def opponents(self):
+        """Returns the opposing players"""
+        return [self._player(idx) for idx in self.opponent_turn()]
+
+    def opponent_turn(self):
+        """Returns the opposing players indices"""
+        player_turn = self.player_turn()
+        return [idx for idx in range(self.player_count())
+                if idx != player_turn and self._is_playing(idx)]
+
+    def alive_mask(self):
+        """Bitmask of the players still holding a card"""
+        return self._record[Record.alive]
+
+    def defended_mask(self):
+        """Bitmask of the players protected by a handmaid"""
+        return self._record[Record.defended]
+
+    def cards_left(self):
+        """
+        Number of cards left in deck to distribute
+
+        Does not include the held back card
+        """
+        return Record.deck_size - self._record[Record.deck_pos] - 1
+
+    def active(self):
+        """Return True if the game is still playing"""
+        return _POPCOUNT[self._record[Record.alive]] > 1 and self.cards_left() > 0
+
+    def over(self):
+        """Return True if the game is over"""
+        return not self.active()
+
+    def is_current_player_playing(self):
+        """True if the current player has not been eliminated"""
+        return self._is_playing(self.player_turn())
+
+    def skip_eliminated_player(self, throw=False):
+        """If the current player is eliminated, skip to next"""
+        if self.is_current_player_playing():
+            return self
+        return self._move(PlayerActionTools.blank(), throw)
+
+    def state_hand(self):
+        """
+        Grab whats in players hand and record it as a one hot encoded array.
+        The result is a 16 length binary one hot encoded array
+        """
+        cardnumbers = sorted([self._record[Record.hands + self.player_turn()],
+                              self._record[self._record[Record.deck_pos]]])
+        state = np.zeros(16)
+        # a missing card (0) wraps to the last slot, as in Game.state_hand
+        state[(cardnumbers[0] - 1) % 8] = 1
+        state[8 + (cardnumbers[1] - 1) % 8] = 1
+        return state
+
+    def consumed_cards(self):
+        """
+        Looks at discarded cards and returns probabilities of outstanding cards.
+        """
+        return self.state_into(np.empty(24))[16:24]
+
+    def state(self):
+        """
+        Combines player hand and remaining cards into one array.
+
+        returns numpy float 1d of length 24
+        """
+        return self.state_into(np.empty(24))
+
+    def state_into(self, out):
+        """
+        Write the observation of Game.state into out (length 24, eg a row of
+        a batch matrix) without allocating.
+
+        returns out
+        """
+        record = self._record
+        card_number1 = record[Record.hands + self.player_turn()]
+        card_number2 = record[record[Record.deck_pos]]
+        if card_number2 < card_number1:
+            card_number1, card_number2 = card_number2, card_number1
+
+        out[0:16] = 0
+        out[(card_number1 - 1) % 8] = 1
+        out[8 + (card_number2 - 1) % 8] = 1
+
+        out[16:24] = record[Record.discards:Record.discards + 8]
+        if card_number1 != Card.noCard:
+            out[15 + card_number1] += 1
+        if card_number2 != Card.noCard:
+            out[15 + card_number2] += 1
+        out[16:24] /= _CARD_COUNTS
+        return out
+
+    def _reward(self, game, action):
+        """
+        Record current reward.
+        """
+        if game.active():
+            if self.is_action_valid(action):
+                return 0
+            return -1
+        elif game.winner() == self.turn_index():
+            return 30
+        return -10
+
+    def move(self, action, throw=False):
+        """Current player makes an action.
+
+        Returns (NewGame and Reward)<CompactGame,int>
+        """
+        game = self._move(action, throw)
+        return game, self._reward(game, action)
+
+    def move_id(self, action_id, throw=False):
+        """Current player makes the action of a PlayerActionTable id.
+
+        Returns (NewGame and Reward)<CompactGame,int>
+        """
+        return self.move(PlayerActionTable.action(action_id), throw)
+
+    def _move(self, action, throw=False):
+        """Current player makes an action.
+
+        Returns NewGame<CompactGame>"""
+        if self.over() or not self.is_action_valid(action):
+            return self._invalid_input(throw)
+
+        record = bytearray(self._record)
+        Record.apply(record, action)
+        return CompactGame(record)
+
+    def is_action_valid(self, action):
+        """Tests if an action is valid given the current game state"""
+        record = self._record
+        player_turn = self.player_turn()
+        hand_card = record[Record.hands + player_turn]
+
+        # if player is out, only valid action is no action
+        if hand_card == Card.noCard:
+            return PlayerActionTools.is_blank(action)
+
+        if not 0 <= action.player_target < self.player_count():
+            raise IndexError("Player target out of range")
+
+        draw_card = record[record[Record.deck_pos]]
+
+        # cannot discard a card not in the hand
+        if action.discard != hand_card and action.discard != draw_card:
+            return False
+
+        new_hand_card = hand_card if hand_card != action.discard else draw_card
+
+        # countess must be discarded if the other card is king/prince
+        if new_hand_card == Card.countess and \
+                (action.discard == Card.prince or action.discard == Card.king):
+            return False
+
+        # cannot target an invalid player
+        if not self._is_playing(action.player_target):
+            return False
+
+        # cannot mis-target a card
+        if player_turn == action.player_target and action.discard in Card.only_other:
+            return False
+        if player_turn != action.player_target and action.discard in Card.only_self:
+            return False
+
+        # Cannot guess guard or no card
+        if action.discard == Card.guard and (
+                action.guess == Card.guard or action.guess == Card.noCard):
+            return False
+
+        return True
+
+    def _is_playing(self, idx):
+        """True iff the seat still holds a card"""
+        return self._record[Record.alive] >> idx & 1 == 1
+
+    def _player(self, idx):
+        """Build a Player tuple for a seat"""
+        record = self._record
+        actions = []
+        for slot in range(Record.action_slots):
+            offset = Record.action_offset(idx, slot)
+            actions.append(PlayerActionTable.get(*record[offset:offset + 4]))
+        return Player(record[Record.hands + idx], actions)
+
+    def _invalid_input(self, throw):
+        """Throw if true, otherwise return current game"""
+        if throw:
+            raise Exception("Invalid Move")
+        return self
+
+    def to_str(self):
+        """Returns a string[] representation of the game"""
+        return self.to_game().to_str()
+
+    def to_game(self):
+        """Convert into an equivalent Game object"""
+        return Game(self.deck(), self.players(), self.turn_index())
+
+    @staticmethod
+    def from_game(game):
+        """Convert a Game object into a CompactGame"""
+        players = game.players()
+        deck = game.deck()
+        if len(players) > Record.max_players:
+            raise ValueError("At most {} players are supported".format(
+                Record.max_players))
+        if len(deck) > Record.deck_size:
+            raise ValueError("At most {} deck cards are supported".format(
+                Record.deck_size))
+
+        record = bytearray(Record.size)
+        pos = Record.deck_size - len(deck)
+        record[pos:Record.deck_size] = bytes(int(card) for card in deck)
+        record[Record.deck_pos] = pos
+        record[Record.turn] = game.turn_index()
+        record[Record.player_count] = len(players)
+        record[Record.discards:Record.discards + 8] = \
+            bytes(Game.count_discards(players)[1:9])
+
+        for seat, player in enumerate(players):
+            Record.set_hand(record, seat, int(player.hand_card))
+            offset = Record.action_offset(seat, 0)
+            actions = PlayerActionTools.to_np_many(player.actions)
+            record[offset:offset + len(actions)] = actions.tobytes()
+
+            # the next slot is the first blank one, as in PlayerTools.move
+            slot = 0
+            while slot < len(player.actions) and \
+                    player.actions[slot].discard != Card.noCard:
+                slot += 1
+            record[Record.slots + seat] = slot
+            if slot > 0 and player.actions[slot - 1].discard == Card.handmaid:
+                record[Record.defended] |= 1 << seat
+
+        return CompactGame(record)
+
+    @staticmethod
+    def new(player_count=4, seed=451, random_state=None):
+        """Create a brand new game"""
+        return CompactGame.from_game(Game.new(player_count, seed, random_state))
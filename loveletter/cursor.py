@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Love Letter Game Cursor
+A compact game moved in place, with every move undoable.
+"""
+from loveletter.compact import CompactGame, Record
+from loveletter.moves import LegalMoves
+from loveletter.player import PlayerActionTable, PlayerActionTools
+
+# a move only changes the deck position, the hands, the turn and the
+# counters after it, besides the action slots it fills
+_HEAD = slice(Record.deck_pos, Record.hands + Record.max_players)
+_TAIL = slice(Record.turn, Record.size)
+_HEAD_SIZE = _HEAD.stop - _HEAD.start
+# position of the action slot counters in an undo entry
+_UNDO_SLOTS = _HEAD_SIZE + Record.slots - Record.turn
+
+
+class GameCursor(CompactGame):
+    """
+    A CompactGame changed in place by make() and restored by unmake().
+
+    Each make pushes a 21 byte undo entry (the header and counters of the
+    record before the move). unmake puts them back and clears the action
+    slots the move filled, so the record is restored byte for byte. No Game,
+    Player or record is allocated per node, which suits depth first search:
+
+        cursor.make(action)
+        ... search below ...
+        cursor.unmake()
+
+    make trusts its action to be valid (see is_action_valid). Every query of
+    CompactGame reads the current position, and to_game / record take a
+    copy of it.
+    """
+
+    def __init__(self, record):
+        super().__init__(bytearray(record))
+        self._undo = []
+
+    @staticmethod
+    def from_game(game):
+        """Cursor at the position of a Game object"""
+        return GameCursor(CompactGame.from_game(game).record())
+
+    def depth(self):
+        """Number of moves that can be undone"""
+        return len(self._undo)
+
+    def make(self, action):
+        """Play a valid action in place"""
+        record = self._record
+        self._undo.append(record[_HEAD] + record[_TAIL])
+        Record.apply(record, action)
+
+    def make_id(self, action_id):
+        """Play the valid action of a PlayerActionTable id in place"""
+        self.make(PlayerActionTable.action(action_id))
+
+    def skip(self):
+        """Move past the current player if it is eliminated, True if it was"""
+        if self.is_current_player_playing():
+            return False
+        self.make(PlayerActionTools.blank())
+        return True
+
+    def unmake(self):
+        """Undo the last make"""
+        record = self._record
+        undo = self._undo.pop()
+        for seat in range(record[Record.player_count]):
+            start = undo[_UNDO_SLOTS + seat]
+            stop = record[Record.slots + seat]
+            if stop != start:
+                record[Record.action_offset(seat, start):
+                       Record.action_offset(seat, stop)] = bytes(4 * (stop - start))
+        record[_HEAD] = undo[:_HEAD_SIZE]
+        record[_TAIL] = undo[_HEAD_SIZE:]
+
+    def legal_mask(self):
+        """15-bit mask of the legal LegalMoves slots of the current player"""
+        record = self._record
+        seat = self.player_turn()
+        return LegalMoves.mask(record[Record.hands + seat], record[record[Record.deck_pos]],
+                               record[Record.alive], seat)
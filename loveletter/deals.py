@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Love Letter Deal Bank
+Decks indexed by seed, precomputed once and read back by index.
+"""
+import numpy as np
+
+from loveletter.card import Card
+
+
+class DealBank():
+    """
+    A (count, 16) uint8 matrix of decks, row seed holding the deck of seed.
+
+    A bank built by seeded() holds exactly the decks of Card.shuffle_deck
+    (and so of Game.new) for seeds 0 to count - 1, so using it changes no
+    game. One built by generated() draws all rows at once with
+    Card.shuffle_decks from a single seed: much faster to build, and just as
+    reproducible, but its games differ from Game.new's.
+
+    Banks saved as .npy are opened memory mapped, so a run only reads the
+    pages of the seeds it plays. Card.set_deal_bank makes Game.new (and so
+    the arena) read its decks from a bank.
+    """
+
+    def __init__(self, decks):
+        self._decks = decks
+
+    def __len__(self):
+        return self._decks.shape[0]
+
+    def decks(self):
+        """The underlying (count, 16) uint8 matrix"""
+        return self._decks
+
+    def deck(self, seed):
+        """Deck of a seed, as Card.shuffle_deck returns it"""
+        return self._decks[seed].astype(np.int64)
+
+    def save(self, path):
+        """Write the bank to an .npy file"""
+        np.save(path, np.asarray(self._decks))
+
+    @staticmethod
+    def open(path, in_memory=False):
+        """Bank stored at path, memory mapped unless in_memory"""
+        return DealBank(np.load(path, mmap_mode=None if in_memory else 'r'))
+
+    @staticmethod
+    def seeded(count, path=None):
+        """Bank of the decks of Card.shuffle_deck for seeds 0 to count - 1"""
+        decks = DealBank._matrix(count, path)
+        random_state = np.random.RandomState()
+        for seed in range(count):
+            random_state.seed(seed)
+            decks[seed] = Card.shuffle_deck(random_state=random_state)
+        return DealBank._finish(decks, path)
+
+    @staticmethod
+    def generated(count, seed=451, path=None, chunk_size=1 << 18):
+        """Bank of count decks drawn at once, chunk by chunk, from seed"""
+        decks = DealBank._matrix(count, path)
+        random_state = np.random.RandomState(seed)
+        for start in range(0, count, chunk_size):
+            stop = min(start + chunk_size, count)
+            decks[start:stop] = Card.shuffle_decks(stop - start, random_state)
+        return DealBank._finish(decks, path)
+
+    @staticmethod
+    def _matrix(count, path):
+        """Empty deck matrix, in memory or as a new .npy file"""
+        shape = (count, sum(Card.counts))
+        if path is None:
+            return np.empty(shape, dtype=np.uint8)
+        return np.lib.format.open_memmap(path, mode='w+', dtype=np.uint8, shape=shape)
+
+    @staticmethod
+    def _finish(decks, path):
+        """Bank of a filled matrix, flushed and opened read only if on disk"""
+        if path is None:
+            return DealBank(decks)
+        decks.flush()
+        del decks
+        return DealBank.open(path)
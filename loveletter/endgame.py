@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Love Letter Endgame Solver
+Exact expectimax over the last draws of a game with known hands.
+"""
+from loveletter.card import Card
+from loveletter.game import Game
+from loveletter.moves import FullMoves
+from loveletter.player import PlayerTools
+
+
+class EndgameSolver():
+    """
+    Expectimax over the remaining draws of a game whose hands are known.
+
+    The order of the deck is treated as unknown: every draw (including the
+    card a prince makes its target draw) is a chance node over the cards
+    left. Each player picks the action with the best win probability for
+    itself, and a tie at the end shares the win equally.
+
+    Values are win probability tuples indexed by seat. A transposition
+    table holds every solved decision and chance node. Its key packs the
+    hands, handmaid protection, deck contents and drawn card into one
+    integer. Seats are rotated so the player to move is first, so games that
+    only differ by who sits where share entries.
+
+    Hands are taken as known, so a guard always guesses right. This is
+    exact once every hand is known (or for a determinization) and is meant
+    for the last few cards only: the tree grows quickly with the deck.
+    """
+
+    def __init__(self, max_entries=1000000):
+        self.max_entries = max_entries
+        self._table = {}
+        self.nodes = 0
+        self.lookups = 0
+        self.hits = 0
+
+    def clear(self):
+        """Empty the transposition table and reset the counters"""
+        self._table = {}
+        self.nodes = 0
+        self.lookups = 0
+        self.hits = 0
+
+    def hit_rate(self):
+        """Fraction of node lookups found in the transposition table"""
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def stats(self):
+        """Node counts, table size and hit rate"""
+        return {"nodes": self.nodes,
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": self.hit_rate(),
+                "entries": len(self._table)}
+
+    def value(self, game):
+        """Win probability of each seat, from a game waiting on its current player"""
+        return self._decision(game)
+
+    def action_values(self, game):
+        """[(action, win probabilities)] of every legal action of the current player"""
+        if len(self._table) > self.max_entries:
+            self._table = {}
+        return [(action, self._action(game, action)) for action in EndgameSolver.actions(game)]
+
+    def best_action(self, game):
+        """Action with the best win probability for the current player"""
+        seat = game.player_turn()
+        return max(self.action_values(game), key=lambda item: item[1][seat])[0]
+
+    @staticmethod
+    def actions(game):
+        """Every legal action, with each possible target and guess"""
+        return FullMoves.game_actions(game)
+
+    def _decision(self, game):
+        """Value of the current player's best action"""
+        key, seat = EndgameSolver._key(game, game.deck()[0])
+        value = self._lookup(key, seat, len(game.players()))
+        if value is not None:
+            return value
+
+        self.nodes += 1
+        best = None
+        for action in EndgameSolver.actions(game):
+            value = self._action(game, action)
+            if best is None or value[seat] > best[seat]:
+                best = value
+        self._store(key, seat, best)
+        return best
+
+    def _action(self, game, action):
+        """Expected value of playing an action"""
+        deck = game.deck()
+        if action.discard != Card.prince or len(deck) < 3:
+            return self._chance(game._move(action))
+
+        # the prince's target draws the card after ours
+        players = game.players()
+        turn_index = game.turn_index()
+        discards = game.discard_counts()
+        rest = [int(card) for card in deck[1:]]
+        total = float(len(rest))
+        value = [0.0] * len(players)
+        for card, count in EndgameSolver._counts(rest):
+            deck_card = [int(deck[0]), card] + EndgameSolver._without(rest, card)
+            outcome = self._chance(
+                Game(deck_card, players, turn_index, discards)._move(action))
+            for idx, win in enumerate(outcome):
+                value[idx] += win * count / total
+        return tuple(value)
+
+    def _chance(self, game):
+        """Expected value over the next player's draw"""
+        while game.active() and not game.is_current_player_playing():
+            game = game.skip_eliminated_player()
+        if game.over():
+            return EndgameSolver._terminal(game)
+
+        key, seat = EndgameSolver._key(game, Card.noCard)
+        value = self._lookup(key, seat, len(game.players()))
+        if value is not None:
+            return value
+
+        self.nodes += 1
+        players = game.players()
+        turn_index = game.turn_index()
+        discards = game.discard_counts()
+        deck = [int(card) for card in game.deck()]
+        total = float(len(deck))
+        value = [0.0] * len(players)
+        for card, count in EndgameSolver._counts(deck):
+            deck_card = [card] + EndgameSolver._without(deck, card)
+            outcome = self._decision(Game(deck_card, players, turn_index, discards))
+            for idx, win in enumerate(outcome):
+                value[idx] += win * count / total
+        value = tuple(value)
+        self._store(key, seat, value)
+        return value
+
+    def _lookup(self, key, seat, player_count):
+        """Table value of a key, rotated back to absolute seats"""
+        self.lookups += 1
+        value = self._table.get(key)
+        if value is None:
+            return None
+        self.hits += 1
+        return tuple(value[(idx - seat) % player_count] for idx in range(player_count))
+
+    def _store(self, key, seat, value):
+        """Store a value relative to the player to move"""
+        player_count = len(value)
+        self._table[key] = tuple(value[(idx + seat) % player_count]
+                                 for idx in range(player_count))
+
+    @staticmethod
+    def _key(game, drawn):
+        """
+        (key, seat) of a node, with the seats rotated to start at the mover.
+
+        Bits from the lowest: drawn card (4), deck count of each card (3
+        each), then per seat its hand (4) and handmaid flag (1), then the
+        player count (3).
+        """
+        seat = game.player_turn()
+        players = game.players()
+        counts = [0] * 9
+        for card in game.deck():
+            counts[card] += 1
+        key = 0
+        for idx in range(len(players)):
+            player = players[(seat + idx) % len(players)]
+            key = (key << 5) | (int(player.hand_card) << 1) | \
+                int(PlayerTools.is_defended(player))
+        key = (len(players) << 5 * len(players)) | key
+        for card in range(8, 0, -1):
+            key = (key << 3) | counts[card]
+        return (key << 4) | int(drawn), seat
+
+    @staticmethod
+    def _terminal(game):
+        """Win probabilities of a finished game, ties shared"""
+        players = game.players()
+        hands = [int(player.hand_card) for player in players]
+        best = max(hands)
+        winners = [idx for idx, hand in enumerate(hands)
+                   if hand == best and hand != Card.noCard]
+        return tuple(1.0 / len(winners) if idx in winners else 0.0
+                     for idx in range(len(players)))
+
+    @staticmethod
+    def _counts(cards):
+        """(card, count) of each distinct card, in card order"""
+        counts = {}
+        for card in cards:
+            counts[card] = counts.get(card, 0) + 1
+        return sorted(counts.items())
+
+    @staticmethod
+    def _without(cards, card):
+        """Sorted cards with one copy of card removed"""
+        rest = sorted(cards)
+        rest.remove(card)
+        return rest
@@ -5,8 +5,8 @@ from gym import spaces
 from gym.utils import seeding
 
 from .game import Game
-from .card import Card
-from .player import PlayerAction, PlayerTools
+from .moves import FullMoves, LegalMoves
+from .player import PlayerTools
 from .agents.random import AgentRandom
 
 
@@ -29,16 +29,21 @@ class LoveLetterEnv(gym.Env):
     its maximum
     """
 
-    def __init__(self, agent_other, seed=451):
+    def __init__(self, agent_other, seed=451, random_state=None, full_actions=False):
 
-        self.action_space = spaces.Discrete(15)
+        # full_actions picks the target too, from the 60 FullMoves indices
+        self.full_actions = full_actions
+        self.action_space = spaces.Discrete(
+            FullMoves.count if full_actions else LegalMoves.count)
         self.observation_space = spaces.Box(low=0, high=1, shape=(24,))
 
         self._agent_other = AgentRandom(
             seed) if agent_other is None else agent_other
         self._seed(seed)
+        if random_state is not None:
+            # a caller owned numpy RandomState or Generator
+            self.np_random = random_state
         self._reset()
-        self._game = Game.new(4, self.np_random.random_integers(5000000))
 
     def _seed(self, seed=None):
         self.np_random, seed = seeding.np_random(seed)
@@ -61,7 +66,7 @@ class LoveLetterEnv(gym.Env):
         return self._game.state(), reward, done, {"round": self._game.round()}
 
     def _reset(self):
-        self._game = Game.new(4, self.np_random.random_integers(5000000))
+        self._game = Game.new(4, random_state=self.np_random)
         return self._game.state()
 
     def force(self, game):
@@ -109,18 +114,23 @@ class LoveLetterEnv(gym.Env):
 
         return (action, score, idx)
         """
-        if len(scores) != 15:
+        if len(scores) != self.action_space.n:
             raise Exception("Invalid scores length: {}".format(len(scores)))
         game = self._game if game is None else game
 
         assert game.active()
+        if self.full_actions:
+            return max([(action, scores[idx], idx)
+                        for idx, action in self.actions_possible(game)], key=itemgetter(1))
+
         actions_possible = self.actions_set(game)
+        mask = LegalMoves.game_mask(game)
 
         actions = [(action, score, idx) for action, score, idx in
                    zip(actions_possible,
                        scores,
                        range(len(actions_possible)))
-                   if game.is_action_valid(action)]
+                   if mask >> idx & 1]
 
         action = max(actions, key=itemgetter(2))
         return action
@@ -129,82 +139,38 @@ class LoveLetterEnv(gym.Env):
         """Returns valid action based on index and game"""
         game = self._game if game is None else game
 
-        action_candidates = self.actions_set(game)
+        if self.full_actions:
+            if action_index not in FullMoves.game_indices(game):
+                return None
+            return FullMoves.action(action_index)
 
-        actions = [(idx, action) for idx, action in
-                   enumerate(action_candidates)
-                   if game.is_action_valid(action) and idx == action_index]
+        if not LegalMoves.game_mask(game) >> action_index & 1:
+            return None
 
-        return actions[0][1] if len(actions) == 1 else None
+        return self._action_for_slot(action_index, game)
 
     def actions_possible(self, game=None):
         """Returns valid (idx, actions) based on a current game"""
         game = self._game if game is None else game
 
-        action_candidates = self.actions_set(game)
-
-        actions = [(idx, action) for idx, action in
-                   enumerate(action_candidates)
-                   if game.is_action_valid(action)]
+        if self.full_actions:
+            return [(idx, FullMoves.action(idx)) for idx in FullMoves.game_indices(game)]
 
-        return actions
+        return [(idx, self._action_for_slot(idx, game))
+                for idx in LegalMoves.slots(LegalMoves.game_mask(game))]
 
     def actions_set(self, game=None):
         """Returns all actions for a game"""
         game = self._game if game is None else game
 
-        player_self = game.player_turn()
-        opponents = game.opponent_turn()
-
-        actions_possible = [
-            PlayerAction(Card.guard,
-                         self.np_random.choice(opponents),
-                         Card.priest,
-                         Card.noCard),
-            PlayerAction(Card.guard,
-                         self.np_random.choice(opponents),
-                         Card.baron,
-                         Card.noCard),
-            PlayerAction(Card.guard,
-                         self.np_random.choice(opponents),
-                         Card.handmaid,
-                         Card.noCard),
-            PlayerAction(Card.guard,
-                         self.np_random.choice(opponents),
-                         Card.prince,
-                         Card.noCard),
-            PlayerAction(Card.guard,
-                         self.np_random.choice(opponents),
-                         Card.king,
-                         Card.noCard),
-            PlayerAction(Card.guard,
-                         self.np_random.choice(opponents),
-                         Card.countess,
-                         Card.noCard),
-            PlayerAction(Card.guard,
-                         self.np_random.choice(opponents),
-                         Card.princess,
-                         Card.noCard),
-            PlayerAction(Card.priest,
-                         self.np_random.choice(opponents),
-                         Card.noCard,
-                         Card.noCard),
-            PlayerAction(Card.baron,
-                         self.np_random.choice(opponents),
-                         Card.noCard,
-                         Card.noCard),
-            PlayerAction(Card.king,
-                         self.np_random.choice(opponents),
-                         Card.noCard,
-                         Card.noCard),
-            PlayerAction(Card.prince,
-                         self.np_random.choice(opponents),
-                         Card.noCard,
-                         Card.noCard),
-            PlayerAction(Card.prince, player_self, Card.noCard, Card.noCard),
-            PlayerAction(Card.handmaid, player_self, Card.noCard, Card.noCard),
-            PlayerAction(Card.countess, player_self, Card.noCard, Card.noCard),
-            PlayerAction(Card.princess, player_self, Card.noCard, Card.noCard)
-        ]
-
-        return actions_possible
+        if self.full_actions:
+            return [FullMoves.action(idx) for idx in range(FullMoves.count)]
+
+        return [self._action_for_slot(idx, game)
+                for idx in range(LegalMoves.count)]
+
+    def _action_for_slot(self, slot, game):
+        """Action of a slot, with a random opponent as the target if needed"""
+        if LegalMoves.slot_self[slot]:
+            return LegalMoves.action(slot, game.player_turn())
+        return LegalMoves.action(slot, self.np_random.choice(game.opponent_turn()))
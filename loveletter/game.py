@@ -4,20 +4,35 @@ Love Letter Game object
 """
 import numpy as np
 from loveletter.card import Card
-from loveletter.player import PlayerTools, PlayerAction, PlayerActionTools
+from loveletter.player import PlayerTools, PlayerActionTable, PlayerActionTools
+from loveletter.zobrist import Zobrist
 
+_CARD_COUNTS = np.array(Card.counts, dtype=np.float64)
 
 class Game():
     """A Love Letter Game"""
 
-    def __init__(self, deck, players, turn_index):
+    def __init__(self, deck, players, turn_index, discards=None):
         self._deck = deck
         self._players = players
         self._turn_index = turn_index
-
-        total_playing = sum(
-            [1 for player in players if PlayerTools.is_playing(player)])
-        self._game_active = total_playing > 1 and self.cards_left() > 0
+        self._discards = Game.count_discards(players) \
+            if discards is None else discards
+        # Zobrist parts, computed on the first request then kept up by _move
+        self._zobrist = None
+
+        # summary of the state: alive and winner bitmasks, and on first use
+        # the opponents and the defended bitmask
+        alive = 0
+        for idx, player in enumerate(players):
+            if player.hand_card != Card.noCard:
+                alive |= 1 << idx
+        self._alive = alive
+        self._game_active = bin(alive).count("1") > 1 and len(deck) > 1
+        self._winners = 0 if self._game_active else Game._winner_mask(players)
+        self._opponent_turn = None
+        self._opponents = None
+        self._defended = None
 
     def players(self):
         """List of current players."""
@@ -63,37 +78,65 @@ class Game():
 
     def is_winner(self, idx):
         """True iff that player has won the game"""
-        if self.active():
-            return False
-        player = self._players[idx]
-        if not PlayerTools.is_playing(player):
-            return False
-        other_scores = [
-            p.hand_card > player.hand_card for p in self._players if PlayerTools.is_playing(p)]
-        return sum(other_scores) == 0
+        return self._winners >> idx & 1 == 1
 
     def winner(self):
         """Return the index of the winning player. -1 if none"""
-        for idx in range(len(self._players)):
-            if self.is_winner(idx):
-                return idx
-        return -1
+        winners = self._winners
+        return (winners & -winners).bit_length() - 1
 
     def player(self):
         """Returns the current player"""
         return self._players[self.player_turn()]
 
     def opponents(self):
-        """Returns the opposing players"""
-        return [player for idx, player in enumerate(self._players)
-                if idx != self.player_turn() and
-                PlayerTools.is_playing(player)]
+        """
+        Returns the opposing players
+
+        The list is built once per game and shared, so it must not be changed
+        """
+        if self._opponents is None:
+            self._opponents = [self._players[idx] for idx in self.opponent_turn()]
+        return self._opponents
 
     def opponent_turn(self):
-        """Returns the opposing players indices"""
-        return [idx for idx, player in enumerate(self._players)
-                if idx != self.player_turn() and
-                PlayerTools.is_playing(player)]
+        """
+        Returns the opposing players indices
+
+        The list is built once per game and shared, so it must not be changed
+        """
+        if self._opponent_turn is None:
+            others = self._alive & ~(1 << self.player_turn())
+            self._opponent_turn = [idx for idx in range(len(self._players))
+                                   if others >> idx & 1]
+        return self._opponent_turn
+
+    def alive_mask(self):
+        """Bitmask of the players still holding a card"""
+        return self._alive
+
+    def defended_mask(self):
+        """Bitmask of the players protected by a handmaid"""
+        if self._defended is None:
+            defended = 0
+            for idx, player in enumerate(self._players):
+                if PlayerTools.is_defended(player):
+                    defended |= 1 << idx
+            self._defended = defended
+        return self._defended
+
+    def zobrist(self):
+        """64-bit key of the whole position"""
+        return Zobrist.full(self._zobrist_parts())
+
+    def zobrist_observer(self):
+        """64-bit key of what the current player can see"""
+        return Zobrist.observer(self, self._zobrist_parts())
+
+    def _zobrist_parts(self):
+        if self._zobrist is None:
+            self._zobrist = Zobrist.parts(self)
+        return self._zobrist
 
     def cards_left(self):
         """
@@ -113,7 +156,7 @@ class Game():
 
     def is_current_player_playing(self):
         """True if the current player has not been eliminated"""
-        return PlayerTools.is_playing(self.player())
+        return self._alive >> self.player_turn() & 1 == 1
 
     def skip_eliminated_player(self, throw=False):
         """If the current player is eliminated, skip to next"""
@@ -146,17 +189,34 @@ class Game():
         """
         Looks at discarded cards and returns probabilities of outstanding cards.
         """
+        return self.state_into(np.empty(24))[16:24]
 
-        cards_discarded = np.array([Game.player_to_discards(
-            player) for player in self.players()]).flatten()
+    def discard_counts(self):
+        """
+        Number of each card discarded so far, indexed by card id.
 
-        cards_hand = [self.player().hand_card, self.deck()[0]]
-        cards_all = np.concatenate([cards_discarded, cards_hand])
+        Carried along with every move rather than recounted.
+        """
+        return self._discards
 
-        card_bins = np.bincount(cards_all, minlength=9)[1:9]
-        card_fractions = card_bins / Card.counts
+    @staticmethod
+    def _winner_mask(players):
+        """Bitmask of the players holding the best card (ties all win)"""
+        best = max(player.hand_card for player in players)
+        if best == Card.noCard:
+            return 0
+        return sum(1 << idx for idx, player in enumerate(players)
+                   if player.hand_card == best)
 
-        return card_fractions
+    @staticmethod
+    def count_discards(players):
+        """Histogram (length 9, indexed by card id) of all cards discarded by players"""
+        counts = [0] * 9
+        for player in players:
+            for action in player.actions:
+                counts[action.discard] += 1
+        counts[Card.noCard] = 0
+        return tuple(counts)
 
     @staticmethod
     def player_to_discards(player):
@@ -169,7 +229,39 @@ class Game():
 
         returns numpy float 1d of length 24
         """
-        return np.concatenate([self.state_hand(), self.consumed_cards()])
+        return self.state_into(np.empty(24))
+
+    def state_into(self, out):
+        """
+        Write the observation of Game.state into out (length 24, eg a row of
+        a batch matrix) without allocating.
+
+        returns out
+        """
+        card_number1 = self.player().hand_card
+        card_number2 = self._deck[0]
+        if card_number2 < card_number1:
+            card_number1, card_number2 = card_number2, card_number1
+
+        # a missing card (0) wraps to the last slot, as in state_hand
+        out[0:16] = 0
+        out[(card_number1 - 1) % 8] = 1
+        out[8 + (card_number2 - 1) % 8] = 1
+
+        out[16:24] = self._discards[1:9]
+        if card_number1 != Card.noCard:
+            out[15 + card_number1] += 1
+        if card_number2 != Card.noCard:
+            out[15 + card_number2] += 1
+        out[16:24] /= _CARD_COUNTS
+        return out
+
+    def _discarded(self, *cards):
+        """Discard histogram once the given cards are discarded"""
+        discards = list(self._discards)
+        for card in cards:
+            discards[card] += 1
+        return tuple(discards)
 
     def _reward(self, game, action):
         """
@@ -192,16 +284,31 @@ class Game():
         game = self._move(action)
         return game, self._reward(game, action)
 
+    def move_id(self, action_id, throw=False):
+        """Current player makes the action of a PlayerActionTable id.
+
+        Returns (NewGame and Reward)<Game,int>
+        """
+        return self.move(PlayerActionTable.action(action_id), throw)
+
     def _move(self, action, throw=False):
         """Current player makes an action.
 
         Returns (NewGame and Reward)<Game,int>"""
+        game = self._play(action, throw)
+        if self._zobrist is not None and game is not self:
+            game._zobrist = Zobrist.update(self, game, self._zobrist)
+        return game
+
+    def _play(self, action, throw):
+        """Game after the current player's action"""
         if self.over() or not self.is_action_valid(action):
             return self._invalid_input(throw)
 
         # player is out, increment turn index
         if action.discard == Card.noCard:
-            return Game(self.deck(), self.players(), self.turn_index() + 1)
+            return Game(self.deck(), self.players(), self.turn_index() + 1,
+                        self._discards)
 
         player = self.player()
         player_hand = [player.hand_card, self._deck[0]]
@@ -227,7 +334,8 @@ class Game():
         # No other logic for handmaids or countess
         if action.discard == Card.handmaid or \
                 action.discard == Card.countess:
-            return Game(deck_new, current_players, self._turn_index + 1)
+            return Game(deck_new, current_players, self._turn_index + 1,
+                        self._discarded(action.discard))
 
         if action.discard == Card.guard:
             return self._move_guard(current_players, action, deck_new)
@@ -246,6 +354,7 @@ class Game():
 
         Player makes a guess to try and eliminate the opponent
         """
+        discards = self._discarded(Card.guard)
         if self._players[action.player_target].hand_card == action.guess and \
                 not PlayerTools.is_defended(self._players[action.player_target]):
             # then target player is out
@@ -253,8 +362,9 @@ class Game():
                 self._players[action.player_target])
             current_players = Game._set_player(
                 current_players, player_target, action.player_target)
+            discards = self._discarded(Card.guard, action.guess)
 
-        return Game(deck_new, current_players, self._turn_index + 1)
+        return Game(deck_new, current_players, self._turn_index + 1, discards)
 
     def _move_priest(self, action, player_hand_new, deck_new):
         """
@@ -265,7 +375,7 @@ class Game():
         player_targets_card = Card.noCard if \
             PlayerTools.is_defended(self._players[action.player_target]) \
             else self._players[action.player_target].hand_card
-        action_updated = PlayerAction(
+        action_updated = PlayerActionTable.get(
             action.discard, action.player_target, action.guess, player_targets_card)
 
         player = PlayerTools.move(
@@ -273,7 +383,8 @@ class Game():
         current_players = Game._set_player(
             self._players, player, self.player_turn())
 
-        return Game(deck_new, current_players, self._turn_index + 1)
+        return Game(deck_new, current_players, self._turn_index + 1,
+                    self._discarded(Card.priest))
 
     def _move_baron(self, action, current_players, player_hand_new, deck_new):
         """
@@ -283,6 +394,7 @@ class Game():
         card is eliminated
         """
         card_target = self._players[action.player_target].hand_card
+        discards = self._discarded(Card.baron)
         if player_hand_new > card_target:
             if not PlayerTools.is_defended(self._players[action.player_target]):
                 # target is eliminated
@@ -290,14 +402,16 @@ class Game():
                     self._players[action.player_target])
                 current_players = Game._set_player(
                     current_players, player_target, action.player_target)
+                discards = self._discarded(Card.baron, card_target)
         else:
             # player is eliminated
             player = PlayerTools.force_discard(self.player(), player_hand_new)
             player = PlayerTools.force_discard(player)
             current_players = Game._set_player(
                 current_players, player, self.player_turn())
+            discards = self._discarded(self.player().hand_card, player_hand_new)
 
-        return Game(deck_new, current_players, self._turn_index + 1)
+        return Game(deck_new, current_players, self._turn_index + 1, discards)
 
     def _move_prince(self, current_players, action, deck_new):
         """Handle a prince action into a new game state"""
@@ -306,7 +420,8 @@ class Game():
 
         # if there are no more cards, this has no effect
         if len(deck_new) - 1 < 1:
-            return Game(deck_new, current_players, self._turn_index + 1)
+            return Game(deck_new, current_players, self._turn_index + 1,
+                        self._discarded(Card.prince))
 
         if player_before_discard.hand_card == Card.princess:
             player_post_discard = PlayerTools.force_discard(
@@ -320,7 +435,8 @@ class Game():
         current_players = Game._set_player(
             current_players, player_post_discard, action.player_target)
 
-        return Game(deck_final, current_players, self._turn_index + 1)
+        return Game(deck_final, current_players, self._turn_index + 1,
+                    self._discarded(Card.prince, player_before_discard.hand_card))
 
     def _move_king(self, current_players, action, deck_new):
         """Handle a king action into a new game state"""
@@ -335,7 +451,8 @@ class Game():
         current_players = Game._set_player(
             current_players, target_new, action.player_target)
 
-        return Game(deck_new, current_players, self._turn_index + 1)
+        return Game(deck_new, current_players, self._turn_index + 1,
+                    self._discarded(Card.king))
 
     def _move_princess(self, dealt_card, new_deck):
         """Handle a princess action into a new game state"""
@@ -343,7 +460,8 @@ class Game():
         player = PlayerTools.force_discard(player)
         current_players = Game._set_player(
             self._players, player, self.player_turn())
-        return Game(new_deck, current_players, self._turn_index + 1)
+        return Game(new_deck, current_players, self._turn_index + 1,
+                    self._discarded(self.player().hand_card, dealt_card))
 
     def is_action_valid(self, action):
         """Tests if an action is valid given the current game state"""
@@ -440,12 +558,16 @@ class Game():
         return int(new_hand[0])
 
     @staticmethod
-    def new(player_count=4, seed=451):
-        """Create a brand new game"""
-        deck = Card.shuffle_deck(seed)
+    def new(player_count=4, seed=451, random_state=None):
+        """
+        Create a brand new game
+
+        The deck is shuffled by random_state if given, otherwise from seed
+        """
+        deck = Card.shuffle_deck(seed, random_state)
 
         dealt_cards = deck[:player_count]
         undealt_cards = deck[player_count:]
 
         players = list(map(PlayerTools.blank, dealt_cards))
-        return Game(undealt_cards, players, 0)
+        return Game(undealt_cards, players, 0, (0,) * 9)
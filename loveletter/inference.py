@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Love Letter Inference Server
+Coalesces policy requests from many concurrent games into batched forward
+passes of one model.
+"""
+import collections
+import queue
+import threading
+import time
+
+import numpy as np
+
+
+class InferenceRequest():
+    """A pending observation and, once served, its value and logits"""
+    __slots__ = ("observation", "time", "value", "logits", "error", "event")
+
+    def __init__(self, observation):
+        self.observation = observation
+        self.time = time.time()
+        self.value = None
+        self.logits = None
+        self.error = None
+        self.event = threading.Event()
+
+    def result(self, timeout=None):
+        """Wait for the request to be served, returning (value, logits)"""
+        if not self.event.wait(timeout):
+            raise TimeoutError("Inference request not served in time")
+        if self.error is not None:
+            raise self.error
+        return self.value, self.logits
+
+
+class InferenceServer():
+    """
+    Batched policy inference on a background thread.
+
+    Requests are queued by any number of threads. The server takes the first
+    waiting request, keeps collecting until max_batch requests or until
+    `deadline` seconds after that first request arrived, then runs them all
+    through one model.forward call. Each observation is served from a zero
+    LSTM state, as AgentA3C plays.
+
+    model is anything with forward(observations) -> (values, logits, ...)
+    such as NumpyActorCritic. The server has action_index as well, so it can
+    be handed to AgentA3C in place of a model path.
+    """
+
+    def __init__(self, model, max_batch=64, deadline=0.001):
+        self._model = model
+        self.max_batch = max_batch
+        self.deadline = deadline
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._batch_sizes = collections.Counter()
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+        self._closed = False
+        self._thread = threading.Thread(target=self._serve)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def submit(self, observation):
+        """Queue an observation, returning its InferenceRequest"""
+        request = InferenceRequest(observation)
+        with self._lock:
+            if self._closed or not self._thread.is_alive():
+                raise RuntimeError("Inference server closed")
+            self._queue.put(request)
+        return request
+
+    def infer(self, observation):
+        """(value, logits) of an observation, blocking until served"""
+        return self.submit(observation).result()
+
+    def action_index(self, observation):
+        """Greedy action slot for an observation"""
+        return int(np.argmax(self.infer(observation)[1]))
+
+    def stats(self):
+        """Served batches and requests, batch size histogram and queue latency"""
+        with self._lock:
+            batches = sum(self._batch_sizes.values())
+            requests = sum(size * count for size, count in self._batch_sizes.items())
+            return {"batches": batches,
+                    "requests": requests,
+                    "batch_sizes": dict(self._batch_sizes),
+                    "batch_size_mean": requests / batches if batches else 0.0,
+                    "latency_mean": self._latency_total / requests if requests else 0.0,
+                    "latency_max": self._latency_max}
+
+    def close(self):
+        """Serve what is already queued, then stop the server thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+
+    def _serve(self):
+        """Collect and run batches until closed"""
+        closing = False
+        while not closing:
+            request = self._queue.get()
+            if request is None:
+                break
+            batch = [request]
+            end = request.time + self.deadline
+            while len(batch) < self.max_batch:
+                try:
+                    request = self._queue.get(timeout=max(0.0, end - time.time()))
+                except queue.Empty:
+                    break
+                if request is None:
+                    closing = True
+                    break
+                batch.append(request)
+            self._run(batch)
+
+    def _run(self, batch):
+        """Serve one batch of requests"""
+        start = time.time()
+        try:
+            values, logits = self._model.forward(
+                np.stack([request.observation for request in batch]))[:2]
+        except Exception as error:
+            values = logits = None
+            for request in batch:
+                request.error = error
+
+        for idx, request in enumerate(batch):
+            if values is not None:
+                request.value = values[idx]
+                request.logits = logits[idx]
+            request.event.set()
+
+        latencies = [start - request.time for request in batch]
+        with self._lock:
+            self._batch_sizes[len(batch)] += 1
+            self._latency_total += sum(latencies)
+            self._latency_max = max(self._latency_max, max(latencies))
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+Love Letter Legal Moves
+Precomputed legality of the 15 action slots shared by the agents and the env.
+"""
+import numpy as np
+
+from loveletter.card import Card
+from loveletter.player import PlayerActionTable
+
+
+class LegalMoves():
+    """
+    Static lookup of playable action slots.
+
+    A slot is a (discard, guess) pair that either targets the current player
+    or any opponent still in the game. Its legality only depends on the hand
+    card, the drawn card and whether an opponent is left to target, so the
+    15-bit masks are precomputed for every (hand, drawn, alive mask, seat).
+
+    Note that a handmaid does not make an action illegal (the card just has
+    no effect), so the defended mask is not part of the key.
+    """
+    count = 15
+
+    # guard (guessing 2-8), priest, baron, king, prince at an opponent, then
+    # prince, handmaid, countess, princess at the current player
+    slot_discards = (1, 1, 1, 1, 1, 1, 1, 2, 3, 6, 5, 5, 4, 7, 8)
+    slot_guesses = (2, 3, 4, 5, 6, 7, 8, 0, 0, 0, 0, 0, 0, 0, 0)
+    slot_self = (False,) * 11 + (True,) * 4
+
+    @staticmethod
+    def index(hand_card, draw_card, alive, seat):
+        """Position of a situation in the lookup table"""
+        return ((hand_card * 9 + draw_card) * 16 + alive) * 4 + seat
+
+    @staticmethod
+    def mask(hand_card, draw_card, alive, seat):
+        """15-bit mask of legal slots for a situation"""
+        return _MASKS[((hand_card * 9 + draw_card) * 16 + alive) * 4 + seat]
+
+    @staticmethod
+    def game_mask(game):
+        """15-bit mask of legal slots for the current player of a game"""
+        return _MASKS[LegalMoves.index(int(game.player().hand_card),
+                                       int(game.deck()[0]),
+                                       game.alive_mask(),
+                                       game.player_turn())]
+
+    @staticmethod
+    def slots(mask):
+        """Tuple of the slot indices set in a mask"""
+        slots = _SLOTS.get(mask)
+        if slots is None:
+            slots = tuple(idx for idx in range(LegalMoves.count) if mask >> idx & 1)
+        return slots
+
+    @staticmethod
+    def action(slot, player_target):
+        """PlayerAction (interned) of a slot aimed at a target"""
+        return _ACTIONS[slot * 4 + player_target]
+
+    @staticmethod
+    def action_id(slot, player_target):
+        """PlayerActionTable id of a slot aimed at a target"""
+        return _ACTION_IDS[slot * 4 + player_target]
+
+    @staticmethod
+    def table():
+        """Numpy array of every mask, indexed by LegalMoves.index"""
+        return _MASKS_NP
+
+
+class FullMoves():
+    """
+    Every legal (discard, target, guess), with a fixed index space.
+
+    Index slot * 4 + target pairs each of the 15 LegalMoves slots with an
+    explicit seat, so the space has 60 entries and an agent can pick its
+    target. Legal indices are memoized per (hand, drawn, alive mask,
+    defended mask, seat) and are in increasing order.
+
+    effective_indices also leaves out the guard and priest actions at
+    opponents protected by a handmaid, which the engine allows but resolves
+    as no-ops: while some opponent is unprotected they are dropped, and
+    otherwise only the first protected opponent is kept. Baron, king and
+    prince still affect a protected target (or the player) in this engine,
+    so they are all kept.
+    """
+    count = LegalMoves.count * 4
+
+    @staticmethod
+    def key(hand_card, draw_card, alive, defended, seat):
+        """Memo key of a situation"""
+        return ((((hand_card * 9 + draw_card) * 16 + alive) * 16 + defended) * 4) + seat
+
+    @staticmethod
+    def indices(hand_card, draw_card, alive, defended, seat):
+        """Tuple of the legal indices of a situation"""
+        return FullMoves._lookup(hand_card, draw_card, alive, defended, seat)[0]
+
+    @staticmethod
+    def effective_indices(hand_card, draw_card, alive, defended, seat):
+        """Tuple of the legal indices without actions stopped by a handmaid"""
+        return FullMoves._lookup(hand_card, draw_card, alive, defended, seat)[1]
+
+    @staticmethod
+    def game_indices(game, effective=False):
+        """Legal indices of the current player of a game"""
+        return FullMoves._game_lookup(game)[1 if effective else 0]
+
+    @staticmethod
+    def game_actions(game, effective=False):
+        """Tuple of the legal PlayerActions of the current player of a game"""
+        return FullMoves._game_lookup(game)[3 if effective else 2]
+
+    @staticmethod
+    def action(index):
+        """PlayerAction (interned) of an index"""
+        return _ACTIONS[index]
+
+    @staticmethod
+    def action_id(index):
+        """PlayerActionTable id of an index"""
+        return _ACTION_IDS[index]
+
+    @staticmethod
+    def index(action, seat):
+        """Index of a PlayerAction made by seat, None if it is not in the space"""
+        slots = _SELF_SLOT if action.player_target == seat else _OTHER_SLOT
+        slot = slots.get((action.discard, action.guess))
+        if slot is None or not 0 <= action.player_target < 4:
+            return None
+        return slot * 4 + action.player_target
+
+    @staticmethod
+    def _game_lookup(game):
+        """Memo entry of the current player of a game"""
+        return FullMoves._lookup(int(game.player().hand_card), int(game.deck()[0]),
+                                 game.alive_mask(), game.defended_mask(),
+                                 game.player_turn())
+
+    @staticmethod
+    def _lookup(hand_card, draw_card, alive, defended, seat):
+        """(indices, effective indices, and both as actions) of a situation, memoized"""
+        key = FullMoves.key(hand_card, draw_card, alive, defended, seat)
+        entry = _FULL.get(key)
+        if entry is None:
+            entry = _build_full(hand_card, draw_card, alive, defended, seat)
+            _FULL[key] = entry
+        return entry
+
+
+def _hand_mask(hand_card, draw_card):
+    """Slots playable from a hand, ignoring targets"""
+    mask = 0
+    if hand_card == Card.noCard:
+        return mask
+    for slot, discard in enumerate(LegalMoves.slot_discards):
+        if discard != hand_card and discard != draw_card:
+            continue
+        other = draw_card if discard == hand_card else hand_card
+        # countess must be discarded if the other card is king/prince
+        if other == Card.countess and (discard == Card.prince or discard == Card.king):
+            continue
+        mask |= 1 << slot
+    return mask
+
+
+def _build_masks():
+    """Masks for every (hand, drawn, alive, seat)"""
+    self_bits = sum(1 << slot for slot, is_self in enumerate(LegalMoves.slot_self)
+                    if is_self)
+    masks = []
+    for hand_card in range(9):
+        for draw_card in range(9):
+            hand_mask = _hand_mask(hand_card, draw_card)
+            for alive in range(16):
+                for seat in range(4):
+                    has_opponent = alive & ~(1 << seat) != 0
+                    masks.append(hand_mask if has_opponent else hand_mask & self_bits)
+    return tuple(masks)
+
+
+_MASKS = _build_masks()
+_MASKS_NP = np.array(_MASKS, dtype=np.uint16)
+_SLOTS = {mask: tuple(idx for idx in range(LegalMoves.count) if mask >> idx & 1)
+          for mask in set(_MASKS)}
+# action of every (slot, target), and its id
+_ACTION_IDS = tuple(PlayerActionTable.action_id(PlayerActionTable.get(
+    LegalMoves.slot_discards[slot], player_target, LegalMoves.slot_guesses[slot]))
+                    for slot in range(LegalMoves.count) for player_target in range(4))
+_ACTIONS = tuple(PlayerActionTable.action(action_id) for action_id in _ACTION_IDS)
+
+
+def _build_full(hand_card, draw_card, alive, defended, seat):
+    """(indices, effective indices, and both as actions) of a situation"""
+    opponents = [idx for idx in range(4) if alive >> idx & 1 and idx != seat]
+    open_opponents = [idx for idx in opponents if not defended >> idx & 1]
+    indices = []
+    effective = []
+    for slot in LegalMoves.slots(LegalMoves.mask(hand_card, draw_card, alive, seat)):
+        if LegalMoves.slot_self[slot]:
+            indices.append(slot * 4 + seat)
+            effective.append(slot * 4 + seat)
+            continue
+        indices.extend(slot * 4 + target for target in opponents)
+        if LegalMoves.slot_discards[slot] in _NO_OP_PROTECTED:
+            targets = open_opponents if open_opponents else opponents[:1]
+        else:
+            targets = opponents
+        effective.extend(slot * 4 + target for target in targets)
+    return (tuple(indices), tuple(effective),
+            tuple(_ACTIONS[index] for index in indices),
+            tuple(_ACTIONS[index] for index in effective))
+
+
+# memoized entries of _build_full, by FullMoves.key
+_FULL = {}
+# cards with no effect at all on a protected target
+_NO_OP_PROTECTED = (Card.guard, Card.priest)
+# slot of each (discard, guess) aimed at the player itself, or at an opponent
+_SELF_SLOT = {(LegalMoves.slot_discards[slot], LegalMoves.slot_guesses[slot]): slot
+              for slot in range(LegalMoves.count) if LegalMoves.slot_self[slot]}
+_OTHER_SLOT = {(LegalMoves.slot_discards[slot], LegalMoves.slot_guesses[slot]): slot
+               for slot in range(LegalMoves.count) if not LegalMoves.slot_self[slot]}
@@ -34,14 +34,14 @@ class PlayerActionTools():
         Generate a blank action (un-taken turn, either because the
         game is in progress or the player is knocked out
         """
-        return PlayerAction(0, 0, 0, 0)
+        return _ACTIONS[0]
 
     @staticmethod
     def simple(card):
         """
         Generate an action to just discard, no effects
         """
-        return PlayerAction(card, 0, 0, 0)
+        return _ACTIONS[int(card) * _CARD_STRIDE]
 
     @staticmethod
     def is_blank(action):
@@ -80,6 +80,51 @@ class PlayerActionTools():
         actions = np.array(player_actions, dtype=np.uint8)
         return np.reshape(actions, len(player_actions) * 4)
 
+
+class PlayerActionTable():
+    """
+    Every PlayerAction with a dense integer id.
+
+    Ids cover each discard and guess (0-8), target (0-3) and revealed card
+    (0-8), so any action of a game of up to 4 players has one:
+
+        id = ((discard * 4 + player_target) * 9 + guess) * 9 + revealed_card
+
+    action(id) returns the one shared (interned) PlayerAction of an id, so
+    logs and policies can carry the int and tuples are only built once.
+    """
+    count = 9 * 4 * 9 * 9
+
+    @staticmethod
+    def action_id(action):
+        """Id of a PlayerAction, whose fields may be numpy integers"""
+        return ((int(action.discard) * 4 + int(action.player_target)) * 9 +
+                int(action.guess)) * 9 + int(action.revealed_card)
+
+    @staticmethod
+    def action(action_id):
+        """Interned PlayerAction of an id"""
+        return _ACTIONS[action_id]
+
+    @staticmethod
+    def get(discard, player_target=0, guess=0, revealed_card=0):
+        """Interned PlayerAction of its fields, which may be numpy integers"""
+        return _ACTIONS[((int(discard) * 4 + int(player_target)) * 9 + int(guess)) * 9 +
+                        int(revealed_card)]
+
+    @staticmethod
+    def intern(action):
+        """The interned copy of an equal PlayerAction"""
+        return _ACTIONS[PlayerActionTable.action_id(action)]
+
+
+# id step of the discard
+_CARD_STRIDE = 4 * 9 * 9
+_ACTIONS = tuple(PlayerAction(discard, player_target, guess, revealed_card)
+                 for discard in range(9) for player_target in range(4)
+                 for guess in range(9) for revealed_card in range(9))
+
+
 # A Love Letter Player
 #
 #  hand_card - int corresponding to card currently in player's hand
@@ -114,7 +159,7 @@ class PlayerTools():
     @staticmethod
     def is_defended(player):
         """Returns if the player object is protected by a handmaid"""
-        actions = player.actions[:]
+        actions = player.actions
         action_index = PlayerTools._next_empty_index(actions)
         if action_index == 0:
             return False
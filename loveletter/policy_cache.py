@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+Love Letter Policy Cache
+Memoized greedy actions of a policy, keyed on the packed observation.
+"""
+import collections
+import itertools
+
+import numpy as np
+
+from loveletter.card import Card
+
+
+# observation * _SCALE is a vector of small integers: the two one-hot cards,
+# then how many of each card are consumed
+_SCALE = np.array((1,) * 16 + tuple(Card.counts), dtype=np.float64)
+
+
+class PolicyCache():
+    """
+    Greedy action slots of a model, memoized per observation.
+
+    Game.state only takes a bounded set of values (two one-hot cards and the
+    consumed count of each card) and AgentA3C plays every move from a zero
+    LSTM state, so the action for an observation never changes.
+
+    Lookups first check the table filled by warm() (or read back by load(),
+    so a table can be warmed once offline), then a bounded LRU of the
+    observations met while playing. model needs action_index(observation)
+    and, for warm(), a batched forward(observations) -> (values, logits, ...)
+    as NumpyActorCritic has. A PolicyCache can be given to AgentA3C in place
+    of the model.
+    """
+
+    def __init__(self, model, max_size=65536):
+        self._model = model
+        self.max_size = max_size
+        self._table = {}
+        self._recent = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(observation):
+        """24 byte key packing an observation of Game.state"""
+        return np.rint(observation * _SCALE).astype(np.uint8).tobytes()
+
+    def action_index(self, observation):
+        """Greedy action slot for an observation"""
+        key = PolicyCache.key(observation)
+        action_idx = self._table.get(key)
+        if action_idx is not None:
+            self.hits += 1
+            return action_idx
+
+        action_idx = self._recent.get(key)
+        if action_idx is not None:
+            self.hits += 1
+            self._recent.move_to_end(key)
+            return action_idx
+
+        self.misses += 1
+        action_idx = self._model.action_index(observation)
+        self._recent[key] = action_idx
+        if len(self._recent) > self.max_size:
+            self._recent.popitem(last=False)
+        return action_idx
+
+    def hit_rate(self):
+        """Fraction of lookups served from the cache"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        """Lookup counters and cache sizes"""
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hit_rate(),
+                "table": len(self._table),
+                "recent": len(self._recent)}
+
+    def warm(self, observations=None, batch_size=4096):
+        """
+        Precompute the actions of many observations in batches.
+
+        Defaults to every observation a player holding two cards can see.
+        Returns the table size.
+        """
+        observations = PolicyCache.observations() if observations is None \
+            else np.asarray(observations)
+        for start in range(0, len(observations), batch_size):
+            batch = observations[start:start + batch_size]
+            actions = self._model.forward(batch)[1].argmax(1)
+            for observation, action_idx in zip(batch, actions):
+                self._table[PolicyCache.key(observation)] = int(action_idx)
+        return len(self._table)
+
+    def save(self, path):
+        """Write the warmed table to an .npz file"""
+        keys = np.frombuffer(b"".join(self._table.keys()), dtype=np.uint8)
+        np.savez(path, keys=keys.reshape(len(self._table), len(_SCALE)),
+                 actions=np.array(list(self._table.values()), dtype=np.int16))
+
+    @staticmethod
+    def load(path, model, max_size=65536):
+        """Cache of model whose table is read from a file written by save"""
+        cache = PolicyCache(model, max_size)
+        with np.load(path) as arrays:
+            cache._table = dict(zip((key.tobytes() for key in arrays["keys"]),
+                                    arrays["actions"].tolist()))
+        return cache
+
+    @staticmethod
+    def observations():
+        """
+        Every observation with two cards in hand, as an (N, 24) array.
+
+        The cards in hand count as consumed, so each card's consumed count
+        ranges from its copies in hand up to its copies in the deck. The log
+        of a failed baron holds a card twice, so those rare observations
+        count more and are left to the recent cache.
+        """
+        rows = []
+        counts = Card.counts
+        for card1 in range(1, 9):
+            for card2 in range(card1, 9):
+                need = [0] * 9
+                need[card1] += 1
+                need[card2] += 1
+                if any(need[card] > counts[card - 1] for card in range(1, 9)):
+                    continue
+                ranges = [range(need[card], counts[card - 1] + 1) for card in range(1, 9)]
+                for consumed in itertools.product(*ranges):
+                    row = np.zeros(24)
+                    row[card1 - 1] = 1
+                    row[8 + card2 - 1] = 1
+                    row[16:24] = consumed
+                    rows.append(row)
+        observations = np.array(rows)
+        observations[:, 16:24] /= _SCALE[16:24]
+        return observations
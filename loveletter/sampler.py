@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Love Letter Determinization Sampler
+Batches of hidden worlds consistent with what the current player has seen.
+"""
+import numpy as np
+
+from loveletter.batch import BatchGame
+from loveletter.card import Card
+from loveletter.compact import CompactGame, Record
+
+
+class DeterminizationSampler():
+    """
+    Samples determinizations of a game for its current player.
+
+    A determinization keeps the current player's hand and drawn card and the
+    public logs, and deals the unseen cards (opponent hands, the rest of the
+    deck and the held out card) again. Opponents with a known hand keep that
+    card. Opponents with ruled out cards (a bitmask per seat, bit per card
+    id) get a card outside of their mask.
+
+    Each call shuffles the unseen cards of every row at once, by sorting a
+    matrix of uniforms, and draws again only the rows that break a mask.
+    Rows still rejected after max_rounds keep their last draw. Samples are
+    compact records (see loveletter.compact.Record), ready for a BatchGame
+    or CompactGame.
+    """
+
+    def __init__(self, game, known=None, excluded=None, max_rounds=64):
+        known = known or {}
+        excluded = excluded or {}
+        self.max_rounds = max_rounds
+        players = game.players()
+        deck = game.deck()
+
+        unseen = [int(card) for card in deck[1:]]
+        unseen += [int(players[idx].hand_card) for idx in game.opponent_turn()]
+        base = CompactGame.from_game(game).to_np().copy()
+        hidden = []
+        for idx in game.opponent_turn():
+            card = known.get(idx, Card.noCard)
+            if card != Card.noCard and card in unseen:
+                unseen.remove(card)
+                base[Record.hands + idx] = card
+            else:
+                hidden.append(idx)
+
+        self._base = base
+        self._pool = np.array(sorted(unseen), dtype=np.uint8)
+        self._hidden = np.array(hidden, dtype=np.int64)
+        self._masks = np.array([excluded.get(idx, 0) for idx in hidden], dtype=np.int64)
+        self._deck_start = Record.deck_size - len(deck) + 1
+        self.samples = 0
+        self.draws = 0
+
+    @staticmethod
+    def from_belief(belief, max_rounds=64):
+        """Sampler of the game last seen by a BeliefState of its current player"""
+        game = belief.game()
+        if belief.seat != game.player_turn():
+            raise ValueError("The belief state is not the current player's")
+        opponents = game.opponent_turn()
+        return DeterminizationSampler(game,
+                                      {idx: belief.known(idx) for idx in opponents},
+                                      {idx: belief.excluded(idx) for idx in opponents},
+                                      max_rounds)
+
+    def acceptance(self):
+        """Fraction of the shuffles drawn so far that were kept"""
+        return self.samples / self.draws if self.draws else 1.0
+
+    def sample(self, count, random_state):
+        """(count, Record.size) uint8 records, random_state is a numpy RandomState"""
+        cards = self._deal(count, random_state)
+        records = np.tile(self._base, (count, 1))
+        hidden = len(self._hidden)
+        records[:, Record.hands + self._hidden] = cards[:, :hidden]
+        records[:, self._deck_start:Record.deck_size] = cards[:, hidden:]
+        return records
+
+    def batch(self, count, random_state):
+        """BatchGame of count determinizations"""
+        return BatchGame(self.sample(count, random_state))
+
+    def games(self, count, random_state):
+        """List of count determinizations as Game objects"""
+        return [CompactGame(bytearray(record.tobytes())).to_game()
+                for record in self.sample(count, random_state)]
+
+    def _deal(self, count, random_state):
+        """(count, len(pool)) shuffles of the unseen cards, hidden hands first"""
+        pool = self._pool
+        hidden = len(self._hidden)
+        cards = np.empty((count, len(pool)), dtype=np.uint8)
+        todo = np.arange(count)
+        for _ in range(self.max_rounds):
+            order = np.argsort(random_state.uniform(size=(len(todo), len(pool))), axis=1)
+            dealt = pool[order]
+            self.draws += len(todo)
+            if self._masks.any():
+                kept = ((self._masks >> dealt[:, :hidden]) & 1).sum(axis=1) == 0
+            else:
+                kept = np.ones(len(todo), dtype=bool)
+            cards[todo[kept]] = dealt[kept]
+            self.samples += int(kept.sum())
+            todo = todo[~kept]
+            if not len(todo):
+                break
+        else:
+            cards[todo] = dealt[~kept]
+        return cards
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+Love Letter Subprocess Environment
+Games are split across worker processes. Each worker steps its slice and
+writes observations, rewards, dones and infos straight into shared memory,
+so the main process reads them as numpy views without any copies or pickling.
+"""
+import multiprocessing
+
+import numpy as np
+
+from loveletter.moves import LegalMoves
+from loveletter.vec_env import LoveLetterVecEnv
+
+
+class EnvList():
+    """
+    Vectorized view over single game envs (eg LoveLetterEnv).
+
+    Each env must provide reset(), step(action) and actions_possible(), as
+    LoveLetterEnv does. Finished envs are reset right away.
+    """
+
+    def __init__(self, envs):
+        self._envs = envs
+        self.num_envs = len(envs)
+
+    def reset(self):
+        """(K, 24) observations of new games"""
+        return np.stack([env.reset() for env in self._envs])
+
+    def legal_mask(self):
+        """(K, 15) True where an action slot is playable"""
+        mask = np.zeros((self.num_envs, LegalMoves.count), dtype=bool)
+        for idx, env in enumerate(self._envs):
+            mask[idx, [slot for slot, _ in env.actions_possible()]] = True
+        return mask
+
+    def step(self, actions):
+        """Step every env, returning stacked results"""
+        observations = []
+        rewards = np.zeros(self.num_envs)
+        dones = np.zeros(self.num_envs, dtype=bool)
+        rounds = np.zeros(self.num_envs, dtype=np.int64)
+        for idx, (env, action) in enumerate(zip(self._envs, actions)):
+            observation, rewards[idx], dones[idx], info = env.step(int(action))
+            rounds[idx] = info["round"]
+            if dones[idx]:
+                observation = env.reset()
+            observations.append(observation)
+        infos = {"round": rounds, "winner": np.full(self.num_envs, -1)}
+        return np.stack(observations), rewards, dones, infos
+
+
+class _Buffers():
+    """numpy views over the shared memory blocks"""
+
+    def __init__(self, shared, num_envs):
+        self.shared = shared
+        self.actions = np.frombuffer(shared["actions"], dtype=np.int64)
+        self.observations = np.frombuffer(shared["observations"]).reshape(
+            num_envs, LoveLetterVecEnv.observation_size)
+        self.rewards = np.frombuffer(shared["rewards"])
+        self.dones = np.frombuffer(shared["dones"], dtype=np.uint8).view(bool)
+        self.rounds = np.frombuffer(shared["rounds"], dtype=np.int64)
+        self.winners = np.frombuffer(shared["winners"], dtype=np.int64)
+        self.legal = np.frombuffer(shared["legal"], dtype=np.uint8).view(bool).reshape(
+            num_envs, LegalMoves.count)
+
+    @staticmethod
+    def allocate(context, num_envs):
+        """Allocate the shared memory blocks"""
+        return _Buffers({
+            "actions": context.RawArray('b', num_envs * 8),
+            "observations": context.RawArray('b', num_envs *
+                                             LoveLetterVecEnv.observation_size * 8),
+            "rewards": context.RawArray('b', num_envs * 8),
+            "dones": context.RawArray('b', num_envs),
+            "rounds": context.RawArray('b', num_envs * 8),
+            "winners": context.RawArray('b', num_envs * 8),
+            "legal": context.RawArray('b', num_envs * LegalMoves.count),
+        }, num_envs)
+
+
+def _worker(conn, env_fn, seed, start, stop, shared, num_envs):
+    """Step the games [start, stop) on command, writing into shared memory"""
+    buffers = _Buffers(shared, num_envs)
+    env = env_fn(stop - start, seed)
+    window = slice(start, stop)
+    try:
+        while True:
+            command = conn.recv()
+            if command == "step":
+                observations, rewards, dones, infos = env.step(buffers.actions[window])
+                buffers.rewards[window] = rewards
+                buffers.dones[window] = dones
+                buffers.rounds[window] = infos["round"]
+                buffers.winners[window] = infos["winner"]
+            elif command == "reset":
+                observations = env.reset()
+            else:
+                break
+            buffers.observations[window] = observations
+            buffers.legal[window] = env.legal_mask()
+            conn.send(True)
+    finally:
+        conn.close()
+
+
+class SubprocVecEnv():
+    """
+    Vectorized Love Letter environment spread over worker processes
+
+    Worker i steps games [start_i, stop_i) with env_fn(count, seed + i), which
+    defaults to a LoveLetterVecEnv. Use EnvList to run single LoveLetterEnv
+    games instead.
+
+    The arrays returned by reset and step are views of shared memory and are
+    overwritten by the next call; copy anything that must be kept.
+    """
+
+    action_count = LegalMoves.count
+    observation_size = LoveLetterVecEnv.observation_size
+
+    def __init__(self, num_envs, num_workers=None, seed=451, env_fn=None):
+        num_workers = multiprocessing.cpu_count() if num_workers is None else num_workers
+        num_workers = max(1, min(num_workers, num_envs))
+        env_fn = LoveLetterVecEnv if env_fn is None else env_fn
+        self.num_envs = num_envs
+
+        # fork hands the (possibly unpicklable) env_fn straight to workers
+        context = multiprocessing.get_context(
+            'fork' if 'fork' in multiprocessing.get_all_start_methods() else None)
+        self._buffers = _Buffers.allocate(context, num_envs)
+
+        bounds = np.linspace(0, num_envs, num_workers + 1).astype(int)
+        self._conns = []
+        self._processes = []
+        for idx in range(num_workers):
+            conn, conn_worker = context.Pipe()
+            process = context.Process(
+                target=_worker,
+                args=(conn_worker, env_fn, seed + idx, bounds[idx], bounds[idx + 1],
+                      self._buffers.shared, num_envs))
+            process.daemon = True
+            process.start()
+            conn_worker.close()
+            self._conns.append(conn)
+            self._processes.append(process)
+        self._closed = False
+
+    def reset(self):
+        """Deal new games everywhere, returning the (K, 24) observations view"""
+        self._command("reset")
+        return self._buffers.observations
+
+    def step_async(self, actions):
+        """Start stepping every game with an action slot each"""
+        self._buffers.actions[:] = actions
+        for conn in self._conns:
+            conn.send("step")
+
+    def step_wait(self):
+        """Wait for step_async, returning observations, rewards, dones, infos"""
+        for conn in self._conns:
+            conn.recv()
+        buffers = self._buffers
+        infos = {"round": buffers.rounds, "winner": buffers.winners}
+        return buffers.observations, buffers.rewards, buffers.dones, infos
+
+    def step(self, actions):
+        """Step every game, returning observations, rewards, dones, infos"""
+        self.step_async(actions)
+        return self.step_wait()
+
+    def legal_mask(self):
+        """(K, 15) True where an action slot is playable"""
+        return self._buffers.legal
+
+    def close(self):
+        """Stop the worker processes"""
+        if self._closed:
+            return
+        for conn in self._conns:
+            conn.send("close")
+            conn.close()
+        for process in self._processes:
+            process.join()
+        self._closed = True
+
+    def _command(self, command):
+        """Send a command to every worker and wait for them"""
+        for conn in self._conns:
+            conn.send(command)
+        for conn in self._conns:
+            conn.recv()
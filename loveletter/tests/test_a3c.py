@@ -0,0 +1,35 @@
+"""Tests for the A3C agent's model loading"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from loveletter.agents import a3c
+from loveletter.tests.test_numpy_model import random_weights
+from loveletter.trainers.numpy_model import export_npz
+
+
+class TestLoadModel(unittest.TestCase):
+    """Models cached per process"""
+
+    def test_saved_again(self):
+        """A file saved again replaces its cached model rather than adding one"""
+        observation = np.random.RandomState(3).uniform(size=(1, 24))
+        with tempfile.TemporaryDirectory() as path:
+            name = os.path.join(path, "model.npz")
+            export_npz(random_weights(1), name)
+            model = a3c.load_model(name, None)
+            self.assertIs(a3c.load_model(name, None), model)
+
+            export_npz(random_weights(2), name)
+            os.utime(name, ns=(0, os.stat(name).st_mtime_ns + 1))
+            reloaded = a3c.load_model(name, None)
+            self.assertIsNot(reloaded, model)
+            self.assertFalse(np.allclose(reloaded.forward(observation)[1],
+                                         model.forward(observation)[1]))
+            self.assertEqual(sum(key[0] == os.path.abspath(name) for key in a3c._MODELS), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
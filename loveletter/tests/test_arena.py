@@ -1,7 +1,9 @@
 
 import unittest
 from loveletter.arena import Arena
+from loveletter.agents.agent import Agent
 from loveletter.agents.random import AgentRandom
+from loveletter.game import Game
 
 
 class TestArenaNames(unittest.TestCase):
@@ -92,5 +94,83 @@ class TestArenaCsv(unittest.TestCase):
         ])
 
 
+class TestArenaParallel(unittest.TestCase):
+    """Test the multi-process arena"""
+
+    def test_matches_serial(self):
+        """Sharded results match the serial arena"""
+        agents = [
+            ("Random A", lambda seed: AgentRandom(seed)),
+            ("Random C", lambda seed: AgentRandom(seed + 1)),
+            ("Random B", lambda seed: AgentRandom(seed * 2))
+        ]
+        serial = Arena(agents, 25)
+        parallel = Arena(agents, 25, processes=2, chunk_size=7)
+        self.assertListEqual(parallel.results(), serial.results())
+        self.assertListEqual(parallel.csv_results_lists(),
+                             serial.csv_results_lists())
+
+    def test_compare_float(self):
+        """Sharded win rates match the serial ones"""
+        self.assertEqual(
+            Arena.compare_agents_float(AgentRandom, AgentRandom, 30, 9, processes=3),
+            Arena.compare_agents_float(AgentRandom, AgentRandom, 30, 9))
+
+
+class TestArenaReuse(unittest.TestCase):
+    """Test reusing agents between games"""
+
+    def test_reset(self):
+        """A reset agent plays as a freshly built one"""
+        game = Game.new(4, 3)
+        agent = AgentRandom(1)
+        agent.move(game)
+        agent.reset(8)
+        fresh = AgentRandom(8)
+        for _ in range(5):
+            self.assertEqual(agent.move(game), fresh.move(game))
+
+    def test_matches_rebuilding(self):
+        """Reused agents give the same results as agents built per game"""
+        agents = [
+            ("Random A", lambda seed: AgentRandom(seed)),
+            ("Random B", lambda seed: AgentRandom(seed))
+        ]
+        self.assertListEqual(Arena(agents, 20, reuse_agents=True).results(),
+                             Arena(agents, 20).results())
+        self.assertListEqual(
+            Arena(agents, 20, processes=2, reuse_agents=True).results(),
+            Arena(agents, 20).results())
+
+    def test_builds_once(self):
+        """Agents are built once and reset afterwards"""
+        built = []
+
+        def build(seed):
+            built.append(seed)
+            return AgentRandom(seed)
+
+        Arena.compare_agents(build, build, 10, 4, reuse_agents=True)
+        self.assertListEqual(built, [4, 4])
+
+    def test_without_reset(self):
+        """Agents that can't reset are built for every game"""
+        built = []
+
+        class AgentFixed(AgentRandom):
+            """Random agent without reset support"""
+
+            def reset(self, seed):
+                Agent.reset(self, seed)
+
+        def build(seed):
+            built.append(seed)
+            return AgentFixed(seed)
+
+        wins = Arena.compare_agents(build, AgentRandom, 10, 4, reuse_agents=True)
+        self.assertEqual(wins, Arena.compare_agents(AgentRandom, AgentRandom, 10, 4))
+        self.assertListEqual(built, list(range(4, 14)))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,84 @@
+"""Tests for the batched Love Letter game"""
+
+import unittest
+import numpy as np
+
+from loveletter.batch import BatchGame
+from loveletter.card import Card
+from loveletter.compact import CompactGame
+from loveletter.game import Game
+from loveletter.player import PlayerAction, PlayerActionTools
+
+
+class TestBatchGame(unittest.TestCase):
+    """Batched games must match Game exactly"""
+
+    def test_new(self):
+        """A new batch matches new games"""
+        batch = BatchGame.new(range(10))
+        games = [Game.new(4, seed) for seed in range(10)]
+        self.assertEqual(len(batch), 10)
+        self.assertTrue(batch.active().all())
+        self.assertListEqual(list(batch.winner()), [-1] * 10)
+        self.assertTrue(np.array_equal(batch.state(),
+                                       np.stack([game.state() for game in games])))
+        self.assertListEqual(list(batch.draw_card()),
+                             [game.draw_card() for game in games])
+
+    def test_legal_mask(self):
+        """The mask lists the slots that Agent.valid_actions would keep"""
+        batch = BatchGame.new([1])
+        mask = batch.legal_mask()[0]
+        game = Game.new(4, 1)
+        for slot in range(15):
+            action = PlayerAction(BatchGame.slot_discards[slot],
+                                  0 if BatchGame.slot_self[slot] else 1,
+                                  BatchGame.slot_guesses[slot], 0)
+            self.assertEqual(mask[slot], game.is_action_valid(action))
+
+    def test_invalid(self):
+        """Invalid actions leave their game untouched"""
+        batch = BatchGame.new([0, 0])
+        before = batch.records().copy()
+        actions = np.array([[Card.guard, 1, Card.guard, 0],
+                            [Card.king, 1, 0, 0]], dtype=np.uint8)
+        rewards = batch.move(actions)
+        self.assertListEqual(list(rewards), [-1, 0])
+        self.assertTrue((batch.records()[0] == before[0]).all())
+        self.assertFalse((batch.records()[1] == before[1]).all())
+
+    def test_random_games(self):
+        """Random batched games match the same moves played one at a time"""
+        seeds = list(range(300))
+        player_counts = [2 + seed % 3 for seed in seeds]
+        batch = BatchGame.from_games([Game.new(count, seed)
+                                      for seed, count in zip(seeds, player_counts)])
+        games = [CompactGame.new(count, seed)
+                 for seed, count in zip(seeds, player_counts)]
+        random_state = np.random.RandomState(5)
+
+        while batch.active().any():
+            mask = batch.legal_mask()
+            actions = batch.random_actions(random_state)
+            self.assertTrue(batch.is_action_valid(actions)[batch.active()].all())
+            rewards = batch.move(actions)
+
+            for idx, game in enumerate(games):
+                if game.over():
+                    continue
+                self.assertTrue(mask[idx].any())
+                action = PlayerActionTools.from_np(actions[idx])
+                game, reward = game.move(action)
+                while not game.is_current_player_playing() and game.active():
+                    game = game.skip_eliminated_player()
+                games[idx] = game
+                self.assertEqual(rewards[idx], reward)
+                self.assertEqual(batch.game(idx).record(), game.record())
+
+        self.assertListEqual(list(batch.winner()), [game.winner() for game in games])
+        self.assertTrue(np.array_equal(batch.state(),
+                                       np.stack([game.state() for game in games])))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""Tests for the belief state"""
+
+import unittest
+
+from loveletter.belief import BeliefState
+from loveletter.card import Card
+from loveletter.game import Game
+from loveletter.player import PlayerAction, PlayerTools
+from loveletter.tests.test_games import TestGames
+
+
+class TestBeliefState(unittest.TestCase):
+    """Belief state"""
+
+    def test_consistent(self):
+        """Hands held are never ruled out and known cards are right"""
+        known = 0
+        excluded = 0
+        for seed in range(60):
+            games = TestGames.positions(seed)
+            for seat in range(4):
+                belief = BeliefState(games[0], seat)
+                for game in games[1:]:
+                    belief.update(game)
+                    counts = [0] * 9
+                    for card in game.deck():
+                        counts[card] += 1
+                    for player in game.players():
+                        counts[player.hand_card] += 1
+                    counts[Card.noCard] = 0
+                    self.assertEqual(belief._pool, counts)
+
+                    for other, player in enumerate(game.players()):
+                        if other == seat or not PlayerTools.is_playing(player):
+                            continue
+                        posterior = belief.posterior(other)
+                        self.assertAlmostEqual(posterior.sum(), 1)
+                        self.assertGreater(posterior[player.hand_card], 0)
+                        if belief.known(other) != Card.noCard:
+                            self.assertEqual(belief.known(other), player.hand_card)
+                            known += 1
+                        if belief.excluded(other):
+                            self.assertFalse(belief.excluded(other) >> player.hand_card & 1)
+                            excluded += 1
+        self.assertGreater(known, 0)
+        self.assertGreater(excluded, 0)
+
+    def test_guard_miss(self):
+        """A failed guard guess rules the card out for everyone"""
+        game = Game.new(4, 0)
+        game = Game([Card.guard] + list(game.deck()[1:]), game.players(),
+                    game.turn_index(), game.discard_counts())
+        target = game.players()[1].hand_card
+        guess = Card.priest if target != Card.priest else Card.baron
+        beliefs = [BeliefState(game, seat) for seat in range(4)]
+        game, _ = game.move(PlayerAction(Card.guard, 1, guess, Card.noCard))
+        for belief in beliefs:
+            belief.update(game)
+        for seat in (0, 2, 3):
+            self.assertEqual(beliefs[seat].posterior(1)[guess], 0)
+        self.assertEqual(beliefs[1].posterior(1)[target], 1)
+
+    def test_unseen(self):
+        """Unseen cards leave out the observer's own hand and draw"""
+        game = Game.new(4, 3)
+        belief = BeliefState(game, 0)
+        unseen = belief.unseen()
+        self.assertEqual(sum(unseen), sum(Card.counts) - 2)
+        unseen[game.players()[0].hand_card] += 1
+        unseen[game.deck()[0]] += 1
+        self.assertEqual(unseen, [0] + list(Card.counts))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+"""Tests for the CFR tables, trainer and agent"""
+
+import collections
+import multiprocessing
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from loveletter.agents.cfr import AgentCFR, load_table
+from loveletter.agents.random import AgentRandom
+from loveletter.card import Card
+from loveletter.cfr import InfoSet, StrategyTable
+from loveletter.game import Game
+from loveletter.moves import LegalMoves
+from loveletter.trainers.cfr_train import OutcomeSampling, run_parallel
+
+
+class TestCFR(unittest.TestCase):
+    """CFR tables, trainer and agent"""
+
+    def test_key(self):
+        """The order of the two cards held does not matter"""
+        game = Game.new(4, 1)
+        deck = list(game.deck())
+        players = game.players()
+        swapped = [players[0]._replace(hand_card=deck[0])] + players[1:]
+        other = Game([players[0].hand_card] + deck[1:], swapped, 0)
+        self.assertEqual(InfoSet.key(game), InfoSet.key(other))
+        self.assertEqual(InfoSet.key(game)[1], None)
+
+    def test_reveal(self):
+        """A priest's reveal is part of the next information set"""
+        game = Game.new(4, 0)
+        game = Game([Card.priest] + list(game.deck()[1:]), game.players(), 0)
+        game, _ = game.move(LegalMoves.action(7, 1))
+        agent = AgentRandom(0)
+        while game.player_turn() != 0:
+            game, _ = game.move(agent.move(game))
+        seat, card = InfoSet.reveal(game)
+        if game.players()[1].actions[0].discard in (game.players()[0].actions[0].revealed_card,
+                                                    Card.king):
+            self.assertEqual(seat, None)
+        else:
+            self.assertEqual(seat, 1)
+            self.assertEqual(card, game.players()[1].hand_card)
+
+    def test_save_load(self):
+        """Tables survive a round trip through an .npz file"""
+        table = StrategyTable(4)
+        OutcomeSampling(table, seed=2).run(50)
+        with tempfile.TemporaryDirectory() as path:
+            name = os.path.join(path, "table.npz")
+            table.save(name)
+            loaded = StrategyTable.load(name)
+        self.assertEqual(loaded.keys(), table.keys())
+        np.testing.assert_allclose(loaded.regrets[:len(table)],
+                                   table.regrets[:len(table)], rtol=1e-6)
+        np.testing.assert_allclose(loaded.strategy[:len(table)],
+                                   table.strategy[:len(table)], rtol=1e-6)
+
+    def test_load_table(self):
+        """A table saved again replaces the one cached for its file"""
+        table = StrategyTable(4)
+        OutcomeSampling(table, seed=2).run(20)
+        with tempfile.TemporaryDirectory() as path:
+            name = os.path.join(path, "table.npz")
+            table.save(name)
+            loaded = load_table(name)
+            self.assertIs(load_table(name), loaded)
+            OutcomeSampling(table, seed=3).run(20)
+            table.save(name)
+            os.utime(name, ns=(0, os.stat(name).st_mtime_ns + 1))
+            reloaded = load_table(name)
+        self.assertIsNot(reloaded, loaded)
+        self.assertEqual(len(reloaded), len(table))
+
+    def test_regrets(self):
+        """Iterations fill in regrets and strategy sums of the rows met"""
+        table = StrategyTable()
+        OutcomeSampling(table, seed=3).run(200)
+        self.assertGreater(len(table), 100)
+        self.assertTrue(np.isfinite(table.regrets).all())
+        self.assertTrue((table.strategy >= 0).all())
+        self.assertGreater((table.regrets[:len(table)] != 0).any(axis=1).sum(), 10)
+        self.assertGreater((table.strategy[:len(table)] > 0).any(axis=1).sum(), 50)
+
+    def test_parallel(self):
+        """Processes add up to the same tables as running their work in turn"""
+        serial = run_parallel(StrategyTable(), 40, 2, 5)
+        context = multiprocessing.get_context(
+            'fork' if 'fork' in multiprocessing.get_all_start_methods() else None)
+        with context.Pool(2) as pool:
+            parallel = run_parallel(StrategyTable(), 40, 2, 5, pool=pool)
+        self.assertEqual(sorted(serial.keys()), sorted(parallel.keys()))
+        for key in serial.keys():
+            np.testing.assert_allclose(serial.regrets[serial.row(key)],
+                                       parallel.regrets[parallel.row(key)])
+
+    def test_seat_rotation(self):
+        """Rounds split over workers update every seat as often"""
+        seats = collections.Counter()
+        walk = OutcomeSampling._walk
+
+        def counted(trainer, game, seat, reach_other, sample):
+            if game.turn_index() == 0:
+                seats[seat] += 1
+            return walk(trainer, game, seat, reach_other, sample)
+
+        with mock.patch.object(OutcomeSampling, "_walk", counted):
+            table = StrategyTable()
+            run_parallel(table, 10, 3, 5)
+            run_parallel(table, 10, 3, 6, done=10)
+        self.assertEqual(seats, {0: 5, 1: 5, 2: 5, 3: 5})
+
+    def test_agent(self):
+        """The agent only plays valid actions, and repeats itself when reset"""
+        table = StrategyTable()
+        OutcomeSampling(table, seed=4).run(300)
+        for greedy in (False, True):
+            agent = AgentCFR(table, 6, greedy)
+            moves = []
+            for _ in range(2):
+                agent.reset(6)
+                game = Game.new(4, 6)
+                played = []
+                while game.active():
+                    if not game.is_current_player_playing():
+                        game = game.skip_eliminated_player()
+                        continue
+                    action = agent.move(game)
+                    self.assertTrue(game.is_action_valid(action))
+                    played.append(action)
+                    game, _ = game.move(action)
+                moves.append(played)
+            self.assertEqual(moves[0], moves[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+"""Tests for the compact array-backed Love Letter game"""
+
+import unittest
+import numpy as np
+
+from loveletter.card import Card
+from loveletter.compact import CompactGame, Record
+from loveletter.game import Game
+from loveletter.player import PlayerAction, PlayerActionTools, PlayerTools
+from loveletter.tests.test_games import TestGames
+
+
+class TestCompactGame(unittest.TestCase):
+    """Compact games must match Game exactly"""
+
+    def assert_same(self, game, compact):
+        """Checks that a Game and a CompactGame describe the same state"""
+        self.assertTrue(np.array_equal(game.deck(), compact.deck()))
+        self.assertListEqual(game.players(), compact.players())
+        self.assertEqual(game.turn_index(), compact.turn_index())
+        self.assertEqual(game.active(), compact.active())
+        self.assertEqual(game.winner(), compact.winner())
+        self.assertListEqual(game.opponent_turn(), compact.opponent_turn())
+        self.assertEqual(game.draw_card(), compact.draw_card())
+        for idx in range(len(game.players())):
+            self.assertEqual(game.is_winner(idx), compact.is_winner(idx))
+        self.assertTrue(np.array_equal(game.state(), compact.state()))
+
+    def test_new(self):
+        """A new compact game matches a new game"""
+        for seed in range(20):
+            self.assert_same(Game.new(4, seed), CompactGame.new(4, seed))
+        self.assert_same(Game.new(2, 3), CompactGame.new(2, 3))
+
+    def test_round_trip(self):
+        """Game -> CompactGame -> Game is lossless"""
+        game = TestGames.replay(1, [1, 1, 3, 0, 4, 1, 0, 0, 1, 1, 3, 0, 1, 2, 6, 0,
+                                    7, 0, 0, 0, 1, 2, 2, 0, 8, 2, 0, 0, 1, 1, 5, 0])
+        compact = CompactGame.from_game(game)
+        self.assert_same(game, compact)
+        self.assert_same(compact.to_game(), compact)
+        self.assertEqual(CompactGame.from_game(compact.to_game()).record(),
+                         compact.record())
+        self.assertEqual(len(compact.record()), Record.size)
+
+    def test_numpy_record(self):
+        """A priest's reveal is logged from numpy actions and records"""
+        game = Game.new(4, 0)
+        game = Game([Card.priest] + list(game.deck()[1:]), game.players(), 0)
+        compact = CompactGame(np.frombuffer(CompactGame.from_game(game).record(),
+                                             dtype=np.uint8))
+        action = PlayerActionTools.from_np(np.array([Card.priest, 1, 0, 0], dtype=np.uint8))
+        revealed = PlayerAction(Card.priest, 1, 0, game.players()[1].hand_card)
+        game, _ = game.move(action)
+        compact, _ = compact.move(action)
+        self.assertEqual(game.players()[0].actions[0], revealed)
+        self.assertEqual(compact.players()[0].actions[0], revealed)
+
+        for action, _, game in TestGames.random_play(0, game=game):
+            if action is None:
+                compact = compact.skip_eliminated_player()
+                continue
+            compact, _ = compact.move(action)
+            compact = CompactGame(np.frombuffer(compact.record(), dtype=np.uint8))
+        self.assertListEqual(game.players(), compact.players())
+
+    def test_flags(self):
+        """Alive and defended flags follow the moves"""
+        compact = CompactGame.new(4, 2)
+        compact, _ = compact.move(PlayerAction(Card.handmaid, 0, 0, 0))
+        record = compact.record()
+        self.assertEqual(record[Record.defended], 0b0001)
+        self.assertEqual(record[Record.slots], 1)
+
+        compact = CompactGame.new(4, 48)
+        compact, _ = compact.move(PlayerAction(Card.baron, 3, 0, 0))
+        self.assertEqual(compact.record()[Record.alive], 0b0111)
+        self.assertFalse(PlayerTools.is_playing(compact.players()[3]))
+
+    def test_invalid(self):
+        """Invalid moves leave the game untouched"""
+        compact = CompactGame.new()
+        action = PlayerAction(Card.guard, 1, Card.guard, 0)
+        self.assertFalse(compact.is_action_valid(action))
+        compact_next, reward = compact.move(action)
+        self.assertIs(compact_next, compact)
+        self.assertEqual(reward, -1)
+        self.assertRaises(Exception, compact.move, action, True)
+
+    def test_random_games(self):
+        """Random games played in lockstep stay identical"""
+        for seed in range(200):
+            player_count = 2 + seed % 3
+            compact = CompactGame.new(player_count, seed)
+            for action, reward, game in TestGames.random_play(seed, player_count):
+                if action is None:
+                    compact = compact.skip_eliminated_player()
+                    continue
+                self.assertTrue(compact.is_action_valid(action))
+                compact, reward_compact = compact.move(action)
+                self.assertEqual(reward, reward_compact)
+                self.assert_same(game, compact)
+            self.assertTrue(compact.over())
+
+    def test_action_validity(self):
+        """Every action is judged the same way as Game does"""
+        for seed in range(10):
+            for game in TestGames.turns(seed):
+                compact = CompactGame.from_game(game)
+                for discard in range(9):
+                    for target in range(4):
+                        for guess in range(9):
+                            action = PlayerAction(discard, target, guess, 0)
+                            self.assertEqual(game.is_action_valid(action),
+                                             compact.is_action_valid(action))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+"""Tests for the make/unmake game cursor"""
+
+import unittest
+
+import numpy as np
+
+from loveletter.cursor import GameCursor
+from loveletter.endgame import EndgameSolver
+from loveletter.game import Game
+from loveletter.moves import LegalMoves
+from loveletter.tests.test_games import TestGames
+
+
+class TestGameCursor(unittest.TestCase):
+    """Game cursor"""
+
+    def assert_same(self, game, cursor):
+        """Cursor is at the position of the game"""
+        self.assertTrue(np.array_equal(game.deck(), cursor.deck()))
+        self.assertListEqual(game.players(), cursor.players())
+        self.assertEqual(game.turn_index(), cursor.turn_index())
+        self.assertEqual(game.active(), cursor.active())
+        self.assertEqual(game.winner(), cursor.winner())
+
+    def test_play_and_rewind(self):
+        """Moves match Game.move and unmake restores every record exactly"""
+        for seed in range(40):
+            before = Game.new(4, seed)
+            cursor = GameCursor.from_game(before)
+            records = [cursor.record()]
+            for action, _, game in TestGames.random_play(seed):
+                if action is None:
+                    self.assertTrue(cursor.skip())
+                else:
+                    self.assertEqual(cursor.legal_mask(), LegalMoves.game_mask(before))
+                    cursor.make(action)
+                self.assert_same(game, cursor)
+                before = game
+                records.append(cursor.record())
+
+            self.assertEqual(cursor.depth(), len(records) - 1)
+            while cursor.depth():
+                records.pop()
+                cursor.unmake()
+                self.assertEqual(cursor.record(), records[-1])
+
+    def test_tree(self):
+        """Every action at every node of a small tree, checked against Game"""
+        for seed in range(3):
+            game = Game.new(4, seed)
+            cursor = GameCursor.from_game(game)
+            self.assertEqual(self.walk(game, cursor, 3), self.walk(game, cursor, 3))
+
+    def walk(self, game, cursor, depth):
+        """Leaves below a node, checking each child and the undo"""
+        while game.active() and not game.is_current_player_playing():
+            game = game.skip_eliminated_player()
+            cursor.skip()
+        if depth == 0 or game.over():
+            return 1
+        record = cursor.record()
+        leaves = 0
+        for action in EndgameSolver.actions(game):
+            child = game._move(action)
+            cursor.make(action)
+            self.assert_same(child, cursor)
+            leaves += self.walk(child, cursor, depth - 1)
+            while cursor.record() != record:
+                cursor.unmake()
+        return leaves
+
+
+if __name__ == '__main__':
+    unittest.main()
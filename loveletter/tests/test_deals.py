@@ -0,0 +1,66 @@
+"""Tests for the deal bank and vectorized deck generation"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from loveletter.card import Card
+from loveletter.deals import DealBank
+from loveletter.game import Game
+
+
+class TestDeals(unittest.TestCase):
+    """Deal banks and Card.shuffle_decks"""
+
+    def test_shuffle_decks(self):
+        """Every row is a shuffle of the deck, reproducible from its seed"""
+        decks = Card.shuffle_decks(500, np.random.RandomState(1))
+        self.assertEqual(decks.shape, (500, 16))
+        self.assertEqual(decks.dtype, np.uint8)
+        expected = np.sort(Card.shuffle_deck(0))
+        for deck in decks:
+            np.testing.assert_array_equal(np.sort(deck), expected)
+        self.assertGreater(len({deck.tobytes() for deck in decks}), 490)
+        np.testing.assert_array_equal(
+            decks, Card.shuffle_decks(500, np.random.RandomState(1)))
+
+    def test_seeded(self):
+        """A seeded bank holds the decks Card.shuffle_deck gives each seed"""
+        bank = DealBank.seeded(50)
+        self.assertEqual(len(bank), 50)
+        for seed in range(50):
+            np.testing.assert_array_equal(bank.deck(seed), Card.shuffle_deck(seed))
+            self.assertEqual(bank.deck(seed).dtype, Card.shuffle_deck(seed).dtype)
+
+    def test_save_open(self):
+        """Banks survive a round trip through an .npy file, memory mapped"""
+        with tempfile.TemporaryDirectory() as path:
+            name = os.path.join(path, "deals.npy")
+            bank = DealBank.generated(1000, seed=3, path=name, chunk_size=300)
+            np.testing.assert_array_equal(bank.decks(),
+                                          DealBank.generated(1000, seed=3).decks())
+            self.assertIsInstance(bank.decks(), np.memmap)
+            DealBank.seeded(20).save(name)
+            loaded = DealBank.open(name, in_memory=True)
+            self.assertNotIsInstance(loaded.decks(), np.memmap)
+            np.testing.assert_array_equal(loaded.deck(7), Card.shuffle_deck(7))
+            del bank
+
+    def test_game_new(self):
+        """Game.new reads seeds in the bank from it, and shuffles the others"""
+        seeds = [0, 5, 19, 20, 400]
+        expected = [Game.new(4, seed) for seed in seeds]
+        Card.set_deal_bank(DealBank.seeded(20))
+        try:
+            for seed, game in zip(seeds, expected):
+                dealt = Game.new(4, seed)
+                np.testing.assert_array_equal(dealt.deck(), game.deck())
+                self.assertEqual(dealt.players(), game.players())
+        finally:
+            Card.set_deal_bank(None)
+
+
+if __name__ == '__main__':
+    unittest.main()
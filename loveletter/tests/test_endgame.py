@@ -0,0 +1,103 @@
+"""Tests for the endgame solver"""
+
+import unittest
+
+from loveletter.agents.ismcts import AgentISMCTS
+from loveletter.card import Card
+from loveletter.endgame import EndgameSolver
+from loveletter.game import Game
+from loveletter.tests.test_games import TestGames
+
+
+def endgame(seed, cards_left):
+    """Random game played until at most cards_left cards are left"""
+    return next(game for game in TestGames.positions(seed)
+                if not game.active() or
+                (game.is_current_player_playing() and game.cards_left() <= cards_left))
+
+
+def reference_value(game):
+    """Expectimax written out directly, without a table or rotations"""
+    while game.active() and not game.is_current_player_playing():
+        game = game.skip_eliminated_player()
+    if game.over():
+        return EndgameSolver._terminal(game)
+
+    def average(games):
+        values = [reference_decision(option) for option in games]
+        return tuple(sum(value[idx] for value in values) / len(values)
+                     for idx in range(len(game.players())))
+
+    deck = list(game.deck())
+    return average([Game([deck[idx]] + deck[:idx] + deck[idx + 1:], game.players(),
+                         game.turn_index()) for idx in range(len(deck))])
+
+
+def reference_decision(game):
+    """Best action value of the current player, by brute force"""
+    seat = game.player_turn()
+    best = None
+    deck = list(game.deck())
+    for action in EndgameSolver.actions(game):
+        if action.discard == Card.prince and len(deck) >= 3:
+            values = [reference_value(Game([deck[0], deck[idx]] + deck[1:idx] + deck[idx + 1:],
+                                           game.players(), game.turn_index())._move(action))
+                      for idx in range(1, len(deck))]
+            value = tuple(sum(option[idx] for option in values) / len(values)
+                          for idx in range(len(game.players())))
+        else:
+            value = reference_value(game._move(action))
+        if best is None or value[seat] > best[seat]:
+            best = value
+    return best
+
+
+class TestEndgameSolver(unittest.TestCase):
+    """Endgame solver"""
+
+    def test_reference(self):
+        """Matches plain expectimax over every deck order"""
+        solver = EndgameSolver()
+        checked = 0
+        for seed in range(30):
+            game = endgame(seed, 2)
+            if game.over():
+                continue
+            value = solver.value(game)
+            expected = reference_decision(game)
+            for win, win_expected in zip(value, expected):
+                self.assertAlmostEqual(win, win_expected)
+            checked += 1
+        self.assertGreater(checked, 20)
+        self.assertGreater(solver.hits, 0)
+
+    def test_probabilities(self):
+        """Win probabilities of every action sum to one"""
+        solver = EndgameSolver()
+        for seed in range(10):
+            game = endgame(seed, 4)
+            if game.over():
+                continue
+            for action, value in solver.action_values(game):
+                self.assertTrue(game.is_action_valid(action))
+                self.assertAlmostEqual(sum(value), 1)
+            best = solver.best_action(game)
+            self.assertEqual(max(value[game.player_turn()]
+                                 for _, value in solver.action_values(game)),
+                             dict(solver.action_values(game))[best][game.player_turn()])
+        stats = solver.stats()
+        self.assertEqual(stats["entries"], stats["nodes"])
+        self.assertEqual(stats["lookups"], stats["nodes"] + stats["hits"])
+
+    def test_agent_switch(self):
+        """Agents hand the last cards over to the solver"""
+        game = endgame(5, 3)
+        agent = AgentISMCTS(5, iterations=10, endgame_cards=3, endgame_worlds=2)
+        action = agent.move(game)
+        self.assertTrue(game.is_action_valid(action))
+        self.assertGreater(agent.solver.nodes, 0)
+        self.assertEqual(agent.iterations_total, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+"""Tests for the gym Love Letter environment"""
+
+import unittest
+import numpy as np
+
+from loveletter.agents.random import AgentRandom
+from loveletter.env import LoveLetterEnv
+from loveletter.moves import FullMoves
+from loveletter.player import PlayerTools
+
+
+class TestEnv(unittest.TestCase):
+    """Gym environment"""
+
+    def test_full_actions(self):
+        """Full action games play through the 60 FullMoves indices"""
+        for seed in range(20):
+            env = LoveLetterEnv(AgentRandom(seed), seed, full_actions=True)
+            self.assertEqual(env.action_space.n, FullMoves.count)
+            self.assertEqual(len(env.actions_set()), FullMoves.count)
+            np_random = np.random.RandomState(seed)
+            env.reset()
+            done = False
+            while not done:
+                game = env._game
+                legal = FullMoves.game_indices(game)
+                for idx in range(FullMoves.count):
+                    action = env.action_from_index(idx)
+                    if idx in legal:
+                        self.assertEqual(action, FullMoves.action(idx))
+                        self.assertTrue(game.is_action_valid(action))
+                    else:
+                        self.assertIsNone(action)
+                self.assertEqual([idx for idx, _ in env.actions_possible()], list(legal))
+
+                action, _, idx = env.action_by_score(np_random.random_sample(FullMoves.count))
+                self.assertIn(idx, legal)
+                self.assertEqual(action, FullMoves.action(idx))
+                _, reward, done, _ = env.step(idx)
+                self.assertIn(reward, (-5, 0, 15))
+            self.assertTrue(env._game.over() or
+                            not PlayerTools.is_playing(env._game.players()[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,8 +3,9 @@
 import unittest
 from loveletter.game import Game
 from loveletter.card import Card
-from loveletter.player import PlayerAction, PlayerActionTools
+from loveletter.player import PlayerAction, PlayerActionTable, PlayerActionTools
 from loveletter.player import PlayerTools
+from loveletter.tests.test_games import TestGames
 
 
 class TestStatics(unittest.TestCase):
@@ -322,5 +323,42 @@ class TestBasic(unittest.TestCase):
         self.assertTrue(game.over())
         self.assertEqual(0, game.winner())
 
+    def test_move_id(self):
+        """Moving by action id is the same as moving by action"""
+        game = Game.new(4, 5)
+        action = PlayerAction(Card.priest, 1, Card.noCard, Card.noCard)
+        game_id, reward_id = game.move_id(PlayerActionTable.action_id(action))
+        game_action, reward = game.move(action)
+
+        self.assertEqual(reward_id, reward)
+        self.assertEqual(game_id.players(), game_action.players())
+        self.assertIs(game_id.players()[0].actions[0],
+                      PlayerActionTable.get(Card.priest, 1, Card.noCard, Card.guard))
+
+    def test_summary(self):
+        """Cached winners, opponents and masks match the players"""
+        for seed in range(30):
+            for game in TestGames.positions(seed):
+                players = game.players()
+                playing = [idx for idx, player in enumerate(players)
+                           if PlayerTools.is_playing(player)]
+                self.assertEqual(game.alive_mask(), sum(1 << idx for idx in playing))
+                self.assertListEqual(game.opponent_turn(),
+                                     [idx for idx in playing if idx != game.player_turn()])
+                self.assertListEqual(game.opponents(),
+                                     [players[idx] for idx in game.opponent_turn()])
+                self.assertEqual(game.defended_mask(),
+                                 sum(1 << idx for idx, player in enumerate(players)
+                                     if PlayerTools.is_defended(player)))
+                best = max(players[idx].hand_card for idx in playing)
+                for idx in range(4):
+                    self.assertEqual(game.is_winner(idx), game.over() and idx in playing and
+                                     players[idx].hand_card == best)
+                if game.over():
+                    self.assertEqual(game.winner(), next(idx for idx in playing
+                                                         if players[idx].hand_card == best))
+                else:
+                    self.assertEqual(game.winner(), -1)
+
 if __name__ == '__main__':
     unittest.main()
@@ -3,6 +3,7 @@
 import unittest
 import numpy as np
 
+from loveletter.agents.random import AgentRandom
 from loveletter.game import Game
 from loveletter.card import Card
 from loveletter.player import PlayerAction, PlayerActionTools
@@ -28,6 +29,37 @@ class TestGames(unittest.TestCase):
 
         return game
 
+    @staticmethod
+    def random_play(seed, player_count=4, game=None):
+        """
+        Play a random game from game (a new one by default), yielding
+        (action, reward, game) after each step. action is None when an
+        eliminated player was skipped.
+        """
+        game = Game.new(player_count, seed) if game is None else game
+        agent = AgentRandom(seed)
+        while game.active():
+            if not game.is_current_player_playing():
+                game = game.skip_eliminated_player()
+                yield None, 0, game
+            else:
+                action = agent.move(game)
+                game, reward = game.move(action)
+                yield action, reward, game
+
+    @staticmethod
+    def positions(seed, player_count=4, game=None):
+        """Every position of a random game, its first one included"""
+        game = Game.new(player_count, seed) if game is None else game
+        return [game] + [position for _, _, position in
+                         TestGames.random_play(seed, player_count, game)]
+
+    @staticmethod
+    def turns(seed, player_count=4):
+        """Positions of a random game where a player is to move"""
+        return [game for game in TestGames.positions(seed, player_count)
+                if game.active() and game.is_current_player_playing()]
+
     def test_end_elimination(self):
         """Reach the end of a game by elimination"""
         game = Game.new(4, 0)
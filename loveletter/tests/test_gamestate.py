@@ -5,6 +5,7 @@ import numpy as np
 
 
 from loveletter.card import Card
+from loveletter.game import Game
 from loveletter.tests.test_games import TestGames
 
 
@@ -32,6 +33,23 @@ class TestGamestate(unittest.TestCase):
                               1 / 1,  # countess
                               1 / 1])  # princess
 
+    def test_state_into(self):
+        """State can be written into a row of a preallocated matrix"""
+        game = TestGames.replay(1, [1, 1, 3, 0, 4, 1, 0, 0, 1, 1, 3, 0])
+        states = np.ones((3, 24))
+        result = game.state_into(states[1])
+
+        self.assertIs(result.base, states)
+        self.assertListEqual(list(states[1]), list(game.state()))
+        self.assertListEqual(list(states[0]), [1] * 24)
+
+    def test_discard_counts(self):
+        """Discards carried along with moves match a fresh count"""
+        for seed in range(50):
+            for game in TestGames.positions(seed):
+                self.assertTupleEqual(game.discard_counts(),
+                                      Game.count_discards(game.players()))
+
     def check_hot_encoded(self, np_arr, card_idx):
         """Checks that all indices except for the target are 0"""
         for idx in range(8):
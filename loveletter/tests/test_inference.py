@@ -0,0 +1,88 @@
+"""Tests for the batched inference server"""
+
+import threading
+import unittest
+import numpy as np
+
+from loveletter.inference import InferenceServer
+from loveletter.tests.test_numpy_model import random_weights
+from loveletter.trainers.numpy_model import NumpyActorCritic
+
+
+class BrokenModel():
+    """Model whose forward always fails"""
+
+    def forward(self, observations):
+        raise ValueError("broken")
+
+
+class TestInferenceServer(unittest.TestCase):
+    """Inference server"""
+
+    def setUp(self):
+        self.model = NumpyActorCritic(random_weights(11))
+        self.observations = np.random.RandomState(12).uniform(size=(32, 24))
+
+    def test_results(self):
+        """Each request gets the result of its own observation"""
+        values, logits, _ = self.model.forward(self.observations)
+        with InferenceServer(self.model, max_batch=8) as server:
+            requests = [server.submit(observation) for observation in self.observations]
+            for idx, request in enumerate(requests):
+                value, logit = request.result(5)
+                np.testing.assert_allclose(value, values[idx], rtol=1e-5, atol=1e-6)
+                np.testing.assert_allclose(logit, logits[idx], rtol=1e-5, atol=1e-6)
+            self.assertEqual(server.action_index(self.observations[3]),
+                             int(logits[3].argmax()))
+
+    def test_coalescing(self):
+        """Requests queued within the deadline share batches"""
+        with InferenceServer(self.model, max_batch=16, deadline=0.5) as server:
+            requests = [server.submit(observation) for observation in self.observations]
+            for request in requests:
+                request.result(5)
+            stats = server.stats()
+        self.assertEqual(stats["requests"], 32)
+        self.assertEqual(stats["batch_sizes"], {16: 2})
+        self.assertEqual(stats["batch_size_mean"], 16)
+        self.assertGreaterEqual(stats["latency_max"], stats["latency_mean"])
+
+    def test_threads(self):
+        """Concurrent callers are all served"""
+        results = {}
+
+        def play(server, idx):
+            results[idx] = server.action_index(self.observations[idx])
+
+        with InferenceServer(self.model, max_batch=32, deadline=0.01) as server:
+            threads = [threading.Thread(target=play, args=(server, idx))
+                       for idx in range(32)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(server.stats()["requests"], 32)
+        expected = self.model.forward(self.observations)[1].argmax(1)
+        self.assertEqual([results[idx] for idx in range(32)], list(expected))
+
+    def test_error(self):
+        """A failing model raises in the caller"""
+        with InferenceServer(BrokenModel()) as server:
+            with self.assertRaises(ValueError):
+                server.infer(self.observations[0])
+
+    def test_closed(self):
+        """Requests made after close raise rather than wait forever"""
+        server = InferenceServer(self.model)
+        request = server.submit(self.observations[0])
+        server.close()
+        request.result(5)
+        with self.assertRaises(RuntimeError):
+            server.submit(self.observations[1])
+        with self.assertRaises(RuntimeError):
+            server.infer(self.observations[1])
+        server.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
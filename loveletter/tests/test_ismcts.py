@@ -0,0 +1,159 @@
+"""Tests for the Information Set MCTS agent"""
+
+import random
+import unittest
+import numpy as np
+
+from loveletter.agents.ismcts import AgentISMCTS
+from loveletter.agents.random import AgentRandom
+from loveletter.arena import Arena
+from loveletter.card import Card
+from loveletter.game import Game
+
+
+def hidden_cards(game):
+    """Sorted cards the current player cannot see"""
+    cards = [int(card) for card in game.deck()[1:]]
+    cards.extend(int(game.players()[idx].hand_card) for idx in game.opponent_turn())
+    return sorted(cards)
+
+
+class TestISMCTS(unittest.TestCase):
+    """Information Set MCTS agent"""
+
+    def test_determinize(self):
+        """Determinizations only reshuffle what the player cannot see"""
+        agent = AgentISMCTS(3)
+        game = Game.new(4, 5)
+        game, _ = game.move(AgentRandom(5).move(game))
+        random_state = random.Random(7)
+        for _ in range(20):
+            world = agent.determinize(game, random_state)
+            self.assertEqual(world.player_turn(), game.player_turn())
+            self.assertEqual(world.player().hand_card, game.player().hand_card)
+            self.assertEqual(world.deck()[0], game.deck()[0])
+            self.assertEqual(world.cards_left(), game.cards_left())
+            self.assertEqual(world.discard_counts(), game.discard_counts())
+            self.assertEqual(hidden_cards(world), hidden_cards(game))
+            for before, after in zip(game.players(), world.players()):
+                self.assertEqual(before.actions, after.actions)
+
+    def test_determinize_reveal(self):
+        """A hand seen with a priest is kept in every determinization"""
+        agent = AgentISMCTS(3)
+        game = Game.new(4, 8)
+        card = game.players()[2].hand_card
+        agent._reveals = {2: card}
+        random_state = random.Random(1)
+        for _ in range(20):
+            world = agent.determinize(game, random_state)
+            self.assertEqual(world.players()[2].hand_card, card)
+            self.assertEqual(hidden_cards(world), hidden_cards(game))
+
+    def test_reveals_tracked(self):
+        """Every hand the agent believes it knows is right"""
+        known = 0
+        for seed in range(150):
+            agent = AgentISMCTS(seed, iterations=2)
+            other = AgentRandom(seed)
+            game = Game.new(4, seed)
+            while game.active():
+                if not game.is_current_player_playing():
+                    game = game.skip_eliminated_player()
+                    continue
+                if game.player_turn() == 0:
+                    action = agent.move(game)
+                    for idx, card in agent._reveals.items():
+                        self.assertEqual(game.players()[idx].hand_card, card)
+                        known += 1
+                else:
+                    action = other.move(game)
+                game, _ = game.move(action)
+        self.assertGreater(known, 0)
+
+    def test_reveals_per_seat(self):
+        """One agent playing several seats knows what one agent per seat would"""
+        known = 0
+        for seed in range(150):
+            shared = AgentISMCTS(seed)
+            alone = {seat: AgentISMCTS(seed) for seat in range(1, 4)}
+            other = AgentRandom(seed)
+            game = Game.new(4, seed)
+            while game.active():
+                if not game.is_current_player_playing():
+                    game = game.skip_eliminated_player()
+                    continue
+                seat = game.player_turn()
+                if seat != 0:
+                    shared._observe(game)
+                    alone[seat]._observe(game)
+                    self.assertEqual(shared._reveals, alone[seat]._reveals)
+                    self.assertNotIn(seat, shared._reveals)
+                    for idx, card in shared._reveals.items():
+                        self.assertEqual(game.players()[idx].hand_card, card)
+                        known += 1
+                game, _ = game.move(other.move(game))
+        self.assertGreater(known, 0)
+
+    def test_legal_actions(self):
+        """Every enumerated action is valid"""
+        for seed in range(20):
+            game = Game.new(4, seed)
+            actions = AgentISMCTS.legal_actions(game)
+            self.assertGreater(len(actions), 0)
+            for action in actions:
+                self.assertTrue(game.is_action_valid(action))
+            if Card.guard in (game.player().hand_card, game.deck()[0]):
+                self.assertGreaterEqual(len(actions), 7 * 3)
+
+    def test_deterministic(self):
+        """A fixed iteration count plays the same moves for a seed"""
+        game = Game.new(4, 11)
+        moves = [AgentISMCTS(4, iterations=30).move(game) for _ in range(2)]
+        self.assertEqual(moves[0], moves[1])
+        self.assertTrue(game.is_action_valid(moves[0]))
+
+    def test_budget(self):
+        """Iterations are counted and reported per second"""
+        agent = AgentISMCTS(2, iterations=25)
+        agent.move(Game.new(4, 2))
+        self.assertIn(agent.iterations_total, (0, 25))
+        agent = AgentISMCTS(2, time_budget=0.02)
+        agent.move(Game.new(4, 3))
+        self.assertGreater(agent.iterations_per_second(), 0)
+
+    def test_leaf_rollouts(self):
+        """Batched rollouts finish every game and play reproducibly"""
+        game = Game.new(4, 13)
+        winners = AgentISMCTS._rollouts(game, 32, np.random.RandomState(0))
+        self.assertEqual(winners.shape, (32,))
+        self.assertTrue(((winners >= 0) & (winners < 4)).all())
+        moves = [AgentISMCTS(6, iterations=10, rollouts=8).move(game) for _ in range(2)]
+        self.assertEqual(moves[0], moves[1])
+        self.assertTrue(game.is_action_valid(moves[0]))
+
+    def test_root_parallel(self):
+        """Root parallel search depends only on the seed and worker count"""
+        game = Game.new(4, 17)
+        moves = []
+        for _ in range(2):
+            agent = AgentISMCTS(8, iterations=20, workers=2)
+            moves.append(agent.move(game))
+            self.assertEqual(agent.iterations_total, 40)
+            agent.close()
+        self.assertEqual(moves[0], moves[1])
+        self.assertTrue(game.is_action_valid(moves[0]))
+
+    def test_arena(self):
+        """Plays whole arena games, reusing the agent"""
+        win_rate = Arena.compare_agents_float(
+            lambda seed: AgentISMCTS(seed, iterations=20),
+            lambda seed: AgentRandom(seed),
+            10,
+            reuse_agents=True)
+        self.assertGreaterEqual(win_rate, 0)
+        self.assertLessEqual(win_rate, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+"""Tests for the precomputed legal moves"""
+
+import unittest
+
+from loveletter.card import Card
+from loveletter.compact import CompactGame
+from loveletter.moves import FullMoves, LegalMoves
+from loveletter.player import PlayerAction, PlayerActionTable
+from loveletter.tests.test_games import TestGames
+
+
+class TestLegalMoves(unittest.TestCase):
+    """Legal move masks"""
+
+    def test_slots(self):
+        """Slots describe the env action space"""
+        self.assertEqual(LegalMoves.count, 15)
+        self.assertEqual(LegalMoves.action(0, 2),
+                         PlayerAction(Card.guard, 2, Card.priest, Card.noCard))
+        self.assertEqual(LegalMoves.action(14, 1),
+                         PlayerAction(Card.princess, 1, Card.noCard, Card.noCard))
+        self.assertTupleEqual(LegalMoves.slots(0b100000000000011), (0, 1, 14))
+        self.assertEqual(PlayerActionTable.action(LegalMoves.action_id(0, 2)),
+                         LegalMoves.action(0, 2))
+
+    def test_countess(self):
+        """Countess must be discarded alongside a king or prince"""
+        mask = LegalMoves.mask(Card.countess, Card.king, 0b1111, 0)
+        self.assertTupleEqual(LegalMoves.slots(mask), (13,))
+        mask = LegalMoves.mask(Card.prince, Card.countess, 0b1111, 0)
+        self.assertTupleEqual(LegalMoves.slots(mask), (13,))
+
+    def test_eliminated(self):
+        """An eliminated player has no slots"""
+        self.assertEqual(LegalMoves.mask(Card.noCard, Card.guard, 0b1110, 0), 0)
+
+    def test_matches_game(self):
+        """Masks agree with Game.is_action_valid during random games"""
+        for seed in range(60):
+            for game in TestGames.turns(seed):
+                mask = LegalMoves.game_mask(game)
+                self.assertEqual(mask, LegalMoves.game_mask(CompactGame.from_game(game)))
+                for slot in range(LegalMoves.count):
+                    targets = [game.player_turn()] if LegalMoves.slot_self[slot] \
+                        else game.opponent_turn()
+                    for target in targets:
+                        self.assertEqual(
+                            mask >> slot & 1 == 1,
+                            game.is_action_valid(LegalMoves.action(slot, target)))
+
+
+class TestFullMoves(unittest.TestCase):
+    """Full legal move enumeration"""
+
+    def test_index_space(self):
+        """Indices map to actions and back"""
+        self.assertEqual(FullMoves.count, 60)
+        for index in range(FullMoves.count):
+            action = FullMoves.action(index)
+            seat = action.player_target if LegalMoves.slot_self[index // 4] \
+                else (action.player_target + 1) % 4
+            self.assertEqual(FullMoves.index(action, seat), index)
+            self.assertEqual(PlayerActionTable.action(FullMoves.action_id(index)), action)
+        self.assertIsNone(FullMoves.index(PlayerAction(Card.guard, 1, Card.guard, 0), 0))
+        self.assertIsNone(FullMoves.index(PlayerAction(Card.guard, 1, Card.priest, 0), 1))
+
+    def test_matches_game(self):
+        """Every valid (discard, target, guess) is listed, and nothing else"""
+        for seed in range(40):
+            for game in TestGames.turns(seed):
+                valid = [PlayerAction(discard, target, guess, 0)
+                         for discard in range(1, 9) for target in range(4)
+                         for guess in range(9)
+                         if game.is_action_valid(PlayerAction(discard, target, guess, 0)) and
+                         (discard == Card.guard or guess == 0)]
+                actions = FullMoves.game_actions(game)
+                self.assertEqual(sorted(actions), sorted(valid))
+                self.assertEqual(actions, FullMoves.game_actions(CompactGame.from_game(game)))
+                self.assertEqual(list(FullMoves.game_indices(game)),
+                                 sorted(FullMoves.index(action, game.player_turn())
+                                        for action in actions))
+
+    def test_effective(self):
+        """Guard and priest skip protected opponents while others are open"""
+        indices = FullMoves.indices(Card.guard, Card.priest, 0b1111, 0b0100, 0)
+        effective = FullMoves.effective_indices(Card.guard, Card.priest, 0b1111, 0b0100, 0)
+        self.assertEqual(len(indices), 8 * 3)
+        self.assertEqual(len(effective), 8 * 2)
+        self.assertNotIn(2, [FullMoves.action(index).player_target for index in effective])
+
+        effective = FullMoves.effective_indices(Card.baron, Card.priest, 0b1111, 0b1110, 0)
+        targets = [FullMoves.action(index).player_target for index in effective
+                   if FullMoves.action(index).discard == Card.priest]
+        self.assertEqual(targets, [1])
+        self.assertEqual(sum(FullMoves.action(index).discard == Card.baron
+                             for index in effective), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
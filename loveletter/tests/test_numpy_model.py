@@ -0,0 +1,111 @@
+"""Tests for the NumPy ActorCritic"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from loveletter.trainers.numpy_model import NumpyActorCritic, export_npz
+
+
+def random_weights(seed, inputs=24, hidden=8, outputs=15):
+    """State dict shaped like ActorCritic's"""
+    rng = np.random.RandomState(seed)
+
+    def weights(*shape):
+        return rng.normal(size=shape).astype(np.float32)
+
+    return {"linear1.weight": weights(hidden, inputs),
+            "linear1.bias": weights(hidden),
+            "lstm.weight_ih": weights(4 * hidden, hidden),
+            "lstm.weight_hh": weights(4 * hidden, hidden),
+            "lstm.bias_ih": weights(4 * hidden),
+            "lstm.bias_hh": weights(4 * hidden),
+            "critic_linear.weight": weights(1, hidden),
+            "critic_linear.bias": weights(1),
+            "actor_linear.weight": weights(outputs, hidden),
+            "actor_linear.bias": weights(outputs)}
+
+
+def reference_forward(weights, inputs, hx, cx):
+    """ActorCritic.forward for a single observation, written out directly"""
+    def sigmoid(x):
+        return 1 / (1 + np.exp(-x))
+
+    x = weights["linear1.weight"].dot(inputs) + weights["linear1.bias"]
+    x = np.array([v if v > 0 else np.exp(v) - 1 for v in x])
+    gates = weights["lstm.weight_ih"].dot(x) + weights["lstm.bias_ih"] + \
+        weights["lstm.weight_hh"].dot(hx) + weights["lstm.bias_hh"]
+    gate_i, gate_f, gate_g, gate_o = np.split(gates, 4)
+    cx = sigmoid(gate_f) * cx + sigmoid(gate_i) * np.tanh(gate_g)
+    hx = sigmoid(gate_o) * np.tanh(cx)
+    value = weights["critic_linear.weight"].dot(hx) + weights["critic_linear.bias"]
+    logit = weights["actor_linear.weight"].dot(hx) + weights["actor_linear.bias"]
+    return value, logit, hx, cx
+
+
+class FakeTensor():
+    """Stands in for a torch tensor in a state dict"""
+
+    def __init__(self, array):
+        self._array = array
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self._array
+
+
+class TestNumpyModel(unittest.TestCase):
+    """NumPy ActorCritic"""
+
+    def test_forward(self):
+        """Batched forward matches the per observation reference"""
+        weights = random_weights(3)
+        model = NumpyActorCritic(weights)
+        rng = np.random.RandomState(4)
+        inputs = rng.uniform(size=(5, 24)).astype(np.float32)
+        hx = rng.normal(size=(5, 8)).astype(np.float32)
+        cx = rng.normal(size=(5, 8)).astype(np.float32)
+
+        values, logits, (hx_out, cx_out) = model.forward(inputs, (hx, cx))
+        self.assertEqual(values.shape, (5, 1))
+        self.assertEqual(logits.shape, (5, 15))
+        for idx in range(5):
+            value, logit, hx_ref, cx_ref = reference_forward(
+                weights, inputs[idx], hx[idx], cx[idx])
+            np.testing.assert_allclose(values[idx], value, rtol=1e-4, atol=1e-4)
+            np.testing.assert_allclose(logits[idx], logit, rtol=1e-4, atol=1e-4)
+            np.testing.assert_allclose(hx_out[idx], hx_ref, rtol=1e-4, atol=1e-5)
+            np.testing.assert_allclose(cx_out[idx], cx_ref, rtol=1e-4, atol=1e-5)
+
+    def test_zero_state(self):
+        """Without a state the LSTM starts from zeros"""
+        model = NumpyActorCritic(random_weights(5))
+        inputs = np.random.RandomState(6).uniform(size=(3, 24))
+        values, logits, _ = model.forward(inputs)
+        values_zero, logits_zero, _ = model.forward(inputs, model.zero_state(3))
+        self.assertTrue(np.array_equal(values, values_zero))
+        self.assertTrue(np.array_equal(logits, logits_zero))
+        self.assertEqual(model.action_index(inputs[1]), int(logits[1].argmax()))
+
+    def test_export(self):
+        """Exported weights load back to the same model"""
+        weights = random_weights(7)
+        handle, path = tempfile.mkstemp(suffix=".npz")
+        os.close(handle)
+        try:
+            export_npz({name: FakeTensor(value) for name, value in weights.items()}, path)
+            model = NumpyActorCritic.load(path)
+        finally:
+            os.remove(path)
+        inputs = np.random.RandomState(8).uniform(size=(4, 24))
+        expected = NumpyActorCritic(weights).forward(inputs)
+        actual = model.forward(inputs)
+        self.assertTrue(np.array_equal(expected[0], actual[0]))
+        self.assertTrue(np.array_equal(expected[1], actual[1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,7 +3,7 @@
 import unittest
 import numpy as np
 from loveletter.player import Player, PlayerTools
-from loveletter.player import PlayerAction, PlayerActionTools
+from loveletter.player import PlayerAction, PlayerActionTable, PlayerActionTools
 
 
 class TestPlayer(unittest.TestCase):
@@ -128,5 +128,38 @@ class TestPlayerActions(unittest.TestCase):
         self.assertListEqual(PlayerActionTools.from_np_many(arr), actions)
 
 
+class TestPlayerActionTable(unittest.TestCase):
+    """Interned actions and their ids"""
+
+    def test_round_trip(self):
+        """Every id maps to an action and back"""
+        for action_id in range(PlayerActionTable.count):
+            action = PlayerActionTable.action(action_id)
+            self.assertEqual(PlayerActionTable.action_id(action), action_id)
+            self.assertIs(PlayerActionTable.intern(PlayerAction(*action)), action)
+        self.assertEqual(PlayerActionTable.action_id(PlayerAction(8, 3, 8, 8)),
+                         PlayerActionTable.count - 1)
+
+    def test_interned(self):
+        """Built in actions are shared rather than built again"""
+        self.assertIs(PlayerActionTools.blank(), PlayerActionTools.blank())
+        self.assertIs(PlayerActionTools.simple(5), PlayerActionTable.get(5))
+        self.assertEqual(PlayerActionTools.simple(5), PlayerAction(5, 0, 0, 0))
+        self.assertIs(PlayerActionTable.get(1, 3, 5), PlayerActionTable.get(1, 3, 5, 0))
+
+    def test_numpy_fields(self):
+        """Fields read from uint8 arrays give the same ids as ints"""
+        arr = np.array([2, 1, 0, 6], dtype=np.uint8)
+        action = PlayerActionTools.from_np(arr)
+        self.assertIs(PlayerActionTable.intern(action), PlayerActionTable.get(2, 1, 0, 6))
+        self.assertIs(PlayerActionTable.get(*arr), PlayerActionTable.get(2, 1, 0, 6))
+        self.assertEqual(PlayerActionTable.action_id(PlayerActionTools.from_np(
+            np.array([8, 3, 8, 8], dtype=np.uint8))), PlayerActionTable.count - 1)
+        self.assertIs(PlayerActionTools.simple(np.uint8(5)), PlayerActionTable.get(5))
+        player = PlayerTools.from_np(np.array([8, 0, 0, 0, 0] + [0] * 28, dtype=np.uint8))
+        self.assertEqual(PlayerTools.force_discard(player).actions[0],
+                         PlayerAction(8, 0, 0, 0))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,90 @@
+"""Tests for the policy cache"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from loveletter.game import Game
+from loveletter.policy_cache import PolicyCache
+from loveletter.tests.test_games import TestGames
+from loveletter.tests.test_numpy_model import random_weights
+from loveletter.trainers.numpy_model import NumpyActorCritic
+
+
+class TestPolicyCache(unittest.TestCase):
+    """Policy cache"""
+
+    def setUp(self):
+        self.model = NumpyActorCritic(random_weights(21))
+
+    @staticmethod
+    def game_observations(games, seed):
+        """Observations seen by the current players of random games"""
+        observations = []
+        for idx in range(games):
+            observations.extend(game.state() for game in TestGames.turns(seed + idx))
+        return observations
+
+    def test_lookup(self):
+        """Cached actions match the model and count hits"""
+        cache = PolicyCache(self.model)
+        observations = self.game_observations(5, 3)
+        for observation in observations + observations:
+            self.assertEqual(cache.action_index(observation),
+                             self.model.action_index(observation))
+        self.assertGreaterEqual(cache.hits, len(observations))
+        self.assertEqual(cache.hits + cache.misses, 2 * len(observations))
+        self.assertEqual(cache.stats()["recent"], cache.misses)
+
+    def test_bounded(self):
+        """The recent cache drops the least recently used observations"""
+        cache = PolicyCache(self.model, max_size=4)
+        observations = self.game_observations(3, 5)
+        for observation in observations:
+            cache.action_index(observation)
+        self.assertEqual(cache.stats()["recent"], 4)
+        cache.action_index(observations[-1])
+        self.assertEqual(cache.hits, cache.stats()["hits"])
+
+    def test_warm(self):
+        """Warming covers every observation reached in play"""
+        cache = PolicyCache(self.model)
+        size = cache.warm()
+        self.assertEqual(size, len(PolicyCache.observations()))
+        observations = self.game_observations(20, 7)
+        for observation in observations:
+            self.assertEqual(cache.action_index(observation),
+                             self.model.action_index(observation))
+        # only a failed baron's double logged card counts past the deck
+        over_counted = sum(1 for observation in observations
+                           if (observation[16:24] > 1.001).any())
+        self.assertEqual(cache.misses, over_counted)
+        self.assertGreater(cache.hit_rate(), 0.9)
+
+    def test_save_load(self):
+        """A warmed table survives a round trip through an .npz file"""
+        cache = PolicyCache(self.model)
+        cache.warm(PolicyCache.observations()[:500])
+        with tempfile.TemporaryDirectory() as path:
+            name = os.path.join(path, "policy.npz")
+            cache.save(name)
+            loaded = PolicyCache.load(name, self.model, max_size=8)
+        self.assertEqual(loaded._table, cache._table)
+        self.assertEqual(loaded.max_size, 8)
+        for observation in PolicyCache.observations()[:500:7]:
+            self.assertEqual(loaded.action_index(observation),
+                             self.model.action_index(observation))
+        self.assertEqual(loaded.misses, 0)
+
+    def test_key(self):
+        """Keys pack the cards and consumed counts"""
+        observation = Game.new(4, 9).state()
+        key = PolicyCache.key(observation)
+        self.assertEqual(len(key), 24)
+        self.assertEqual(key, PolicyCache.key(observation.copy()))
+        self.assertEqual(sum(np.frombuffer(key, dtype=np.uint8)[16:]), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
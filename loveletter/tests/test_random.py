@@ -1,10 +1,16 @@
 """Testing the Random Agent"""
 
+import random
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 
 from loveletter.agents.agent import Agent
 from loveletter.agents.random import AgentRandom
+from loveletter.arena import Arena
 from loveletter.card import Card
+from loveletter.game import Game
 from loveletter.tests.test_games import TestGames
 from loveletter.player import PlayerAction
 
@@ -38,5 +44,50 @@ class TestRandomAgent(unittest.TestCase):
                                               guess=0,
                                               revealed_card=0))
 
+
+class TestRandomStreams(unittest.TestCase):
+    """Agents and games keep their randomness to themselves"""
+
+    def test_global_state_untouched(self):
+        """Playing does not touch the global generators"""
+        state_random = random.getstate()
+        state_np = np.random.get_state()
+
+        Arena.compare_agents(AgentRandom, AgentRandom, 3, 7)
+
+        self.assertEqual(random.getstate(), state_random)
+        self.assertTrue(all(np.array_equal(a, b) for a, b in
+                            zip(np.random.get_state(), state_np)))
+
+    def test_deck_stream(self):
+        """Decks come from the given stream or from the seed"""
+        self.assertTrue(np.array_equal(
+            Game.new(4, 3).deck(),
+            Game.new(4, 0, np.random.RandomState(3)).deck()))
+        random_state = np.random.RandomState(3)
+        deck_first = Game.new(4, random_state=random_state).deck()
+        deck_second = Game.new(4, random_state=random_state).deck()
+        self.assertFalse(np.array_equal(deck_first, deck_second))
+
+    def test_agent_stream(self):
+        """An agent given a stream draws from it without reseeding"""
+        game = Game.new(4, 1)
+        agent_one = AgentRandom(0, random.Random(11))
+        agent_two = AgentRandom(0, random.Random(11))
+        for _ in range(10):
+            self.assertEqual(agent_one.move(game), agent_two.move(game))
+
+    def test_threads(self):
+        """Games played on a thread pool match games played serially"""
+        seeds = list(range(0, 400, 20))
+        serial = [Arena.compare_agents(AgentRandom, AgentRandom, 20, seed)
+                  for seed in seeds]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            threaded = list(pool.map(
+                lambda seed: Arena.compare_agents(AgentRandom, AgentRandom, 20, seed),
+                seeds))
+        self.assertListEqual(serial, threaded)
+
+
 if __name__ == '__main__':
     unittest.main()
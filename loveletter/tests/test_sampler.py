@@ -0,0 +1,107 @@
+"""Tests for the determinization sampler"""
+
+import unittest
+
+import numpy as np
+
+from loveletter.belief import BeliefState
+from loveletter.card import Card
+from loveletter.compact import Record
+from loveletter.game import Game
+from loveletter.player import PlayerTools
+from loveletter.sampler import DeterminizationSampler
+from loveletter.tests.test_games import TestGames
+
+
+def played_games(seed, moves):
+    """A random game, with the belief states of every seat after a few moves"""
+    games = TestGames.positions(seed)
+    beliefs = [BeliefState(games[0], seat) for seat in range(4)]
+    last = min(moves, len(games) - 1)
+    # carry on past eliminated players to one who can move
+    while games[last].active() and not games[last].is_current_player_playing():
+        last += 1
+    for game in games[1:last + 1]:
+        for belief in beliefs:
+            belief.update(game)
+    return games[last], beliefs
+
+
+class TestDeterminizationSampler(unittest.TestCase):
+    """Determinization sampler"""
+
+    def test_consistent(self):
+        """Samples keep the observer's view and respect the belief state"""
+        random_state = np.random.RandomState(0)
+        checked = 0
+        for seed in range(40):
+            game, beliefs = played_games(seed, seed % 12)
+            if not game.active():
+                continue
+            seat = game.player_turn()
+            belief = beliefs[seat]
+            sampler = DeterminizationSampler.from_belief(belief)
+            records = sampler.sample(200, random_state)
+            self.assertEqual(records.shape, (200, Record.size))
+
+            truth = sorted(int(card) for card in game.deck()[1:]) + \
+                [int(game.players()[idx].hand_card) for idx in game.opponent_turn()]
+            for world in sampler.games(20, random_state):
+                self.assertEqual(world.player_turn(), seat)
+                self.assertEqual(world.player().hand_card, game.player().hand_card)
+                self.assertEqual(world.draw_card(), game.draw_card())
+                self.assertEqual(len(world.deck()), len(game.deck()))
+                for idx, player in enumerate(world.players()):
+                    self.assertEqual(player.actions, game.players()[idx].actions)
+                unseen = sorted(int(card) for card in world.deck()[1:]) + \
+                    [int(world.players()[idx].hand_card) for idx in world.opponent_turn()]
+                self.assertEqual(sorted(unseen), sorted(truth))
+
+            hands = records[:, Record.hands:Record.hands + 4].astype(np.int64)
+            for idx in game.opponent_turn():
+                if belief.known(idx) != Card.noCard:
+                    self.assertTrue((hands[:, idx] == belief.known(idx)).all())
+                self.assertFalse((belief.excluded(idx) >> hands[:, idx] & 1).any())
+            checked += 1
+        self.assertGreater(checked, 20)
+
+    def test_uniform(self):
+        """Without constraints every unseen card is dealt equally often"""
+        game = Game.new(4, 2)
+        sampler = DeterminizationSampler(game)
+        records = sampler.sample(20000, np.random.RandomState(1))
+        hands = records[:, Record.hands + 1]
+        counts = np.bincount(hands, minlength=9)[1:].astype(np.float64)
+        unseen = np.bincount([int(card) for card in game.deck()[1:]] +
+                             [int(game.players()[idx].hand_card) for idx in (1, 2, 3)],
+                             minlength=9)[1:]
+        expected = unseen / unseen.sum() * len(records)
+        self.assertLess(np.abs(counts - expected).max() / len(records), 0.015)
+        self.assertEqual(sampler.acceptance(), 1.0)
+
+    def test_excluded(self):
+        """Rejected rows are drawn again until they fit"""
+        game = Game.new(4, 2)
+        sampler = DeterminizationSampler(game, excluded={1: 1 << Card.guard})
+        records = sampler.sample(5000, np.random.RandomState(2))
+        self.assertFalse((records[:, Record.hands + 1] == Card.guard).any())
+        self.assertLess(sampler.acceptance(), 1.0)
+
+    def test_batch(self):
+        """Batches of samples play out to the end"""
+        game, beliefs = played_games(3, 4)
+        sampler = DeterminizationSampler.from_belief(beliefs[game.player_turn()])
+        batch = sampler.batch(64, np.random.RandomState(3))
+        self.assertTrue(batch.active().all())
+        random_state = np.random.RandomState(4)
+        while batch.active().any():
+            batch.move(batch.random_actions(random_state))
+        winners = batch.winner()
+        self.assertTrue(((winners >= 0) & (winners < 4)).all())
+        for idx in range(4):
+            if not PlayerTools.is_playing(game.players()[idx]):
+                self.assertFalse((winners == idx).any())
+
+
+if __name__ == '__main__':
+    unittest.main()
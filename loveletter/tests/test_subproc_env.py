@@ -0,0 +1,56 @@
+"""Tests for the subprocess Love Letter environment"""
+
+import unittest
+import numpy as np
+
+from loveletter.subproc_env import SubprocVecEnv
+from loveletter.vec_env import LoveLetterVecEnv
+
+
+class TestSubprocVecEnv(unittest.TestCase):
+    """Subprocess environment"""
+
+    def test_matches_in_process(self):
+        """Workers give the same results as their envs run in process"""
+        env = SubprocVecEnv(10, 3, seed=4)
+        try:
+            local = [LoveLetterVecEnv(count, 4 + idx) for idx, count in enumerate([3, 3, 4])]
+            observations = env.reset()
+            self.assertTrue(np.array_equal(
+                observations, np.concatenate([part.reset() for part in local])))
+
+            random_state = np.random.RandomState(0)
+            for _ in range(40):
+                mask = env.legal_mask()
+                self.assertTrue(np.array_equal(
+                    mask, np.concatenate([part.legal_mask() for part in local])))
+                actions = np.argmax(random_state.uniform(size=mask.shape) * mask, axis=1)
+
+                observations, rewards, dones, infos = env.step(actions)
+                expected = [part.step(actions[start:start + part.num_envs])
+                            for part, start in zip(local, [0, 3, 6])]
+                self.assertTrue(np.array_equal(
+                    observations, np.concatenate([part[0] for part in expected])))
+                self.assertTrue(np.array_equal(
+                    rewards, np.concatenate([part[1] for part in expected])))
+                self.assertTrue(np.array_equal(
+                    dones, np.concatenate([part[2] for part in expected])))
+                self.assertTrue(np.array_equal(
+                    infos["winner"],
+                    np.concatenate([part[3]["winner"] for part in expected])))
+        finally:
+            env.close()
+
+    def test_shared_views(self):
+        """Results are views of the same shared buffers"""
+        env = SubprocVecEnv(4, 2, seed=1)
+        try:
+            observations = env.reset()
+            observations_next, _, _, _ = env.step(np.argmax(env.legal_mask(), axis=1))
+            self.assertIs(observations, observations_next)
+        finally:
+            env.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
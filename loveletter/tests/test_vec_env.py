@@ -0,0 +1,75 @@
+"""Tests for the vectorized Love Letter environment"""
+
+import unittest
+import numpy as np
+
+from loveletter.compact import CompactGame
+from loveletter.card import Card
+from loveletter.vec_env import LoveLetterVecEnv
+
+
+class TestVecEnv(unittest.TestCase):
+    """Vectorized environment"""
+
+    def test_reset(self):
+        """Reset deals new games waiting on seat 0"""
+        env = LoveLetterVecEnv(8, 3)
+        observations = env.reset()
+        self.assertEqual(observations.shape, (8, 24))
+        batch = env.games()
+        self.assertTrue(batch.active().all())
+        self.assertTrue((batch.player_turn() == 0).all())
+        self.assertTrue(np.array_equal(observations, batch.state()))
+
+    def test_deal(self):
+        """Dealt rows match Game.new for the same deck"""
+        env = LoveLetterVecEnv(1, 3)
+        deck = Card.shuffle_deck(12)
+        env.games().deal([0], deck[None, :])
+        self.assertEqual(env.games().game(0).record(), CompactGame.new(4, 12).record())
+
+    def test_illegal(self):
+        """Illegal slots cost -1 and leave the game untouched"""
+        env = LoveLetterVecEnv(16, 5)
+        env.reset()
+        mask = env.legal_mask()
+        actions = np.argmin(mask, axis=1)
+        before = env.games().records().copy()
+        _, rewards, dones, _ = env.step(actions)
+        self.assertTrue((rewards == -1).all())
+        self.assertFalse(dones.any())
+        self.assertTrue(np.array_equal(env.games().records(), before))
+
+    def test_episodes(self):
+        """Random legal play finishes games with the env rewards"""
+        env = LoveLetterVecEnv(32, 7)
+        random_state = np.random.RandomState(1)
+        finished = 0
+        for _ in range(60):
+            mask = env.legal_mask()
+            picks = random_state.uniform(size=(32, 15)) * mask
+            _, rewards, dones, infos = env.step(np.argmax(picks, axis=1))
+
+            self.assertTrue(env.games().active().all())
+            self.assertTrue((env.games().player_turn() == 0).all())
+            self.assertTrue(np.isin(rewards[dones], [15, -5]).all())
+            self.assertTrue((rewards[~dones] == 0).all())
+            self.assertTrue(((rewards == 15) == (dones & (infos["winner"] == 0))).all())
+            finished += dones.sum()
+        self.assertGreater(finished, 32)
+
+    def test_seeded(self):
+        """The same seed plays the same games"""
+        results = []
+        for _ in range(2):
+            env = LoveLetterVecEnv(8, 11, opponent=lambda obs, mask: np.argmax(mask, axis=1))
+            rewards_all = []
+            for _ in range(20):
+                _, rewards, _, _ = env.step(np.argmax(env.legal_mask(), axis=1))
+                rewards_all.append(rewards)
+            results.append(np.stack(rewards_all))
+        self.assertTrue(np.array_equal(results[0], results[1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""Tests for Zobrist position keys"""
+
+import random
+import unittest
+
+from loveletter.agents.ismcts import AgentISMCTS
+from loveletter.game import Game
+from loveletter.tests.test_games import TestGames
+
+
+def played_games(seed):
+    """Every position of a random game, hashed from its first position on"""
+    game = Game.new(4, seed)
+    game.zobrist()
+    return TestGames.positions(seed, game=game)
+
+
+def fresh(game):
+    """Same position without any carried hash"""
+    return Game(game.deck(), game.players(), game.turn_index(), game.discard_counts())
+
+
+class TestZobrist(unittest.TestCase):
+    """Zobrist keys"""
+
+    def test_incremental(self):
+        """Keys kept up by moves match keys computed from scratch"""
+        for seed in range(30):
+            for game in played_games(seed):
+                self.assertEqual(game.zobrist(), fresh(game).zobrist())
+                if game.active():
+                    self.assertEqual(game.zobrist_observer(), fresh(game).zobrist_observer())
+
+    def test_distinct(self):
+        """Positions of a game all have different keys"""
+        keys = set()
+        count = 0
+        for seed in range(30):
+            games = played_games(seed)
+            keys.update(game.zobrist() for game in games)
+            count += len(games)
+        self.assertEqual(len(keys), count)
+        for key in keys:
+            self.assertLess(key, 1 << 64)
+
+    def test_deck_order(self):
+        """Swapping two unseen cards changes the key but not the view"""
+        game = Game.new(4, 7)
+        deck = list(game.deck())
+        idx = next(idx for idx in range(2, len(deck)) if deck[idx] != deck[1])
+        deck[1], deck[idx] = deck[idx], deck[1]
+        swapped = Game(deck, game.players(), game.turn_index(), game.discard_counts())
+        self.assertNotEqual(game.zobrist(), swapped.zobrist())
+        self.assertEqual(game.zobrist_observer(), swapped.zobrist_observer())
+
+    def test_observer(self):
+        """Determinizations share the current player's view only"""
+        agent = AgentISMCTS(3)
+        random_state = random.Random(4)
+        for game in played_games(5)[1:-1:3]:
+            if not game.is_current_player_playing():
+                continue
+            worlds = [agent.determinize(game, random_state) for _ in range(10)]
+            self.assertEqual(set(world.zobrist_observer() for world in worlds),
+                             {game.zobrist_observer()})
+            if game.cards_left() > 2:
+                self.assertGreater(len(set(world.zobrist() for world in worlds)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,207 @@
+import time
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+import torch.optim as optim
+from torch.autograd import Variable
+
+from gym import spaces
+from tensorboard_logger import configure, log_value
+
+from loveletter.agents.a3c import AgentA3C
+from loveletter.agents.random import AgentRandom
+from loveletter.arena import Arena
+from loveletter.subproc_env import SubprocVecEnv
+from loveletter.trainers.a3c_model import ActorCritic
+from loveletter.vec_env import LoveLetterVecEnv
+
+
+class RolloutBuffer():
+    """Preallocated storage for one rollout of num_steps over num_envs games"""
+
+    def __init__(self, num_steps, num_envs, observation_size):
+        self.num_steps = num_steps
+        self.observations = np.zeros(
+            (num_steps + 1, num_envs, observation_size), dtype=np.float32)
+        self.actions = np.zeros((num_steps, num_envs, 1), dtype=np.int64)
+        self.log_probs = np.zeros((num_steps, num_envs), dtype=np.float32)
+        self.values = np.zeros((num_steps + 1, num_envs), dtype=np.float32)
+        self.rewards = np.zeros((num_steps, num_envs), dtype=np.float32)
+        # 0 where the observation starts a new game (LSTM state is cleared)
+        self.masks = np.ones((num_steps + 1, num_envs), dtype=np.float32)
+        self.advantages = np.zeros((num_steps, num_envs), dtype=np.float32)
+
+    def start_next(self):
+        """Carry the last observation and mask over to the next rollout"""
+        self.observations[0] = self.observations[-1]
+        self.masks[0] = self.masks[-1]
+
+    def compute_advantages(self, gamma, tau):
+        """Generalized Advantage Estimation over the rollout"""
+        gae = 0
+        for step in reversed(range(self.num_steps)):
+            nonterminal = self.masks[step + 1]
+            delta = self.rewards[step] + \
+                gamma * self.values[step + 1] * nonterminal - self.values[step]
+            gae = delta + gamma * tau * nonterminal * gae
+            self.advantages[step] = gae
+        return self.advantages, self.advantages + self.values[:-1]
+
+
+def make_env(args):
+    """In process vectorized env, or one spread over worker processes"""
+    if args.num_processes > 1:
+        return SubprocVecEnv(args.num_envs, args.num_processes, args.seed)
+    return LoveLetterVecEnv(args.num_envs, args.seed)
+
+
+def evaluate(model, buffer, hx, cx, dtype):
+    """Re-run the model over a rollout, returning values, log probs and entropies"""
+    values = []
+    log_probs = []
+    entropies = []
+    for step in range(buffer.num_steps):
+        mask = Variable(torch.from_numpy(buffer.masks[step]).type(dtype).unsqueeze(1))
+        hx, cx = hx * mask, cx * mask
+        state = Variable(torch.from_numpy(buffer.observations[step]).type(dtype))
+        value, logit, (hx, cx) = model((state, (hx, cx)))
+
+        prob = F.softmax(logit)
+        log_prob = F.log_softmax(logit)
+        entropies.append(-(log_prob * prob).sum(1))
+        action = Variable(torch.from_numpy(buffer.actions[step]))
+        log_probs.append(log_prob.gather(1, action))
+        values.append(value)
+
+    return torch.cat(values, 1), torch.cat(log_probs, 1), torch.cat(entropies, 1)
+
+
+def train(args, dtype):
+    """
+    Synchronous advantage actor critic over a batch of envs.
+
+    Each update collects num_steps from every env with one batched forward
+    pass per step, then updates on the whole rollout. With ppo_epochs above
+    0 the rollout is reused for that many clipped (PPO) updates.
+    """
+    torch.manual_seed(args.seed)
+    configure("logs/run_" + args.save_name, flush_secs=5)
+
+    env = make_env(args)
+    model = ActorCritic(env.observation_size,
+                        spaces.Discrete(env.action_count)).type(dtype)
+    if args.load_name is not None:
+        model.load_state_dict(torch.load(args.load_name))
+    optimizer = optim.Adam(model.parameters(), lr=args.lr)
+    model.train()
+
+    buffer = RolloutBuffer(args.num_steps, args.num_envs, env.observation_size)
+    buffer.observations[0] = env.reset()
+    buffer.masks[0] = 0
+    hx = torch.zeros(args.num_envs, 256).type(dtype)
+    cx = torch.zeros(args.num_envs, 256).type(dtype)
+
+    episode_rewards = np.zeros(args.num_envs)
+    finished_rewards = []
+    finished_wins = []
+    steps_total = 0
+    start_time = time.time()
+
+    for update in range(1, args.updates + 1):
+        update_time = time.time()
+        hx_start, cx_start = hx, cx
+
+        # collect the rollout without building a graph
+        hx_step = Variable(hx, volatile=True)
+        cx_step = Variable(cx, volatile=True)
+        for step in range(args.num_steps):
+            mask = Variable(torch.from_numpy(buffer.masks[step]).type(dtype).unsqueeze(1),
+                            volatile=True)
+            hx_step, cx_step = hx_step * mask, cx_step * mask
+            state = Variable(torch.from_numpy(buffer.observations[step]).type(dtype),
+                             volatile=True)
+            value, logit, (hx_step, cx_step) = model((state, (hx_step, cx_step)))
+            prob = F.softmax(logit)
+            action = prob.multinomial().data
+            log_prob = F.log_softmax(logit).gather(1, Variable(action, volatile=True))
+
+            actions = action.cpu().numpy()
+            observations, rewards, dones, _ = env.step(actions[:, 0])
+
+            buffer.actions[step] = actions
+            buffer.log_probs[step] = log_prob.data.cpu().numpy()[:, 0]
+            buffer.values[step] = value.data.cpu().numpy()[:, 0]
+            buffer.rewards[step] = rewards
+            buffer.observations[step + 1] = observations
+            buffer.masks[step + 1] = 1 - dones
+
+            episode_rewards += rewards
+            finished_rewards.extend(episode_rewards[dones])
+            finished_wins.extend(rewards[dones] > 0)
+            episode_rewards[dones] = 0
+
+        mask = Variable(torch.from_numpy(buffer.masks[-1]).type(dtype).unsqueeze(1),
+                        volatile=True)
+        value, _, _ = model((Variable(torch.from_numpy(buffer.observations[-1]).type(dtype),
+                                      volatile=True),
+                             (hx_step * mask, cx_step * mask)))
+        buffer.values[-1] = value.data.cpu().numpy()[:, 0]
+        hx, cx = hx_step.data, cx_step.data
+
+        advantages, returns = buffer.compute_advantages(args.gamma, args.tau)
+        advantages = Variable(torch.from_numpy(advantages.T.copy()).type(dtype))
+        returns = Variable(torch.from_numpy(returns.T.copy()).type(dtype))
+        log_probs_old = Variable(torch.from_numpy(buffer.log_probs.T.copy()).type(dtype))
+
+        for _ in range(max(1, args.ppo_epochs)):
+            values, log_probs, entropies = evaluate(
+                model, buffer, Variable(hx_start), Variable(cx_start), dtype)
+            if args.ppo_epochs > 0:
+                ratio = torch.exp(log_probs - log_probs_old)
+                surrogate = torch.min(
+                    ratio * advantages,
+                    torch.clamp(ratio, 1 - args.clip, 1 + args.clip) * advantages)
+                policy_loss = -surrogate.mean()
+            else:
+                policy_loss = -(log_probs * advantages).mean()
+            value_loss = 0.5 * (returns - values).pow(2).mean()
+
+            optimizer.zero_grad()
+            (policy_loss + 0.5 * value_loss - args.beta * entropies.mean()).backward()
+            torch.nn.utils.clip_grad_norm(model.parameters(), 40)
+            optimizer.step()
+
+        buffer.start_next()
+
+        steps = args.num_steps * args.num_envs
+        steps_total += steps
+        steps_per_second = steps / (time.time() - update_time)
+        log_value('Steps per second', steps_per_second, update)
+
+        if update % args.log_interval == 0 and len(finished_rewards) > 0:
+            reward_avg = sum(finished_rewards) / len(finished_rewards)
+            win_rate = sum(finished_wins) / len(finished_wins)
+            print("{} | Update {: >6} | Steps {: >10} | {: >8.0f} steps/s | "
+                  "Avg Reward {:0.2f} | Win Rate {:0.3f}".format(
+                      time.strftime("%Hh %Mm %Ss", time.gmtime(time.time() - start_time)),
+                      update, steps_total, steps_per_second, reward_avg, win_rate))
+            log_value('Reward Average', reward_avg, update)
+            log_value('Win Rate', win_rate, update)
+            finished_rewards = []
+            finished_wins = []
+
+        if update % args.save_interval == 0:
+            torch.save(model.state_dict(), args.save_name)
+            if args.eval_games > 0:
+                win_rate_v_random = Arena.compare_agents_float(
+                    lambda seed: AgentA3C(args.save_name, dtype, seed),
+                    lambda seed: AgentRandom(seed),
+                    args.eval_games,
+                    reuse_agents=True)
+                print(" VsRandom: {: >4}%".format(round(win_rate_v_random * 100, 2)))
+                log_value('Win Rate vs Random', win_rate_v_random, update)
+
+    if args.num_processes > 1:
+        env.close()
+    return model
@@ -101,7 +101,8 @@ def test(rank, args, shared_model, dtype):
                 win_rate_v_random = Arena.compare_agents_float(
                     lambda seed: AgentA3C(path_output, dtype, seed),
                     lambda seed: AgentRandom(seed),
-                    800)
+                    800,
+                    reuse_agents=True)
                 msg = " {} | VsRandom: {: >4}%".format(
                     datetime.datetime.now().strftime("%c"),
                     round(win_rate_v_random * 100, 2)
@@ -0,0 +1,143 @@
+"""Outcome sampling Monte Carlo CFR over the abstracted Love Letter game"""
+
+import multiprocessing
+import random
+import time
+
+import numpy as np
+
+from loveletter.agents.cfr import AgentCFR
+from loveletter.agents.random import AgentRandom
+from loveletter.arena import Arena
+from loveletter.cfr import InfoSet, StrategyTable, sample_index
+from loveletter.game import Game
+from loveletter.moves import LegalMoves
+
+
+class OutcomeSampling():
+    """
+    Outcome sampling MCCFR (Lanctot et al. 2009) on a StrategyTable.
+
+    Every iteration deals a new game (the shuffled deck samples every chance
+    outcome at once) and walks a single line of play. The seat being
+    updated explores with epsilon, every other seat plays its current
+    regret matching strategy. Seats take turns being updated, and a win is
+    worth 1. iterations counts from first_iteration, which picks the seat
+    updated first so split runs can carry on the rotation.
+    """
+
+    def __init__(self, table, player_count=4, epsilon=0.6, seed=451, first_iteration=0):
+        self.table = table
+        self.player_count = player_count
+        self.epsilon = epsilon
+        self.iterations = first_iteration
+        self._random = random.Random(seed)
+        self._decks = np.random.RandomState(seed)
+
+    def run(self, iterations):
+        """Run iterations, each one dealing a new game"""
+        for _ in range(iterations):
+            seat = self.iterations % self.player_count
+            game = Game.new(self.player_count, random_state=self._decks)
+            self._walk(game, seat, 1.0, 1.0)
+            self.iterations += 1
+
+    def _walk(self, game, seat, reach_other, sample):
+        """(win of seat / sample probability, tail probability) of a sampled line"""
+        while game.active() and not game.is_current_player_playing():
+            game = game.skip_eliminated_player()
+        if game.over():
+            return (1.0 if game.is_winner(seat) else 0.0) / sample, 1.0
+
+        table = self.table
+        key, target = InfoSet.key(game)
+        slots = LegalMoves.slots(LegalMoves.game_mask(game))
+        row = table.row(key)
+        strategy = table.current(row, slots)
+        mover = game.player_turn()
+        if mover == seat:
+            probs = self.epsilon / len(slots) + (1 - self.epsilon) * strategy
+        else:
+            probs = strategy
+            table.strategy[row, slots] += reach_other * strategy / sample
+        pick = sample_index(probs, self._random)
+        child = game._move(InfoSet.action(game, slots[pick], target, self._random))
+
+        if mover == seat:
+            value, tail = self._walk(child, seat, reach_other, sample * probs[pick])
+            weight = value * reach_other * tail
+            table.regrets[row, slots] -= weight * strategy[pick]
+            table.regrets[row, slots[pick]] += weight
+        else:
+            value, tail = self._walk(child, seat, reach_other * strategy[pick],
+                                     sample * probs[pick])
+        return value, tail * strategy[pick]
+
+
+def _run_worker(task):
+    """Pool worker: iterations on a copy of the table, returning what it added"""
+    table, iterations, seed, epsilon, first_iteration = task
+    trainer = OutcomeSampling(table.copy(), epsilon=epsilon, seed=seed,
+                              first_iteration=first_iteration)
+    trainer.run(iterations)
+    return trainer.table.since(table)
+
+
+def run_parallel(table, iterations, processes, seed, epsilon=0.6, pool=None, done=0):
+    """
+    Split iterations over processes, each on a copy of table, and add up
+    the regrets and strategies they found.
+
+    Workers do not see each other's updates until the next call, so a round
+    should be short next to the whole run. done is the number of iterations
+    already run: the workers carry on from it in turn, so every seat is
+    updated as often whatever the split.
+    """
+    per_worker = iterations // processes
+    counts = [per_worker + (idx < iterations % processes) for idx in range(processes)]
+    firsts = [done + sum(counts[:idx]) for idx in range(processes)]
+    tasks = [(table, count, seed * processes + idx, epsilon, first)
+             for idx, (count, first) in enumerate(zip(counts, firsts))]
+    if pool is None:
+        results = [_run_worker(task) for task in tasks]
+    else:
+        results = pool.map(_run_worker, tasks)
+    for keys, regrets, strategy in results:
+        table.add(keys, regrets, strategy)
+    return table
+
+
+def evaluate(table, games, seed):
+    """Fraction of games AgentCFR wins against three random agents"""
+    return Arena.compare_agents_float(lambda game_seed: AgentCFR(table, game_seed),
+                                      lambda game_seed: AgentRandom(game_seed),
+                                      games, seed)
+
+
+def train(args):
+    """Run rounds of parallel MCCFR, checkpointing the table"""
+    table = StrategyTable.load(args.load_name) if args.load_name else StrategyTable()
+    pool = None
+    if args.num_processes > 1:
+        context = multiprocessing.get_context(
+            'fork' if 'fork' in multiprocessing.get_all_start_methods() else None)
+        pool = context.Pool(args.num_processes)
+
+    start = time.time()
+    iterations = 0
+    try:
+        for round_idx in range(1, args.rounds + 1):
+            run_parallel(table, args.round_iterations, args.num_processes,
+                         args.seed + round_idx, args.epsilon, pool, iterations)
+            iterations += args.round_iterations
+            print("Round {}, {} iterations, {:.0f} iterations/s, {} information sets".format(
+                round_idx, iterations, iterations / (time.time() - start), len(table)))
+
+            if round_idx % args.save_interval == 0 or round_idx == args.rounds:
+                table.save(args.save_name)
+                print("Saved {}, wins against random: {:.3f}".format(
+                    args.save_name, evaluate(table, args.eval_games, args.seed)))
+    finally:
+        if pool is not None:
+            pool.terminate()
+    return table
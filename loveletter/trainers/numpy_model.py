@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+NumPy ActorCritic
+Inference only copy of the ActorCritic network which runs without torch.
+Weights are exported from a trained model to a flat .npz file.
+"""
+import numpy as np
+
+
+# parameters of ActorCritic, as named in its state_dict
+PARAMETERS = ("linear1.weight", "linear1.bias",
+              "lstm.weight_ih", "lstm.weight_hh", "lstm.bias_ih", "lstm.bias_hh",
+              "critic_linear.weight", "critic_linear.bias",
+              "actor_linear.weight", "actor_linear.bias")
+
+
+def export_npz(model, path):
+    """Write the weights of an ActorCritic (or its state_dict) to an .npz file"""
+    state_dict = model.state_dict() if hasattr(model, "state_dict") else model
+    arrays = {}
+    for name in PARAMETERS:
+        value = state_dict[name]
+        if hasattr(value, "cpu"):
+            value = value.cpu().numpy()
+        arrays[name] = np.asarray(value, dtype=np.float32)
+    np.savez(path, **arrays)
+
+
+class NumpyActorCritic():
+    """
+    Forward pass of ActorCritic in NumPy.
+
+    Takes the same ((N, inputs), (hx, cx)) batch as ActorCritic.forward and
+    returns (values, logits, (hx, cx)) as float32 arrays. The weights are
+    transposed and the two LSTM biases summed once when loading.
+    """
+
+    def __init__(self, arrays):
+        self._linear1_w = np.ascontiguousarray(arrays["linear1.weight"].T, dtype=np.float32)
+        self._linear1_b = np.asarray(arrays["linear1.bias"], dtype=np.float32)
+        self._lstm_ih = np.ascontiguousarray(arrays["lstm.weight_ih"].T, dtype=np.float32)
+        self._lstm_hh = np.ascontiguousarray(arrays["lstm.weight_hh"].T, dtype=np.float32)
+        self._lstm_b = np.asarray(arrays["lstm.bias_ih"] + arrays["lstm.bias_hh"],
+                                  dtype=np.float32)
+        # critic and actor share one matmul, the value is column 0
+        self._heads_w = np.ascontiguousarray(
+            np.concatenate([arrays["critic_linear.weight"],
+                            arrays["actor_linear.weight"]]).T, dtype=np.float32)
+        self._heads_b = np.concatenate([arrays["critic_linear.bias"],
+                                        arrays["actor_linear.bias"]]).astype(np.float32)
+        self.hidden_size = self._lstm_hh.shape[0]
+
+    @staticmethod
+    def load(path):
+        """Model from an .npz file written by export_npz"""
+        with np.load(path) as arrays:
+            return NumpyActorCritic({name: arrays[name] for name in PARAMETERS})
+
+    def zero_state(self, count=1):
+        """Empty (hx, cx) LSTM state for a batch"""
+        return (np.zeros((count, self.hidden_size), dtype=np.float32),
+                np.zeros((count, self.hidden_size), dtype=np.float32))
+
+    def forward(self, inputs, state=None):
+        """(values, logits, (hx, cx)) of a batch of observations"""
+        inputs = np.asarray(inputs, dtype=np.float32)
+        hx, cx = self.zero_state(inputs.shape[0]) if state is None else state
+
+        x = inputs.dot(self._linear1_w) + self._linear1_b
+        x = np.where(x > 0, x, np.expm1(np.minimum(x, 0)))  # elu
+
+        # LSTMCell with gates ordered input, forget, cell, output
+        gates = x.dot(self._lstm_ih) + hx.dot(self._lstm_hh) + self._lstm_b
+        size = self.hidden_size
+        ifo = _sigmoid(np.concatenate([gates[:, :2 * size], gates[:, 3 * size:]], 1))
+        cx = ifo[:, size:2 * size] * cx + ifo[:, :size] * np.tanh(gates[:, 2 * size:3 * size])
+        hx = ifo[:, 2 * size:] * np.tanh(cx)
+
+        heads = hx.dot(self._heads_w) + self._heads_b
+        return heads[:, :1], heads[:, 1:], (hx, cx)
+
+    def action_index(self, observation):
+        """Greedy action slot for a single observation"""
+        _, logits, _ = self.forward(observation[None])
+        return int(logits[0].argmax())
+
+
+def _sigmoid(x):
+    return 0.5 * (np.tanh(0.5 * x) + 1)
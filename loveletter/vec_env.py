@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Love Letter Vectorized Environment
+K games played in lockstep, with the same rewards and action slots as
+LoveLetterEnv. The learning agent always plays seat 0.
+"""
+import numpy as np
+
+from loveletter.batch import BatchGame
+from loveletter.card import Card
+from loveletter.compact import Record
+from loveletter.moves import LegalMoves
+
+
+class LoveLetterVecEnv():
+    """
+    Vectorized Love Letter Game Environment
+
+    step takes one action slot per game and returns stacked observations,
+    rewards, dones and infos. Finished games are dealt again right away, so
+    the observation of a done game is the first one of its next game.
+
+    The opponents in seats 1-3 play through `opponent`, a function taking
+    (observations, legal_mask) of the games waiting on them and returning
+    an action slot for each. By default they play uniformly random legal
+    slots, as AgentRandom does.
+    """
+
+    action_count = LegalMoves.count
+    observation_size = 24
+
+    def __init__(self, num_envs, seed=451, opponent=None, random_state=None):
+        self.num_envs = num_envs
+        self.np_random = np.random.RandomState(seed) \
+            if random_state is None else random_state
+        self._opponent = opponent
+        self._batch = BatchGame(np.zeros((num_envs, Record.size), dtype=np.uint8))
+        self._observations = np.empty((num_envs, self.observation_size))
+        self._rows = np.arange(num_envs)
+        self.reset()
+
+    def games(self):
+        """The BatchGame being played"""
+        return self._batch
+
+    def reset(self):
+        """
+        Deal new games everywhere.
+
+        Returns the (K, 24) observations. The array is reused (overwritten)
+        by the next step or reset.
+        """
+        self._deal(self._rows)
+        return self._batch.state_into(self._observations)
+
+    def legal_mask(self):
+        """(K, 15) True where an action slot is playable"""
+        return self._batch.legal_mask()
+
+    def step(self, actions):
+        """
+        Play an action slot in every game, then let the opponents play.
+
+        returns observations, rewards, dones, infos. As with reset, the
+        observations array is reused by the next call.
+        """
+        batch = self._batch
+        actions = np.asarray(actions)
+        legal = batch.legal_mask()[self._rows, actions]
+
+        moves = batch.slot_actions(actions, self.np_random)
+        moves[~legal] = 0
+        batch.move(moves)
+        self._advance_opponents()
+
+        over = batch.over()
+        player_out = batch.hands()[:, 0] == Card.noCard
+        dones = legal & (over | player_out)
+        rewards = np.where(batch.winner() == 0, 15, -5)
+        rewards = np.where(over, rewards, 0)
+        rewards = np.where(legal, rewards, -1)
+
+        infos = {"round": batch.turn_index() // batch.records()[:, Record.player_count],
+                 "winner": batch.winner()}
+
+        if dones.any():
+            self._deal(np.flatnonzero(dones))
+        return batch.state_into(self._observations), rewards, dones, infos
+
+    def _advance_opponents(self):
+        """Opponents play until seat 0 is up again or the game is over"""
+        batch = self._batch
+        waiting = batch.active() & (batch.player_turn() != 0)
+        while waiting.any():
+            moves = batch.random_actions(self.np_random)
+            if self._opponent is not None:
+                # illegal choices fall back to the random move
+                rows = np.flatnonzero(waiting)
+                mask = batch.legal_mask()
+                slots = np.zeros(self.num_envs, dtype=np.int64)
+                slots[rows] = self._opponent(batch.state()[rows], mask[rows])
+                chosen = mask[self._rows, slots]
+                moves[chosen] = batch.slot_actions(slots, self.np_random)[chosen]
+            moves[~waiting] = 0
+            batch.move(moves)
+            waiting = batch.active() & (batch.player_turn() != 0)
+
+    def _deal(self, rows):
+        """Deal new games into rows"""
+        self._batch.deal(rows, Card.shuffle_decks(len(rows), self.np_random))
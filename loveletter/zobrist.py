@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Love Letter Zobrist Hashing
+64-bit position keys, updated with a few XORs per move.
+"""
+import numpy as np
+
+from loveletter.card import Card
+
+_DECK_SIZE = sum(Card.counts)
+_TURNS = 128
+
+
+def _keys(random_state, *shape):
+    """Nested lists of random 64-bit keys"""
+    keys = random_state.randint(0, 1 << 62, size=shape + (2,), dtype=np.int64)
+    return ((keys[..., 0].astype(object) << 2) ^ keys[..., 1].astype(object)).tolist()
+
+
+_RANDOM = np.random.RandomState(0x5eed)
+# [position][card], [seat][card], [seat][slot][field][value], [turn index]
+_DECK = _keys(_RANDOM, _DECK_SIZE, 9)
+_HAND = _keys(_RANDOM, 4, 9)
+_ACTION = _keys(_RANDOM, 4, 8, 4, 9)
+_TURN = _keys(_RANDOM, _TURNS)
+# drawn card and deck length, for the view of one player
+_DRAWN = _keys(_RANDOM, 9)
+_DECK_LENGTH = _keys(_RANDOM, _DECK_SIZE + 1)
+
+
+class Zobrist():
+    """
+    Zobrist keys of Game positions.
+
+    A key XORs one random 64-bit number per feature: each deck card at its
+    absolute deck position, each hand card, each field of every logged
+    action (so the handmaid flags and discards are covered) and the turn
+    index. The deck is right aligned in a 16 card deck, so drawing only
+    removes the keys of the drawn cards.
+
+    The parts are kept apart so the view of any one player is O(1) too:
+    (public, reveals, hidden) where public holds the logs without the
+    priest reveals and the turn index, reveals holds each seat's own priest
+    reveals and hidden holds the hands and the deck.
+    """
+
+    @staticmethod
+    def parts(game):
+        """(public, reveals, hidden) of a game, from scratch"""
+        public = _TURN[game.turn_index() % _TURNS]
+        reveals = []
+        hidden = 0
+        deck = game.deck()
+        base = _DECK_SIZE - len(deck)
+        for idx, card in enumerate(deck):
+            hidden ^= _DECK[base + idx][card]
+        for seat, player in enumerate(game.players()):
+            hidden ^= _HAND[seat][player.hand_card]
+            revealed = 0
+            for slot, action in enumerate(player.actions):
+                keys = _ACTION[seat][slot]
+                public ^= keys[0][action.discard] ^ keys[1][action.player_target] ^ \
+                    keys[2][action.guess]
+                revealed ^= keys[3][action.revealed_card]
+            reveals.append(revealed)
+        return public, tuple(reveals), hidden
+
+    @staticmethod
+    def update(parent, child, parts):
+        """Parts of child, a game one move after parent with the given parts"""
+        public, reveals, hidden = parts
+        public ^= _TURN[parent.turn_index() % _TURNS] ^ \
+            _TURN[child.turn_index() % _TURNS]
+
+        deck = parent.deck()
+        base = _DECK_SIZE - len(deck)
+        for idx in range(len(deck) - len(child.deck())):
+            hidden ^= _DECK[base + idx][deck[idx]]
+
+        players_child = child.players()
+        for seat, player in enumerate(parent.players()):
+            player_child = players_child[seat]
+            if player_child is player:
+                continue
+            if player_child.hand_card != player.hand_card:
+                hidden ^= _HAND[seat][player.hand_card] ^ \
+                    _HAND[seat][player_child.hand_card]
+            for slot, (action, action_child) in enumerate(
+                    zip(player.actions, player_child.actions)):
+                if action_child is action:
+                    continue
+                keys = _ACTION[seat][slot]
+                public ^= keys[0][action.discard] ^ keys[1][action.player_target] ^ \
+                    keys[2][action.guess] ^ keys[0][action_child.discard] ^ \
+                    keys[1][action_child.player_target] ^ keys[2][action_child.guess]
+                if action_child.revealed_card != action.revealed_card:
+                    reveals = reveals[:seat] + (
+                        reveals[seat] ^ keys[3][action.revealed_card] ^
+                        keys[3][action_child.revealed_card],) + reveals[seat + 1:]
+        return public, reveals, hidden
+
+    @staticmethod
+    def full(parts):
+        """Key of the whole position"""
+        public, reveals, hidden = parts
+        for revealed in reveals:
+            public ^= revealed
+        return public ^ hidden
+
+    @staticmethod
+    def observer(game, parts):
+        """Key of what the current player can see"""
+        public, reveals, _ = parts
+        seat = game.player_turn()
+        return public ^ reveals[seat] ^ _HAND[seat][game.player().hand_card] ^ \
+            _DRAWN[game.draw_card()] ^ _DECK_LENGTH[len(game.deck())]
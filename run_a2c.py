@@ -0,0 +1,49 @@
+"""Kick off for synchronous batched A2C/PPO agent training"""
+
+import argparse
+
+import torch
+
+from loveletter.trainers.a2c_train import train
+
+# Training settings
+parser = argparse.ArgumentParser(description='Batched A2C/PPO for Love Letter')
+parser.add_argument('--lr', type=float, default=0.0001, metavar='LR',
+                    help='learning rate (default: 0.0001)')
+parser.add_argument('--gamma', type=float, default=0.99, metavar='G',
+                    help='discount factor for rewards (default: 0.99)')
+parser.add_argument('--tau', type=float, default=1.00, metavar='T',
+                    help='parameter for GAE (default: 1.00)')
+parser.add_argument('--beta', type=float, default=0.01, metavar='B',
+                    help='parameter for entropy (default: 0.01)')
+parser.add_argument('--seed', type=int, default=1, metavar='S',
+                    help='random seed (default: 1)')
+parser.add_argument('--num-envs', type=int, default=256, metavar='E',
+                    help='how many games to step at once (default: 256)')
+parser.add_argument('--num-processes', type=int, default=1, metavar='N',
+                    help='worker processes stepping the games (default: 1, in process)')
+parser.add_argument('--num-steps', type=int, default=20, metavar='NS',
+                    help='number of forward steps per update (default: 20)')
+parser.add_argument('--ppo-epochs', type=int, default=0, metavar='PE',
+                    help='clipped PPO updates per rollout, 0 for A2C (default: 0)')
+parser.add_argument('--clip', type=float, default=0.2, metavar='C',
+                    help='PPO ratio clip (default: 0.2)')
+parser.add_argument('--updates', type=int, default=100000, metavar='U',
+                    help='number of updates to run (default: 100000)')
+parser.add_argument('--log-interval', type=int, default=10, metavar='L',
+                    help='updates between printed stats (default: 10)')
+parser.add_argument('--save-interval', type=int, default=500, metavar='SI',
+                    help='updates between saving and evaluating (default: 500)')
+parser.add_argument('--eval-games', type=int, default=200, metavar='EG',
+                    help='games against random agents per evaluation (default: 200)')
+
+parser.add_argument('--save-name', metavar='FN', default='default_model',
+                    help='path/prefix for the filename to save the model\'s parameters')
+parser.add_argument('--load-name', default=None, metavar='SN',
+                    help='path/prefix for the filename to load the model\'s parameters')
+
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    dtype = torch.cuda.FloatTensor if torch.cuda.is_available() else torch.FloatTensor
+    train(args, dtype)
@@ -6,30 +6,49 @@ import os
 import torch
 
 from loveletter.agents.random import AgentRandom
+from loveletter.card import Card
+from loveletter.deals import DealBank
 from loveletter.arena import Arena
 from loveletter.agents.a3c import AgentA3C
+from loveletter.agents.cfr import AgentCFR
+from loveletter.agents.ismcts import AgentISMCTS
 
 PARSER = argparse.ArgumentParser(
     description='Run the arena with available agents')
 
 PARSER.add_argument('--output', type=str, default='arena.results.csv',
                     help='Path to write arena results')
+PARSER.add_argument('--processes', type=int, default=1,
+                    help='Worker processes to play the games on (default: 1)')
+PARSER.add_argument('--ismcts-iterations', type=int, default=200,
+                    help='Search iterations per ISMCTS move (default: 200)')
+PARSER.add_argument('--cfr-table', type=str, default=None,
+                    help='Tables saved by run_cfr.py, to add a CFR agent')
+PARSER.add_argument('--deal-bank', type=str, default=None,
+                    help='Deal bank saved by run_deal_bank.py to read the decks from')
 
 ARGS = PARSER.parse_args()
+if ARGS.deal_bank:
+    Card.set_deal_bank(DealBank.open(ARGS.deal_bank))
 
 print('Starting arena')
 A3C_PATH = os.path.join("models", "stated_2017-05-01T22-59-33.510476_best_0.45875")
 dtype = torch.cuda.FloatTensor if torch.cuda.is_available() else torch.FloatTensor
 
 
-ARENA = Arena([
+AGENTS = [
     # Place agents in this list as created
     # first in the tuple is the readable name
     # second is a lambda that ONLY takes a random seed. This can be discarded
     # if the the Agent does not require a seed
     ("A3C", lambda seed: AgentA3C(A3C_PATH, dtype, seed)),
+    ("ISMCTS", lambda seed: AgentISMCTS(seed, ARGS.ismcts_iterations)),
     ("Random", lambda seed: AgentRandom(seed))
-], 500)
+]
+if ARGS.cfr_table:
+    AGENTS.append(("CFR", lambda seed: AgentCFR(ARGS.cfr_table, seed)))
+
+ARENA = Arena(AGENTS, 500, ARGS.processes, reuse_agents=True)
 
 print('Run the arena for: ', ARENA.csv_header())
 
@@ -0,0 +1,31 @@
+"""Kick off for outcome sampling MCCFR training"""
+
+import argparse
+
+from loveletter.trainers.cfr_train import train
+
+# Training settings
+parser = argparse.ArgumentParser(description='Outcome sampling MCCFR for Love Letter')
+parser.add_argument('--seed', type=int, default=1, metavar='S',
+                    help='random seed (default: 1)')
+parser.add_argument('--num-processes', type=int, default=1, metavar='N',
+                    help='worker processes running iterations (default: 1, in process)')
+parser.add_argument('--rounds', type=int, default=1000, metavar='R',
+                    help='number of rounds to run (default: 1000)')
+parser.add_argument('--round-iterations', type=int, default=2000, metavar='RI',
+                    help='iterations per round, split over the processes (default: 2000)')
+parser.add_argument('--epsilon', type=float, default=0.6, metavar='E',
+                    help='exploration of the updated seat (default: 0.6)')
+parser.add_argument('--save-interval', type=int, default=50, metavar='SI',
+                    help='rounds between saving and evaluating (default: 50)')
+parser.add_argument('--eval-games', type=int, default=200, metavar='EG',
+                    help='games against random agents per evaluation (default: 200)')
+
+parser.add_argument('--save-name', metavar='FN', default='cfr_table.npz',
+                    help='path for the .npz file to save the tables')
+parser.add_argument('--load-name', default=None, metavar='SN',
+                    help='path of an .npz file of tables to continue from')
+
+
+if __name__ == '__main__':
+    train(parser.parse_args())
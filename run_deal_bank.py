@@ -0,0 +1,28 @@
+"""Build a deal bank of decks indexed by seed"""
+
+import argparse
+import time
+
+from loveletter.deals import DealBank
+
+PARSER = argparse.ArgumentParser(
+    description='Precompute the decks of a range of seeds into an .npy file')
+
+PARSER.add_argument('--count', type=int, default=1000000,
+                    help='Number of seeds, from 0 (default: 1000000)')
+PARSER.add_argument('--output', type=str, default='deals.npy',
+                    help='Path of the .npy file to write (default: deals.npy)')
+PARSER.add_argument('--generated-seed', type=int, default=None,
+                    help='Draw every deck at once from this seed, rather than '
+                         'the decks Game.new gives each seed')
+
+
+if __name__ == '__main__':
+    ARGS = PARSER.parse_args()
+    START = time.time()
+    if ARGS.generated_seed is None:
+        BANK = DealBank.seeded(ARGS.count, ARGS.output)
+    else:
+        BANK = DealBank.generated(ARGS.count, ARGS.generated_seed, ARGS.output)
+    print('{} decks written to {} in {:.1f}s'.format(
+        len(BANK), ARGS.output, time.time() - START))
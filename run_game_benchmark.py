@@ -0,0 +1,79 @@
+"""Benchmark the Game accessors served from the cached state summary"""
+
+import argparse
+import timeit
+
+from loveletter.game import Game
+from loveletter.player import PlayerTools
+from loveletter.tests.test_games import TestGames
+
+PARSER = argparse.ArgumentParser(
+    description='Time Game accessors against recomputing them on every call')
+
+PARSER.add_argument('--games', type=int, default=200,
+                    help='Random games whose positions are queried (default: 200)')
+PARSER.add_argument('--repeat', type=int, default=5,
+                    help='Timing repeats, the best is kept (default: 5)')
+
+
+def positions(games):
+    """Every position of random games"""
+    return [game for seed in range(games) for game in TestGames.positions(seed)]
+
+
+# the accessors as they were, recomputed from the players on each call
+def is_winner_recomputed(game, idx):
+    """is_winner scanning the players"""
+    if game.active():
+        return False
+    players = game._players
+    player = players[idx]
+    if not PlayerTools.is_playing(player):
+        return False
+    other_scores = [
+        p.hand_card > player.hand_card for p in players if PlayerTools.is_playing(p)]
+    return sum(other_scores) == 0
+
+
+def winner_recomputed(game):
+    """winner calling is_winner for each seat"""
+    for idx in range(len(game._players)):
+        if is_winner_recomputed(game, idx):
+            return idx
+    return -1
+
+
+def opponent_turn_recomputed(game):
+    """opponent_turn building a new list"""
+    return [idx for idx, player in enumerate(game._players)
+            if idx != game.player_turn() and PlayerTools.is_playing(player)]
+
+
+def alive_mask_recomputed(game):
+    """alive_mask scanning the players"""
+    return sum(1 << idx for idx, player in enumerate(game._players)
+               if PlayerTools.is_playing(player))
+
+
+def measure(function, games, repeat):
+    """Best time per call in microseconds"""
+    best = min(timeit.repeat(lambda: [function(game) for game in games],
+                             number=1, repeat=repeat))
+    return best / len(games) * 1e6
+
+
+if __name__ == '__main__':
+    ARGS = PARSER.parse_args()
+    GAMES = positions(ARGS.games)
+    print('{} positions'.format(len(GAMES)))
+    for name, cached, recomputed in [
+            ('winner', Game.winner, winner_recomputed),
+            ('opponent_turn', Game.opponent_turn, opponent_turn_recomputed),
+            ('alive_mask', Game.alive_mask, alive_mask_recomputed)]:
+        fast = measure(cached, GAMES, ARGS.repeat)
+        slow = measure(recomputed, GAMES, ARGS.repeat)
+        print('  {: <14} | {: >6.3f} us cached | {: >6.3f} us recomputed | x{:0.1f}'.format(
+            name, fast, slow, slow / fast))
+    BUILD = measure(lambda game: Game(game.deck(), game._players, game.turn_index(),
+                                      game.discard_counts()), GAMES, ARGS.repeat)
+    print('  {: <14} | {: >6.3f} us per Game built'.format('construction', BUILD))
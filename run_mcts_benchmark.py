@@ -0,0 +1,55 @@
+"""Benchmark ISMCTS search speed against workers and batched rollouts"""
+
+import argparse
+import multiprocessing
+import time
+
+from loveletter.agents.ismcts import AgentISMCTS
+from loveletter.game import Game
+
+PARSER = argparse.ArgumentParser(
+    description='Measure ISMCTS iterations per second')
+
+PARSER.add_argument('--iterations', type=int, default=400,
+                    help='Iterations per tree and move (default: 400)')
+PARSER.add_argument('--positions', type=int, default=10,
+                    help='Opening positions searched per setting (default: 10)')
+PARSER.add_argument('--max-workers', type=int, default=multiprocessing.cpu_count(),
+                    help='Largest number of root parallel workers (default: cpu count)')
+PARSER.add_argument('--rollouts', type=int, nargs='*', default=[1, 16, 64, 256],
+                    help='Batched rollouts per leaf to try (default: 1 16 64 256)')
+
+
+def measure(positions, **settings):
+    """(iterations per second, rollouts per second) over opening positions"""
+    agent = AgentISMCTS(0, **settings)
+    # the first move also starts the pool
+    agent.move(Game.new(4, positions))
+    agent.iterations_total = 0
+    agent.search_time = 0.0
+    start = time.time()
+    for seed in range(positions):
+        agent.move(Game.new(4, seed))
+    elapsed = time.time() - start
+    agent.close()
+    iterations = agent.iterations_total
+    return iterations / elapsed, iterations * settings.get("rollouts", 1) / elapsed
+
+
+if __name__ == '__main__':
+    ARGS = PARSER.parse_args()
+
+    print('Root parallel trees ({} iterations each)'.format(ARGS.iterations))
+    BASE = None
+    for workers in range(1, ARGS.max_workers + 1):
+        speed, _ = measure(ARGS.positions, iterations=ARGS.iterations, workers=workers)
+        BASE = speed if BASE is None else BASE
+        print('  workers {: >3} | {: >10.0f} iterations/s | x{:0.2f}'.format(
+            workers, speed, speed / BASE))
+
+    print('Leaf parallel rollouts ({} iterations)'.format(ARGS.iterations // 4))
+    for rollouts in ARGS.rollouts:
+        speed, rollout_speed = measure(ARGS.positions, iterations=ARGS.iterations // 4,
+                                       rollouts=rollouts)
+        print('  rollouts {: >4} | {: >10.0f} iterations/s | {: >10.0f} rollouts/s'.format(
+            rollouts, speed, rollout_speed))
@@ -0,0 +1,27 @@
+"""Warm a policy cache offline and save its table"""
+
+import argparse
+import time
+
+from loveletter.policy_cache import PolicyCache
+from loveletter.trainers.numpy_model import NumpyActorCritic
+
+PARSER = argparse.ArgumentParser(
+    description='Precompute the greedy action of every two card observation')
+
+PARSER.add_argument('--model', type=str, required=True,
+                    help='Model exported to .npz (see loveletter.agents.a3c.export_model)')
+PARSER.add_argument('--output', type=str, default='policy_cache.npz',
+                    help='Path of the table to write (default: policy_cache.npz)')
+PARSER.add_argument('--batch-size', type=int, default=4096,
+                    help='Observations per forward pass (default: 4096)')
+
+
+if __name__ == '__main__':
+    ARGS = PARSER.parse_args()
+    START = time.time()
+    CACHE = PolicyCache(NumpyActorCritic.load(ARGS.model))
+    SIZE = CACHE.warm(batch_size=ARGS.batch_size)
+    CACHE.save(ARGS.output)
+    print('{} observations written to {} in {:.1f}s'.format(
+        SIZE, ARGS.output, time.time() - START))